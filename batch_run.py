@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import argparse
+import datetime
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dotenv import load_dotenv
+
+# Load env vars
+load_dotenv()
+
+import scoring
+from crew_grisp import SCORING_CONFIG_PATH, TOOL_MAP, callCrew, factor_scores_from_outputs, referenced_tools
+from tools.call_memo import use_call_memo
+from tools.fact_store import FactStore, use_fact_store
+from tools.tracing import Tracer, use_tracer
+
+DEFAULT_CHECKPOINT = "reports/batch_checkpoint.jsonl"
+DEFAULT_OUTPUT = "reports/batch_results.json"
+# One JSONL trace per country run (see tools/tracing.py): <country>-<run id>.jsonl
+TRACE_DIR = "reports/traces"
+
+def analyze_country(country, parallel=True, max_concurrency=None, narrative=None, run_id=None):
+    """
+    Runs the full pipeline for one country and returns a JSON-serialisable result row.
+    `run_id` names the run's trace file next to the country (default: the start of the trace id),
+    so two runs for the same country, concurrent or in later batches, keep separate traces.
+    """
+    started = time.time()
+    tracer = Tracer(f"grisp-batch-{country}", {"country": country})
+    with use_tracer(tracer), tracer.span("run", "run", country=country), use_call_memo() as call_memo:
+        crew = callCrew(country=country, parallel=parallel, max_concurrency=max_concurrency, narrative=narrative)
+        with use_fact_store(FactStore(country)) as facts:
+            output = crew.kickoff()
+    run_id = run_id or tracer.trace_id[:12]
+    trace_path = os.path.join(TRACE_DIR, f"{country.replace(os.sep, '_')}-{run_id}.jsonl")
+    tracer.write_jsonl(trace_path)
+
+    return {
+        "country": country,
+        "status": "ok",
+        # Raw per-factor scores; the indices and ranks are computed for the whole batch in write_results
+        "factor_scores": getattr(crew, "factor_scores", None) or factor_scores_from_outputs(output.tasks_output),
+        # Typed records the tools returned (exact values, not the prose the agents saw)
+        "facts": facts.to_dicts(),
+        # Which stages were reused from an earlier run (parallel mode with the task memo)
+        "stage_status": getattr(crew, "stage_status", {}),
+        # Tool calls executed vs. answered by an identical call of the same run (tools/call_memo.py)
+        "tool_calls": call_memo.summary() if call_memo is not None else {},
+        "report": str(output),
+        "elapsed_seconds": round(time.time() - started, 2),
+        "trace": trace_path,
+    }
+
+
+def load_checkpoint(path):
+    """Country -> result for every country already finished in an earlier (possibly interrupted) run."""
+    done = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short if the previous run was killed mid-write
+                    continue
+                done[row["country"]] = row
+    return done
+
+
+def run_batch(countries, workers=2, timeout=None, checkpoint=DEFAULT_CHECKPOINT, output=DEFAULT_OUTPUT,
+              parallel_factors=True, max_concurrency=None, retry_failed=False, narrative=None):
+    """
+    Runs the countries `workers` at a time. Each finished country is appended to the checkpoint file
+    straight away, so an interrupted batch resumes where it stopped.
+    Countries running longer than `timeout` seconds are recorded as timed out and the batch moves on:
+    the stuck run is left to finish in the background and the next country takes its slot.
+    """
+    os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+    results = load_checkpoint(checkpoint)
+    if retry_failed:
+        results = {c: r for c, r in results.items() if r.get("status") == "ok"}
+
+    todo = [c for c in dict.fromkeys(countries) if c not in results]
+    print(f"🌍 {len(countries)} countries requested, {len(countries) - len(todo)} already in checkpoint, {len(todo)} to run.")
+
+    # Build the tools once up front; every country run below shares them
+    TOOL_MAP.preload(referenced_tools())
+
+    checkpoint_lock = threading.Lock()
+
+    def record(row):
+        with checkpoint_lock:
+            results[row["country"]] = row
+            with open(checkpoint, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        print(f"  {'✅' if row['status'] == 'ok' else '❌'} {row['country']}: {row['status']}")
+
+    start_times = {}
+    # Trace files are named <country>-<batch id>-<item index>
+    batch_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    def job(country, index):
+        start_times[country] = time.monotonic()
+        return analyze_country(country, parallel_factors, max_concurrency, narrative, run_id=f"{batch_id}-{index:04d}")
+
+    def start(country, index):
+        """Runs one country on its own daemon thread; the returned future completes with its row."""
+        future = Future()
+        run = contextvars.copy_context().run
+
+        def target():
+            try:
+                future.set_result(run(job, country, index))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f"grisp-country-{index}", daemon=True).start()
+        return future
+
+    # At most `workers` countries run at once. A timed-out country's thread can't be killed: it is
+    # abandoned (daemon, so it doesn't keep the process alive) and its slot goes to the next country.
+    queue = list(enumerate(todo))
+    pending, abandoned = {}, []
+    while queue or pending:
+        while queue and len(pending) < max(1, workers):
+            index, country = queue.pop(0)
+            pending[start(country, index)] = country
+
+        finished, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+        for future in finished:
+            country = pending.pop(future)
+            try:
+                record(future.result())
+            except Exception as e:
+                record({"country": country, "status": "error", "error": str(e)})
+
+        if timeout:
+            now = time.monotonic()
+            for future, country in list(pending.items()):
+                started = start_times.get(country)
+                if started is not None and now - started > timeout:
+                    pending.pop(future)
+                    abandoned.append(future)
+                    record({"country": country, "status": "timeout", "error": f"exceeded {timeout}s"})
+
+    stuck = sum(not future.done() for future in abandoned)
+    if stuck:
+        print(f"⚠️ {stuck} timed-out countr{'y is' if stuck == 1 else 'ies are'} still running in the background "
+              "(abandoned; their results are discarded).")
+
+    write_results(results, countries, output)
+    return results
+
+
+def write_results(results, countries, output):
+    """
+    One consolidated results file. LLI, terrorism risk and percentile ranks for every country are
+    computed in one vectorized pass over the factor scores, and countries are ranked by LLI.
+    """
+    rows = [results[c] for c in dict.fromkeys(countries) if c in results]
+    scored = [r for r in rows if r.get("status") == "ok"]
+
+    table = scoring.ScoreTable.from_results({r["country"]: r.get("factor_scores") or {} for r in scored})
+    indices = scoring.score_table(table, scoring.load_weights(SCORING_CONFIG_PATH))
+    for row in scored:
+        row.update(indices[row["country"]])
+
+    ranked = sorted((r for r in scored if r.get("LLI_index") is not None), key=lambda r: r["LLI_index"], reverse=True)
+    for rank, row in enumerate(ranked, start=1):
+        row["lli_rank"] = rank
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "countries": rows,
+        }, f, indent=2)
+    print(f"\n📄 Consolidated results for {len(rows)} countries saved to: {output}")
+
+
+def read_countries(args):
+    countries = list(args.countries or [])
+    if args.countries_file:
+        with open(args.countries_file, "r", encoding="utf-8") as f:
+            countries += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return countries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run GRiSP for many countries in one process")
+    parser.add_argument("--countries", nargs="*", help="Country names, e.g. India 'United States' Brazil")
+    parser.add_argument("--countries-file", help="Text file with one country per line")
+    parser.add_argument("--workers", type=int, default=2, help="Countries analyzed at the same time")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-country timeout in seconds")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="JSONL file used to resume interrupted batches")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Consolidated results file")
+    parser.add_argument("--sequential-factors", action="store_true", help="Run each country's factor agents one after another")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Factor chains running at once per country")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run countries that failed or timed out before")
+    parser.add_argument("--no-narrative", action="store_true", help="Skip the LLM synthesis narrative; scores only")
+    args = parser.parse_args()
+
+    countries = read_countries(args)
+    if not countries:
+        parser.error("No countries given. Use --countries and/or --countries-file.")
+
+    run_batch(
+        countries,
+        workers=args.workers,
+        timeout=args.timeout,
+        checkpoint=args.checkpoint,
+        output=args.output,
+        parallel_factors=not args.sequential_factors,
+        max_concurrency=args.max_concurrency,
+        retry_failed=args.retry_failed,
+        narrative=False if args.no_narrative else None,
+    )
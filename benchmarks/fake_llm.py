@@ -0,0 +1,67 @@
+"""
+Deterministic stand-in for the Gemini LLM, so the full pipeline runs offline.
+
+In a factor's fetch_data task it calls each of the agent's tools once (ReAct text format, with
+the canned inputs below) and then answers; every other task answers straight away with a fixed
+JSON score. It emits the same started/chunk/completed events as a real LLM, so the tracer
+(tools/tracing.py) records its calls, token counts and time to first token.
+"""
+import json
+import time
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+
+# Tool name -> Action Input; {country} is replaced with FakeLLM.country
+TOOL_INPUTS = {
+    "WorldBankApiTool": {"input_string": "IN:NY.GDP.MKTP.CD"},
+    "GoogleSearchTool": {"query": "{country} latest news"},
+    "NewsApiTool": {"query": "{country}"},
+    "TwitterSentimentTool": {"query": "{country}"},
+    "GlobalTerrorismDatabaseTool": {"country": "{country}"},
+    "ClimateApiTool": {"country": "{country}"},
+}
+
+FINAL_ANSWER = {"score": 60, "confidence": 0.8, "explanation": "Offline benchmark answer.", "sources": []}
+
+
+class FakeLLM(BaseLLM):
+    country: str = "India"
+    # Simulated generation time per call, in seconds
+    latency: float = 0.0
+    prompt_tokens: int = 120
+    completion_tokens: int = 30
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs):
+        with llm_call_context():
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            answer = self._answer(messages, from_task, from_agent)
+            if self.latency:
+                time.sleep(self.latency)
+            self._emit_stream_chunk_event(chunk=answer, from_task=from_task, from_agent=from_agent)
+            self._emit_call_completed_event(
+                response=answer, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent,
+                messages=messages,
+                usage={"prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens},
+            )
+            return answer
+
+    def _answer(self, messages, task, agent) -> str:
+        if task is not None and (task.name or "").endswith("fetch_data") and agent is not None:
+            # Each tool call so far is an assistant turn holding its Action
+            used = 0 if isinstance(messages, str) else sum(
+                m.get("role") == "assistant" and "Action:" in str(m.get("content", "")) for m in messages
+            )
+            names = [tool.name for tool in agent.tools or [] if tool.name in TOOL_INPUTS]
+            if used < len(names):
+                name = names[used]
+                arguments = {k: v.replace("{country}", self.country) for k, v in TOOL_INPUTS[name].items()}
+                return f"Thought: I need data from {name}\nAction: {name}\nAction Input: {json.dumps(arguments)}"
+        return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(FINAL_ANSWER)}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
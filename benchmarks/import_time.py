@@ -0,0 +1,71 @@
+"""
+Import-time regression check for crew_grisp.
+
+Runs `python -X importtime -c "import crew_grisp"` in a fresh interpreter, reports the
+cumulative import time of crew_grisp and fails (exit code 1) when it exceeds the budget or
+when a heavy dependency is imported eagerly.
+
+    python benchmarks/import_time.py [--budget-ms 500] [--module crew_grisp]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a tool or crew is actually needed
+HEAVY_MODULES = ("crewai", "pandas", "nltk", "torch", "litellm")
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def measure(module):
+    """Returns (cumulative import time of `module` in ms, heavy modules it pulled in)."""
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(4) == module:
+            cumulative_us = int(match.group(2))
+    if cumulative_us is None:
+        raise RuntimeError(f"No importtime entry for '{module}':\n{result.stderr[-2000:]}")
+
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative_us / 1000, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="crew_grisp")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("GRISP_IMPORT_BUDGET_MS", "500")))
+    args = parser.parse_args()
+
+    elapsed_ms, heavy = measure(args.module)
+    print(f"import {args.module}: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if elapsed_ms > args.budget_ms:
+        failures.append(f"import took {elapsed_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
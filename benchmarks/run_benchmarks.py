@@ -0,0 +1,296 @@
+"""
+Offline benchmark suite: every tool and the full pipeline, with no network and no API keys.
+
+- GTD / ND-GAIN: synthetic workbooks of each requested size (benchmarks/synthetic_data.py)
+- World Bank, NewsAPI, Google CSE, Twitter: recorded fixtures served by a local stub
+  (benchmarks/stub_server.py); the HTTP cache is off so every query reaches the stub
+- LLM: a deterministic fake (benchmarks/fake_llm.py)
+
+For each size it measures, in fresh interpreters inside a scratch folder:
+- tool cold start, twice: with an empty cache (Excel conversion) and with the cache built
+- per-query latency (p50 / p95) of every tool
+- peak memory (max RSS) of the tools process
+- end-to-end `callCrew(country).kickoff()` time in parallel mode
+
+Results are compared with benchmarks/baseline.json; a metric more than --tolerance slower than
+its baseline (and at least --min-delta-ms) is a regression and the exit code is 1. Timings are
+machine-specific: store a baseline with --save-baseline on the machine that runs the comparison.
+
+    python benchmarks/run_benchmarks.py [--rows 10000,100000] [--queries 20] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_ROOT, BENCH_DIR]
+
+from stub_server import StubServer  # noqa: E402
+import synthetic_data  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Countries the per-query loop cycles through (all present in the synthetic workbooks)
+QUERY_COUNTRIES = ["India", "Pakistan", "Nigeria", "France", "Brazil"]
+
+# Tool name -> function(country) -> the `_run` arguments of one query
+TOOL_QUERIES = {
+    "GlobalTerrorismDatabaseTool": lambda c: {"country": c},
+    "ClimateApiTool": lambda c: {"country": c},
+    "WorldBankApiTool": lambda c: {"input_string": "IN:NY.GDP.MKTP.CD"},
+    "NewsApiTool": lambda c: {"query": c},
+    "GoogleSearchTool": lambda c: {"query": f"{c} economy"},
+    "TwitterSentimentTool": lambda c: {"query": c},
+}
+
+# Settings for the measured processes: offline, no caches between queries, no agent memory
+CHILD_ENV = {
+    "GRISP_HTTP_CACHE": "off",
+    "GRISP_TASK_CACHE": "off",
+    "GRISP_MEMORY": "off",
+    "GRISP_PARALLEL": "1",
+    "GRISP_TWEET_BUDGET": "500",
+    "GEMINI_API_KEY": "offline",
+    "NEWSAPI_KEY": "offline",
+    "GOOGLE_API_KEY": "offline",
+    "GOOGLE_CX_ID": "offline",
+    "TWITTER_BEARER_TOKEN": "offline",
+    "CREWAI_DISABLE_TELEMETRY": "true",
+    "OTEL_SDK_DISABLED": "true",
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# --- measured processes ------------------------------------------------------------------
+
+def bench_tools(queries: int) -> dict:
+    """Cold start and per-query latency of every tool, in the current folder."""
+    # crewai and pandas are shared by every tool; import them first so each cold start below
+    # is the tool's own module import and data load
+    start = time.perf_counter()
+    import pandas  # noqa: F401
+    from tools.base import GrispTool  # noqa: F401
+    from tools.registry import LazyToolMap
+    results = {"imports_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    tools = LazyToolMap()
+    for name, make_args in TOOL_QUERIES.items():
+        start = time.perf_counter()
+        tool = tools[name]
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        latencies, errors = [], 0
+        for i in range(queries):
+            arguments = make_args(QUERY_COUNTRIES[i % len(QUERY_COUNTRIES)])
+            start = time.perf_counter()
+            output = tool._run(**arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += isinstance(output, str) and output.lower().startswith(("error", "network", "an unexpected"))
+        results[name] = {
+            "cold_ms": round(cold_ms, 2),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "errors": errors,
+        }
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+
+def bench_pipeline(country: str) -> dict:
+    """Wall time of callCrew(country).kickoff() with the fake LLM."""
+    from tools.fact_store import FactStore, use_fact_store
+    from fake_llm import FakeLLM
+    import crew_grisp
+
+    fake = FakeLLM(model="fake", country=country)
+    crew_grisp._llm = fake
+    # Every model tier runs on the same fake
+    crew_grisp.get_llm = lambda tier=None, reasoning_effort=None: fake
+    start = time.perf_counter()
+    crew = crew_grisp.callCrew(country, parallel=True, reuse=False)
+    build_ms = (time.perf_counter() - start) * 1000
+    with use_fact_store(FactStore(country)) as facts:
+        start = time.perf_counter()
+        crew.kickoff()
+        kickoff_ms = (time.perf_counter() - start) * 1000
+    return {
+        "build_ms": round(build_ms, 2),
+        "kickoff_ms": round(kickoff_ms, 2),
+        "facts": len(facts),
+        "factors_scored": len(getattr(crew, "factor_scores", None) or {}),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def child_main(mode: str, queries: int, country: str, result_path: str):
+    import contextlib
+    import io
+
+    # crewai and the tools print a lot (some of it at exit), so the result goes to a file
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = bench_tools(queries) if mode == "tools" else bench_pipeline(country)
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+
+# --- orchestration -----------------------------------------------------------------------
+
+def make_workdir(rows: int) -> str:
+    """Scratch folder with the agent/task YAMLs and synthetic workbooks of `rows` rows."""
+    workdir = tempfile.mkdtemp(prefix=f"grisp-bench-{rows}-")
+    for folder in ("agents", "tasks"):
+        os.symlink(os.path.join(REPO_ROOT, folder), os.path.join(workdir, folder))
+    synthetic_data.install(rows, os.path.join(workdir, "data", "static_reports"))
+    return workdir
+
+
+def run_child(mode: str, workdir: str, env: dict, args) -> dict:
+    result_path = os.path.join(workdir, f"{mode}.result.json")
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--result", result_path,
+               "--queries", str(args.queries), "--country", args.country]
+    result = subprocess.run(
+        command, cwd=workdir, env={**os.environ, **CHILD_ENV, **env, "PYTHONPATH": REPO_ROOT},
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{mode} benchmark failed:\n{result.stderr[-3000:]}")
+    with open(result_path) as f:
+        return json.load(f)
+
+
+def run_suite(args) -> dict:
+    results = {}
+    with StubServer(latency_ms=args.latency_ms) as stub:
+        for rows in args.rows:
+            print(f"▶ {rows:,} rows: generating workbooks…", flush=True)
+            workdir = make_workdir(rows)
+            try:
+                size = {}
+                print("  tools (empty cache)…", flush=True)
+                size["convert"] = run_child("tools", workdir, stub.env(), args)
+                print("  tools (cached)…", flush=True)
+                size["cached"] = run_child("tools", workdir, stub.env(), args)
+                if not args.skip_pipeline:
+                    print("  pipeline…", flush=True)
+                    size["pipeline"] = run_child("pipeline", workdir, stub.env(), args)
+                results[str(rows)] = size
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """{"10000": {"cached": {"ClimateApiTool": {"p50_ms": 1.2}}}} -> {"10000/cached/ClimateApiTool/p50_ms": 1.2}"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """The timing/memory metrics that got worse than the baseline by more than the tolerance."""
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for key, before in previous.items():
+        after = current.get(key)
+        if after is None or not key.endswith(("_ms", "_mb")) or not before:
+            continue
+        floor = min_delta_ms if key.endswith("_ms") else 0
+        if after > before * (1 + tolerance) and after - before > floor:
+            regressions.append((key, before, after))
+    return regressions
+
+
+def print_table(results: dict):
+    for rows, size in results.items():
+        print(f"\n### {int(rows):,} rows\n")
+        print("| Tool | Cold start, convert (ms) | Cold start, cached (ms) | p50 (ms) | p95 (ms) | Errors |")
+        print("|---|---:|---:|---:|---:|---:|")
+        for name in TOOL_QUERIES:
+            convert, cached = size["convert"][name], size["cached"][name]
+            print(f"| {name} | {convert['cold_ms']:,.1f} | {cached['cold_ms']:,.1f} | "
+                  f"{cached['p50_ms']:,.2f} | {cached['p95_ms']:,.2f} | {cached['errors']} |")
+        print(f"\nPeak memory: {size['convert']['peak_rss_mb']:,.0f} MB converting, "
+              f"{size['cached']['peak_rss_mb']:,.0f} MB cached")
+        if "pipeline" in size:
+            pipeline = size["pipeline"]
+            print(f"Pipeline: callCrew {pipeline['build_ms']:,.0f} ms, kickoff {pipeline['kickoff_ms']:,.0f} ms "
+                  f"({pipeline['factors_scored']} factors scored, {pipeline['facts']} facts, peak {pipeline['peak_rss_mb']:,.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,100000", help="comma-separated workbook sizes")
+    parser.add_argument("--queries", type=int, default=20, help="queries per tool")
+    parser.add_argument("--country", default="India")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated network latency of the stub")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. the baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--child", choices=("tools", "pipeline"), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child_main(args.child, args.queries, args.country, args.result)
+
+    args.rows = [int(r) for r in args.rows.split(",") if r.strip()]
+    results = run_suite(args)
+    print_table(results)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d_%H%M%S") + ".json")
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to store one.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) vs. {args.baseline}:")
+        for key, before, after in regressions:
+            print(f"  {key}: {before:,.2f} -> {after:,.2f}")
+        sys.exit(1)
+    print(f"\n✅ No regressions vs. {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
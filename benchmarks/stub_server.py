@@ -0,0 +1,211 @@
+"""
+Local HTTP stub that replays the recorded API fixtures in benchmarks/fixtures/.
+
+Each fixture file is one source (worldbank, newsapi, google, twitter) served under /<source>/,
+so pointing a tool at the stub is just a base-URL change:
+
+    WORLD_BANK_API_URL=http://127.0.0.1:<port>/worldbank
+    NEWSAPI_URL=http://127.0.0.1:<port>/newsapi
+    GOOGLE_CSE_URL=http://127.0.0.1:<port>/google
+    TWITTER_SEARCH_URL=http://127.0.0.1:<port>/twitter
+
+A fixture is {"source": ..., "routes": [...]}. A route matches on its `path` (fnmatch pattern,
+relative to the source) and on `params` (every listed query parameter must be equal); the first
+matching route answers with `status` (default 200) and `body`. Twitter routes list recorded
+`tweets` instead, replayed as `pages` pages linked by meta.next_token the way the v2 search API
+pages its results.
+
+    python benchmarks/stub_server.py [--port 8765] [--latency-ms 0]
+    python benchmarks/stub_server.py --record worldbank   # refresh a fixture from the live API
+"""
+import argparse
+import fnmatch
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Live endpoints, used by --record
+UPSTREAMS = {
+    "worldbank": "https://api.worldbank.org/v2",
+    "newsapi": "https://newsapi.org/v2/everything",
+    "google": "https://www.googleapis.com/customsearch/v1",
+    "twitter": "https://api.twitter.com/2/tweets/search/recent",
+}
+
+# Query parameters that hold credentials; never written into a fixture
+SECRET_PARAMS = ("apiKey", "api_key", "key", "cx", "token")
+
+
+def load_fixtures(folder: str = FIXTURES_DIR) -> Dict[str, dict]:
+    fixtures = {}
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(".json"):
+            with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            fixtures[data["source"]] = data
+    return fixtures
+
+
+def match_route(fixture: dict, path: str, params: dict) -> Optional[dict]:
+    for route in fixture["routes"]:
+        if not fnmatch.fnmatchcase(path, route.get("path") or ""):
+            continue
+        if all(str(params.get(k)) == str(v) for k, v in (route.get("params") or {}).items()):
+            return route
+    return None
+
+
+def tweet_copy(text: str, i: int, vocabulary: List[str], words: int = 10) -> str:
+    """Copy i of a recorded tweet: its first half plus `words` words of the fixture, picked by i."""
+    head = text.split()
+    head = head[:max(1, len(head) // 2)]
+    return " ".join(head + random.Random(i).sample(vocabulary, min(words, len(vocabulary))))
+
+
+def tweet_page(route: dict, params: dict) -> dict:
+    """
+    One page of the recorded tweets, with unique ids and texts so deduplication keeps them. The
+    tools also drop near-duplicates (tools/dedupe.py), so copy i of a recorded tweet is its first
+    half plus words of the other recorded tweets: about as long as a real tweet, and as far from
+    the other copies as distinct tweets on one subject are.
+    """
+    page = int(params.get("next_token") or 0)
+    size = int(params.get("max_results") or 10)
+    tweets = route["tweets"]
+    vocabulary = sorted({w.strip(".,!?:;\"'()#@").lower() for t in tweets for w in t["text"].split()} - {""})
+    vocabulary = [w for w in vocabulary if len(w) > 3]
+    data = []
+    for i in range(page * size, (page + 1) * size):
+        tweet = tweets[i % len(tweets)]
+        data.append({"id": str(10**15 + i), "lang": tweet.get("lang", "en"), "text": tweet_copy(tweet["text"], i, vocabulary)})
+    meta = {"result_count": len(data)}
+    if page + 1 < route.get("pages", 1):
+        meta["next_token"] = str(page + 1)
+    return {"data": data, "meta": meta}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Set on the server class by serve()
+    fixtures: Dict[str, dict] = {}
+    latency = 0.0
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        source, _, path = parts.path.lstrip("/").partition("/")
+        params = dict(parse_qsl(parts.query))
+        fixture = self.fixtures.get(source)
+        route = match_route(fixture, "/" + path if path else "", params) if fixture else None
+
+        if self.latency:
+            time.sleep(self.latency)
+        if route is None:
+            return self._send(404, {"message": f"no fixture for {self.path}"})
+        body = tweet_page(route, params) if "tweets" in route else route.get("body")
+        self._send(route.get("status", 200), body)
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """The stub on a background thread. Use as a context manager; `url(source)` is a tool's base URL."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, fixtures: Optional[Dict[str, dict]] = None):
+        handler = type("Handler", (StubHandler,), {
+            "fixtures": fixtures if fixtures is not None else load_fixtures(),
+            "latency": latency_ms / 1000,
+        })
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="grisp-stub", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def url(self, source: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{source}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing every tool at this stub."""
+        return {
+            "WORLD_BANK_API_URL": self.url("worldbank"),
+            "NEWSAPI_URL": self.url("newsapi"),
+            "GOOGLE_CSE_URL": self.url("google"),
+            "TWITTER_SEARCH_URL": self.url("twitter"),
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def record(source: str, folder: str = FIXTURES_DIR):
+    """
+    Re-fetches every non-wildcard route of a fixture from the live API and stores the new bodies.
+    Credentials come from the usual environment variables and are stripped from the fixture.
+    """
+    import requests
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    path = os.path.join(folder, f"{source}.json")
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    secrets = {
+        "newsapi": {"apiKey": os.getenv("NEWSAPI_KEY")},
+        "google": {"key": os.getenv("GOOGLE_API_KEY"), "cx": os.getenv("GOOGLE_CX_ID")},
+    }.get(source, {})
+    headers = {"Authorization": f"Bearer {os.getenv('TWITTER_BEARER_TOKEN')}"} if source == "twitter" else {}
+
+    for route in fixture["routes"]:
+        if "*" in (route.get("path") or "") or "tweets" in route:
+            continue
+        params = {**(route.get("params") or {}), **secrets}
+        response = requests.get(UPSTREAMS[source] + (route.get("path") or ""), params=params, headers=headers, timeout=30)
+        route["status"] = response.status_code
+        route["body"] = response.json()
+        route["params"] = {k: v for k, v in params.items() if k not in SECRET_PARAMS}
+        print(f"{source}{route.get('path') or '/'}: {response.status_code}")
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, indent=1, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--record", metavar="SOURCE", choices=sorted(UPSTREAMS), help="refresh a fixture from the live API")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+    else:
+        with StubServer(args.port, args.latency_ms) as stub:
+            for name, value in stub.env().items():
+                print(f"{name}={value}")
+            try:
+                stub.thread.join()
+            except KeyboardInterrupt:
+                pass
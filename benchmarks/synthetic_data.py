@@ -0,0 +1,138 @@
+"""
+Synthetic GTD and ND-GAIN workbooks for the offline benchmarks.
+
+The real workbooks are large and not redistributable, so the benchmarks build look-alikes with
+the same sheet names and columns the tools read, at any size. Generation is seeded, and the
+files are kept under benchmarks/.cache/ keyed by (rows, seed) so repeated runs reuse them.
+
+    python benchmarks/synthetic_data.py --rows 100000 [--out data/static_reports]
+"""
+import argparse
+import os
+import random
+import shutil
+
+from openpyxl import Workbook
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+GTD_HEADER = ["eventid", "iyear", "imonth", "country_txt", "region_txt", "attacktype1_txt", "nkill", "nwound", "target1"]
+NDGAIN_HEADER = ["ISO3", "Country", "Year", "ND-GAIN Index", "Vulnerability", "Readiness"]
+
+# ISO3, name, region. The first entries carry most of the GTD events, like the real data.
+COUNTRIES = [
+    ("IND", "India", "South Asia"),
+    ("PAK", "Pakistan", "South Asia"),
+    ("AFG", "Afghanistan", "South Asia"),
+    ("IRQ", "Iraq", "Middle East & North Africa"),
+    ("NGA", "Nigeria", "Sub-Saharan Africa"),
+    ("COL", "Colombia", "South America"),
+    ("PHL", "Philippines", "Southeast Asia"),
+    ("TUR", "Turkey", "Middle East & North Africa"),
+    ("GBR", "United Kingdom", "Western Europe"),
+    ("USA", "United States", "North America"),
+    ("FRA", "France", "Western Europe"),
+    ("DEU", "Germany", "Western Europe"),
+    ("BRA", "Brazil", "South America"),
+    ("KEN", "Kenya", "Sub-Saharan Africa"),
+    ("IDN", "Indonesia", "Southeast Asia"),
+    ("JPN", "Japan", "East Asia"),
+    ("CHN", "China", "East Asia"),
+    ("RUS", "Russia", "Eastern Europe"),
+    ("ZAF", "South Africa", "Sub-Saharan Africa"),
+    ("MEX", "Mexico", "Central America & Caribbean"),
+]
+
+ATTACK_TYPES = ["Bombing/Explosion", "Armed Assault", "Assassination", "Hostage Taking", "Facility/Infrastructure Attack"]
+TARGETS = ["Civilians", "Police", "Military", "Government", "Business", "Transportation", "Religious Institution", "Unknown"]
+
+
+def _cached_path(kind: str, rows: int, seed: int) -> str:
+    return os.path.join(CACHE_DIR, f"{kind}_{rows}_{seed}.xlsx")
+
+
+def _save(workbook, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    workbook.save(tmp)
+    os.replace(tmp, path)
+
+
+def write_gtd(rows: int, seed: int = 0, path: str = None) -> str:
+    """A GTD-shaped workbook with `rows` events (first sheet). Returns its path."""
+    path = path or _cached_path("gtd", rows, seed)
+    if os.path.exists(path):
+        return path
+
+    rng = random.Random(seed)
+    # Zipf-ish weights so a few countries dominate
+    weights = [1 / (i + 1) for i in range(len(COUNTRIES))]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append(GTD_HEADER)
+    for i in range(rows):
+        _, country, region = rng.choices(COUNTRIES, weights)[0]
+        year = rng.randint(1990, 2024)
+        # Casualty counts are often missing in the real data
+        nkill = rng.choice((None, 0, 0, 1, 2, 3, 5, 10))
+        nwound = rng.choice((None, 0, 0, 1, 4, 8, 20))
+        sheet.append([
+            year * 10**8 + i, year, rng.randint(1, 12), country, region,
+            rng.choice(ATTACK_TYPES), nkill, nwound, rng.choice(TARGETS),
+        ])
+    _save(workbook, path)
+    return path
+
+
+def write_ndgain(rows: int, seed: int = 0, path: str = None) -> str:
+    """An ND-GAIN-shaped workbook (sheet 'ndgain') with about `rows` country/year rows. Returns its path."""
+    path = path or _cached_path("ndgain", rows, seed)
+    if os.path.exists(path):
+        return path
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("ndgain")
+    sheet.append(NDGAIN_HEADER)
+    # The named countries come first, then as many numbered ones as the row count needs
+    years = list(range(1995, 2023))
+    extra = max(0, -(-rows // len(years)) - len(COUNTRIES))
+    countries = COUNTRIES + [(f"X{i:02d}", f"Country {i}", "") for i in range(extra)]
+    written = 0
+    for iso3, name, _ in countries:
+        for year in years:
+            if written >= rows:
+                break
+            vulnerability = round(rng.uniform(0.25, 0.65), 3)
+            readiness = round(rng.uniform(0.2, 0.8), 3)
+            index = round((readiness - vulnerability + 1) * 50, 1)
+            sheet.append([iso3, name, year, index, vulnerability, readiness])
+            written += 1
+    _save(workbook, path)
+    return path
+
+
+def install(rows: int, out_dir: str, seed: int = 0):
+    """Links (or copies) synthetic gtd.xlsx and ndgain.xlsx of the given size into `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    ndgain_rows = min(rows, 50_000)  # ND-GAIN is a country x year table; it never gets GTD-sized
+    for name, source in (("gtd.xlsx", write_gtd(rows, seed)), ("ndgain.xlsx", write_ndgain(ndgain_rows, seed))):
+        target = os.path.join(out_dir, name)
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.symlink(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="also install the workbooks into this folder")
+    args = parser.parse_args()
+    print(write_gtd(args.rows, args.seed))
+    print(write_ndgain(min(args.rows, 50_000), args.seed))
+    if args.out:
+        install(args.rows, args.out, args.seed)
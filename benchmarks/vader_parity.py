@@ -0,0 +1,66 @@
+"""
+Parity check of the batch VADER scorer (tools/sentiment.py) against NLTK's own polarity_scores.
+
+VaderBackend reproduces VADER's rules as array operations over a whole batch; this scores a large
+randomized set of texts (lexicon words mixed with the words VADER's rules react to: boosters,
+negations, "but", "least", idioms, ALL CAPS, punctuation) both ways and fails (exit code 1) on any
+difference. Run it after upgrading nltk.
+
+    python benchmarks/vader_parity.py [--texts 20000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.sentiment import PARITY_TEXTS, VaderBackend  # noqa: E402
+
+RULE_WORDS = [
+    "not", "never", "isn't", "don't", "without", "nor", "so", "this", "but", "BUT", "least", "at", "very",
+    "kind", "of", "sort", "just", "enough", "kinda", "barely", "extremely", "EXTREMELY", "VERY", "really",
+    "the", "bomb", "shit", "yeah", "right", "bad", "ass", "cut", "mustard", "kiss", "death", "hand", "to", "mouth",
+    "!!!", "??", "?!?", ",", ":)", ":(", "a", "I", "...",
+]
+
+
+def random_texts(lexicon_words, n, seed):
+    rng = random.Random(seed)
+    texts = list(PARITY_TEXTS)
+    for _ in range(n):
+        words = [rng.choice(RULE_WORDS if rng.random() < 0.5 else lexicon_words) for _ in range(rng.randint(0, 30))]
+        words = [w.upper() if rng.random() < 0.1 else w for w in words]
+        # Punctuation glued to words, as in real text
+        words = [w + rng.choice(["!", "?", ",", ".", "!!", "'"]) if rng.random() < 0.1 else w for w in words]
+        texts.append(" ".join(words))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=20000, help="Random texts to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = VaderBackend()
+    if not backend.vectorized:
+        print("❌ The batch scorer is disabled with this NLTK version (see the warning above)")
+        return 1
+    texts = random_texts(sorted(backend.lexicon), args.texts, args.seed)
+
+    started = time.perf_counter()
+    mismatches = backend.parity_mismatches(texts)
+    print(f"Compared {len(texts):,} texts in {time.perf_counter() - started:.1f} s")
+    if mismatches:
+        print(f"❌ {len(mismatches)} text(s) score differently:")
+        for text, got, want in mismatches[:10]:
+            print(f"  {text!r}: batch {got}, polarity_scores {want}")
+        return 1
+    print("✅ batch scores match polarity_scores")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+crewai Task whose context is compacted to a token budget and backed by the memory store.
+
+crewai hands a task the raw outputs of its context tasks, joined together, so the synthesis
+tasks used to read every factor output verbatim. BudgetedTask instead builds its context from
+- the outputs of its context tasks, one labelled section each, and
+- the most relevant outputs of earlier runs for the same country and agent (memory_store.py),
+compacted together to `context_budget` tokens (tools/compaction.py). Its own output is saved to
+the memory store when it completes.
+
+A task routed to a model tier (`llm`, see route_llm in crew_grisp.py) runs its agent on that LLM
+for the duration of the task; crewai hands the agent's current LLM to its executor on every task.
+"""
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from crewai import Task
+from pydantic import Field
+
+from tools import tracing
+from tools.compaction import CONTEXT_TOKENS, compact_sections, estimate_tokens
+
+
+class BudgetedTask(Task):
+    country: Optional[str] = Field(default=None, description="Country the task analyzes, used to scope memory.")
+    context_budget: int = Field(default=CONTEXT_TOKENS, description="Token budget of the task's context (0 = unlimited).")
+    memory_store: Optional[Any] = Field(default=None, exclude=True, description="memory_store.MemoryStore, or None.")
+    # (tokens before, tokens after) of the last compaction, for tracing and reports
+    context_tokens: Optional[tuple] = Field(default=None, exclude=True)
+    llm: Optional[Any] = Field(default=None, exclude=True, description="LLM of the task's model tier, or None for the agent's.")
+    tier: Optional[str] = Field(default=None, description="Model tier the task runs on.")
+    reasoning_effort: Optional[str] = Field(default=None, description="Reasoning effort of that tier's LLM.")
+
+    def build_context(self, context: Optional[str]) -> Optional[str]:
+        sections = []
+        if isinstance(self.context, list):
+            sections += [
+                (task.name or task.description[:60], task.output.raw)
+                for task in self.context if task.output is not None
+            ]
+        elif context:
+            sections.append(("Context", context))
+
+        if self.memory_store is not None:
+            role = self.agent.role if self.agent is not None else None
+            for memory in self.memory_store.search(self.description, country=self.country, agent=role):
+                sections.append((f"Earlier run: {memory['task']}", memory["content"]))
+
+        if not sections:
+            return context
+        compacted = compact_sections(sections, self.context_budget)
+        self.context_tokens = (sum(estimate_tokens(text) for _, text in sections), estimate_tokens(compacted))
+        return compacted
+
+    def _remember(self, output):
+        if self.memory_store is not None and output is not None:
+            role = self.agent.role if self.agent is not None else None
+            self.memory_store.add(output.raw, country=self.country, agent=role, task=self.name)
+        return output
+
+    @contextmanager
+    def _routed(self, agent):
+        """Runs the agent on this task's tier LLM, and labels its LLM calls with the tier."""
+        agent = agent or self.agent
+        previous = agent.llm if agent is not None else None
+        if self.llm is not None and agent is not None:
+            agent.llm = self.llm
+        try:
+            with tracing.llm_labels(tier=self.tier, reasoning_effort=self.reasoning_effort):
+                yield
+        finally:
+            if self.llm is not None and agent is not None:
+                agent.llm = previous
+
+    # crewai's execute_sync/execute_async/aexecute_sync all end up in these two
+    def _execute_core(self, agent, context, tools):
+        with self._routed(agent):
+            return super()._execute_core(agent, context, tools)
+
+    async def _aexecute_core(self, agent, context, tools):
+        with self._routed(agent):
+            return await super()._aexecute_core(agent, context, tools)
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        return self._remember(super().execute_sync(agent, self.build_context(context), tools))
+
+    def execute_async(self, agent=None, context=None, tools=None):
+        future = super().execute_async(agent, self.build_context(context), tools)
+        future.add_done_callback(lambda f: f.exception() is None and self._remember(f.result()))
+        return future
+
+    async def aexecute_sync(self, agent=None, context=None, tools=None):
+        return self._remember(await super().aexecute_sync(agent, self.build_context(context), tools))
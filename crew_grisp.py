@@ -1,17 +1,22 @@
 import os
+import json
+import threading
+import contextvars
 import yaml
-from crewai import Agent, Task, Crew, LLM
-from tools.climate_api_tool import ClimateApiTool
-from tools.global_terrorism_database_scraper import GlobalTerrorismDatabaseTool
-from tools.google_search_tool import GoogleSearchTool
-from tools.twitter_sentiment_tool import TwitterSentimentTool
-from tools.world_bank_api import WorldBankApiTool
-from tools.news_api_tool import NewsApiTool
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from tools.registry import LazyToolMap
+from tools.fact_store import FactStore, current_fact_store, factor_scope, use_fact_store
+from tools import tracing
+import task_memo
 from dotenv import load_dotenv
 
+# crewai, pandas, nltk and the tool modules are heavy to import; they are loaded on first use
+# (inside the builders below and by TOOL_MAP) so importing this module stays fast.
+
 load_dotenv()
 
-llm = LLM(
+LLM_CONFIG = dict(
     model="gemini/gemini-2.5-flash-preview-04-17",
     api_key=os.getenv("GEMINI_API_KEY"),
     temperature=0.3,
@@ -19,70 +24,487 @@ llm = LLM(
     reasoning_effort="high"
 )
 
-# Tool map
-TOOL_MAP = {
-    "ClimateApiTool": ClimateApiTool(),
-    "GlobalTerrorismDatabaseTool": GlobalTerrorismDatabaseTool(),
-    "GoogleSearchTool": GoogleSearchTool(),
-    "TwitterSentimentTool": TwitterSentimentTool(),
-    "WorldBankApiTool": WorldBankApiTool(),
-    "NewsApiTool": NewsApiTool()
+# Model tiers an agent or task YAML can ask for with `tier:` (and optionally `reasoning_effort:`).
+# Each tier is LLM_CONFIG with these settings on top; GRISP_MODEL_<TIER> picks another model for it.
+# Cheap extraction/formatting steps (fetch_data, generate_summary) run on "fast", the scoring and
+# risk synthesis on "deep". GRISP_MODEL_TIERS=off runs every task on LLM_CONFIG as before.
+LLM_TIERS = {
+    "fast": dict(model=os.getenv("GRISP_MODEL_FAST") or LLM_CONFIG["model"], reasoning_effort="low"),
+    "standard": dict(model=os.getenv("GRISP_MODEL_STANDARD") or LLM_CONFIG["model"], reasoning_effort="medium"),
+    "deep": dict(model=os.getenv("GRISP_MODEL_DEEP") or LLM_CONFIG["model"], reasoning_effort="high"),
 }
+# Tier of tasks whose YAML (and agent YAML) declare none: the old single configuration
+DEFAULT_TIER = "deep"
+MODEL_TIERS = os.getenv("GRISP_MODEL_TIERS", "1").strip().lower() in ("1", "true", "on", "yes")
+
+_llm = None
+_tier_llms = {}
+_llm_lock = threading.Lock()
+
+def get_llm(tier=None, reasoning_effort=None):
+    """The shared LLM (LLM_CONFIG, or a tier of LLM_TIERS), created on first use."""
+    global _llm
+    with _llm_lock:
+        from crewai import LLM
+        if tier is None:
+            if _llm is None:
+                _llm = LLM(**LLM_CONFIG)
+            return _llm
+        key = (tier, reasoning_effort)
+        if key not in _tier_llms:
+            settings = dict(LLM_CONFIG, **LLM_TIERS[tier])
+            if reasoning_effort:
+                settings["reasoning_effort"] = reasoning_effort
+            _tier_llms[key] = LLM(**settings)
+        return _tier_llms[key]
+
+# Tool map: tools are constructed on first use, and only those some agent or task references
+TOOL_MAP = LazyToolMap()
+
+# Agents that combine the factor outputs. Every other agent is an independent factor agent.
+SYNTHESIZER_AGENTS = ("LliIndexAgent", "RiskSynthesizerAgent")
+
+# Task templates each factor agent runs (tasks with `agent: $AGENT_NAME`), in order,
+# followed by the synthesis tasks that need every factor's output.
+FACTOR_STAGES = ("fetch_data", "analyze_and_score", "generate_summary")
+SYNTHESIS_STAGES = ("compute_lli_index", "synthesize_risk")
+
+# Task descriptions mention the analyzed country as $COUNTRY
+COUNTRY_PLACEHOLDER = "$COUNTRY"
+
+# Parallel mode: how many factor chains may run at the same time
+MAX_CONCURRENCY = int(os.getenv("GRISP_MAX_CONCURRENCY", "4"))
 
-# Load Agents and map by name
-agent_map = {}
+# The LLI and risk numbers come from scoring.py. The synthesizer LLMs only write the narrative
+# around them, and can be switched off entirely with GRISP_LLM_NARRATIVE=0.
+LLM_NARRATIVE = os.getenv("GRISP_LLM_NARRATIVE", "1").strip().lower() in ("1", "true", "on", "yes")
+SCORING_CONFIG_PATH = os.getenv("GRISP_SCORING_CONFIG")
 
-def load_agents(folder="agents"):
-    agents = []
-    for file in os.listdir(folder):
+# Settings shared by every Crew we build. crewai's own memory is off: agent memory lives in the
+# SQLite store of memory_store.py, read and written by BudgetedTask (GRISP_MEMORY=off disables it).
+CREW_OPTIONS = dict(
+    memory=False,
+    verbose=True
+)
+
+@lru_cache(maxsize=None)
+def load_agent_specs(folder="agents"):
+    """Reads every agent YAML, keyed by the agent's name."""
+    specs = {}
+    for file in sorted(os.listdir(folder)):
         if file.endswith(".yaml"):
             with open(os.path.join(folder, file), "r") as f:
                 data = yaml.safe_load(f)
-                tools = [TOOL_MAP[t] for t in data.get("tools", [])]
-                agent = Agent(
-                    name=data["name"],
-                    role=data["role"],
-                    goal=data["goal"],
-                    backstory=data["backstory"],
-                    tools=tools,
-                    memory=True,
-                    verbose=True
-                )
-                agents.append(agent)
-                agent_map[data["name"]] = agent
-    return agents
-
-def load_tasks(folder="tasks"):
-    tasks = []
-    for file in os.listdir(folder):
+                specs[data["name"]] = data
+    return specs
+
+def build_agents(agent_specs):
+    """
+    Creates a fresh Agent per spec. Agents hold per-run executor state, so every run builds its
+    own set; the tools in TOOL_MAP are shared.
+    """
+    from crewai import Agent
+    agent_map = {}
+    for name, data in agent_specs.items():
+        agent_map[name] = Agent(
+            name=name,
+            role=data["role"],
+            goal=data["goal"],
+            backstory=data["backstory"],
+            tools=[TOOL_MAP[t] for t in data.get("tools") or []],
+            llm=get_llm(),
+            memory=False,
+            verbose=True
+        )
+    return agent_map
+
+@lru_cache(maxsize=None)
+def load_task_specs(folder="tasks"):
+    """Reads every task YAML, keyed by file name without extension (e.g. 'fetch_data')."""
+    specs = {}
+    for file in sorted(os.listdir(folder)):
         if file.endswith(".yaml"):
             with open(os.path.join(folder, file), "r") as f:
-                data = yaml.safe_load(f)
-                agent_name = data["agent"]
-                task = Task(
-                    description=data["description"],
-                    agent=agent_map.get(agent_name),
-                    expected_output=data["expected_output"],
-                    tools=[TOOL_MAP[t] for t in data.get("tools", [])],
-                    verbose=True
-                )
-                tasks.append(task)
+                specs[os.path.splitext(file)[0]] = yaml.safe_load(f)
+    return specs
+
+def resolve_agent(ref, agent_map):
+    # A task's 'agent' field may hold either the agent's name or its role
+    if ref in agent_map:
+        return agent_map[ref]
+    for agent in agent_map.values():
+        if agent.role == ref:
+            return agent
+    return None
+
+def fill_country(text, country):
+    return text.replace(COUNTRY_PLACEHOLDER, country or "the target country")
+
+def agent_spec(agent):
+    """The YAML spec of a built Agent (matched by role), or {}."""
+    for data in load_agent_specs().values():
+        if agent is not None and data["role"] == agent.role:
+            return data
+    return {}
+
+def context_budget(agent):
+    """Token budget for a task's context: the agent YAML's `context_tokens`, else GRISP_CONTEXT_TOKENS."""
+    from tools.compaction import CONTEXT_TOKENS
+    return int(agent_spec(agent).get("context_tokens", CONTEXT_TOKENS))
+
+def route_llm(spec, agent):
+    """
+    (tier, reasoning_effort) a task runs with: the task YAML's `tier`/`reasoning_effort`, else its
+    agent YAML's, else DEFAULT_TIER with that tier's effort. (None, None) when tiering is off.
+    """
+    if not MODEL_TIERS:
+        return None, None
+    data = agent_spec(agent)
+    tier = spec.get("tier") or data.get("tier") or DEFAULT_TIER
+    if tier not in LLM_TIERS:
+        print(f"⚠️ Unknown model tier '{tier}', using '{DEFAULT_TIER}'. Known tiers: {', '.join(LLM_TIERS)}")
+        tier = DEFAULT_TIER
+    return tier, spec.get("reasoning_effort") or data.get("reasoning_effort") or LLM_TIERS[tier]["reasoning_effort"]
+
+def build_task(name, spec, agent, country=None, context=None):
+    # Earlier task outputs and recalled memories reach the LLM compacted to the agent's budget
+    from budgeted_task import BudgetedTask
+    from memory_store import get_memory_store
+    tier, reasoning_effort = route_llm(spec, agent)
+    return BudgetedTask(
+        name=name,
+        description=fill_country(spec["description"], country),
+        agent=agent,
+        expected_output=fill_country(spec["expected_output"], country),
+        tools=[TOOL_MAP[t] for t in spec.get("tools") or []],
+        context=context,
+        country=country,
+        context_budget=context_budget(agent),
+        memory_store=get_memory_store(),
+        # The agent runs this task on its tier's LLM (None: the agent's own)
+        llm=get_llm(tier, reasoning_effort) if tier else None,
+        tier=tier,
+        reasoning_effort=reasoning_effort,
+        verbose=True
+    )
+
+def build_factor_tasks(factor, agent, task_specs, country=None):
+    """The fetch -> analyze -> summarize chain for one factor agent. Tasks are named '<factor>.<stage>'."""
+    return [
+        build_task(f"{factor}.{stage}", task_specs[stage], agent, country)
+        for stage in FACTOR_STAGES if stage in task_specs
+    ]
+
+def with_facts(spec, facts_json):
+    """Task spec whose description carries the factor's typed tool records as compact JSON."""
+    if not facts_json or facts_json == "[]":
+        return spec
+    return dict(spec, description=(
+        f"{spec['description']}\n\n"
+        "Exact values returned by the data tools for this factor (use these numbers rather than "
+        "re-reading them from the text above):\n"
+        f"{facts_json}"
+    ))
+
+def build_synthesis_tasks(task_specs, agent_map, factor_tasks, country=None, scores=None):
+    """
+    Synthesis tasks read the outputs of every factor task handed in as context.
+    When `scores` (from scoring.py) are given they are pinned in the description, so the LLM
+    explains those numbers instead of recomputing them.
+    """
+    tasks = []
+    for stage in SYNTHESIS_STAGES:
+        if stage not in task_specs:
+            continue
+        spec = task_specs[stage]
+        if scores is not None:
+            spec = dict(spec, description=(
+                f"{spec['description']}\n\n"
+                "These scores were computed deterministically from the factor scores. Use these exact values "
+                "in your answer; explain what drove them rather than recomputing them:\n"
+                f"{json.dumps(scores, indent=2)}"
+            ))
+        tasks.append(build_task(stage, spec, resolve_agent(spec["agent"], agent_map), country, context=list(factor_tasks)))
     return tasks
 
-# Load agents and tasks
-agents = load_agents("agents")
-tasks = load_tasks("tasks")
+def factor_scores_from_outputs(task_outputs):
+    """{factor: {"score", "confidence", ...}} parsed from the '<factor>.analyze_and_score' task outputs."""
+    import scoring
+    suffix = ".analyze_and_score"
+    return {
+        output.name[:-len(suffix)]: scoring.extract_json(output.raw)
+        for output in task_outputs
+        if output is not None and output.name and output.name.endswith(suffix)
+    }
+
+def score_factors(factor_scores):
+    """Deterministic LLI / risk scores for one country's {factor: {"score", "confidence"}}."""
+    import scoring
+    return scoring.score_country(factor_scores, scoring.load_weights(SCORING_CONFIG_PATH))
+
+def score_outputs(task_outputs):
+    return score_factors(factor_scores_from_outputs(task_outputs))
+
+
+class ScoredOutput:
+    """Result of a parallel run without LLM narrative: the engine's scores plus every factor task output."""
+
+    def __init__(self, scores, tasks_output, facts=None, raw=None):
+        self.scores = scores
+        self.tasks_output = tasks_output
+        self.facts = facts
+        # A reused synthesis narrative stands in for the scores JSON
+        self.raw = raw if raw is not None else json.dumps(scores, indent=2)
+
+    def __str__(self):
+        return self.raw
+
+def referenced_tools(agents_folder="agents", tasks_folder="tasks"):
+    """Names of the tools some agent or task YAML actually uses."""
+    names = []
+    for spec in list(load_agent_specs(agents_folder).values()) + list(load_task_specs(tasks_folder).values()):
+        names += spec.get("tools") or []
+    return list(dict.fromkeys(names))
+
+def factor_agent_names(agent_map):
+    return [name for name in agent_map if name not in SYNTHESIZER_AGENTS]
+
+def model_fingerprint():
+    """The LLM settings that affect its answers (no API key), tiers included."""
+    base = {k: v for k, v in LLM_CONFIG.items() if k not in ("api_key", "stream")}
+    return [base, LLM_TIERS, DEFAULT_TIER] if MODEL_TIERS else base
+
+def agent_fingerprint(agent):
+    data = agent_spec(agent)
+    return [agent.role, agent.goal, agent.backstory, sorted(tool.name for tool in agent.tools or []), context_budget(agent),
+            data.get("tier"), data.get("reasoning_effort")]
+
+
+class ParallelCrew:
+    """
+    Runs every factor agent's fetch/analyze/summarize chain as its own small Crew on a thread
+    pool (at most `max_concurrency` at a time), then runs the synthesis tasks once all factor
+    outputs are in. Wall-clock time approaches the slowest factor instead of the sum of all of them.
+
+    The tools' typed records land in `facts` (the caller's current FactStore, or a new one), and each
+    factor's analyze/summarize tasks get that factor's records as JSON instead of re-parsing prose.
+
+    With a TaskMemo (task_memo.py), factors whose prompts and replayed tool outputs are unchanged
+    since an earlier run reuse that run's task outputs; `stage_status` says which stages were
+    reused. reuse=False recomputes everything but still refreshes the memo.
+
+    `task_callback(task_output)` is called as each task completes (reused ones included), e.g. to
+    stream the report (report_stream.py).
+    """
+
+    def __init__(self, agent_map, task_specs, country=None, max_concurrency=MAX_CONCURRENCY, narrative=LLM_NARRATIVE,
+                 memo=None, reuse=True, task_callback=None):
+        self.agent_map = agent_map
+        self.task_specs = task_specs
+        self.country = country
+        self.max_concurrency = max(1, max_concurrency)
+        self.narrative = narrative
+        self.memo = memo
+        self.reuse = reuse
+        self.task_callback = task_callback
+        self.factor_outputs = {}
+        self.failed_factors = {}
+        self.factor_scores = {}
+        self.scores = None
+        self.facts = None
+        # Task name -> "reused" or "ran"
+        self.stage_status = {}
+
+    def _factor_stages(self):
+        return [stage for stage in FACTOR_STAGES if stage in self.task_specs]
+
+    def _factor_slot(self, name, agent):
+        prompt_digest = task_memo.digest([
+            agent_fingerprint(agent),
+            [self.task_specs[stage] for stage in self._factor_stages()],
+            model_fingerprint(),
+        ])
+        return self.memo.slot(name, self.country, prompt_digest)
+
+    def _reuse_factor(self, name, agent):
+        """The factor's tasks with their stored outputs, if its prompts and data are unchanged; else None."""
+        slot = self._factor_slot(name, agent)
+        previous_calls = self.memo.last_calls(slot)
+        if previous_calls is None:
+            return None
+
+        # Replay the previous tool calls into a scratch store and compare what they return now
+        replay = FactStore(self.country)
+        try:
+            with use_fact_store(replay), factor_scope(name):
+                for call in previous_calls:
+                    TOOL_MAP[call["tool"]]._run(**call["arguments"])
+        except Exception as e:
+            print(f"⚠️ Could not replay the tool calls of {name}, running it again: {e}")
+            return None
+        entry = self.memo.get(task_memo.digest([slot, task_memo.calls_signature(replay.calls())]))
+        if entry is None:
+            return None
+
+        self.facts.merge(replay)
+        tasks = []
+        for stage, output in zip(self._factor_stages(), entry["outputs"]):
+            task = build_task(f"{name}.{stage}", self.task_specs[stage], agent, self.country)
+            task.output = task_memo.load_output(output)
+            tasks.append(task)
+        return tasks
+
+    def _remember_factor(self, name, agent, tasks):
+        slot = self._factor_slot(name, agent)
+        calls = self.facts.calls(factor=name)
+        self.memo.put(task_memo.digest([slot, task_memo.calls_signature(calls)]),
+                      [task_memo.dump_output(task.output) for task in tasks])
+        self.memo.remember_calls(slot, calls)
+
+    def _run_factor(self, name):
+        agent = self.agent_map[name]
+        with tracing.span(name, "factor") as span:
+            if self.memo is not None and self.reuse:
+                tasks = self._reuse_factor(name, agent)
+                if tasks is not None:
+                    self.stage_status.update((task.name, "reused") for task in tasks)
+                    span.set(reused=True)
+                    self._completed(task.output for task in tasks)
+                    return tasks
+
+            tasks = self._execute_factor(name, agent)
+            self.stage_status.update((task.name, "ran") for task in tasks)
+            if self.memo is not None:
+                self._remember_factor(name, agent, tasks)
+            return tasks
+
+    def _completed(self, outputs):
+        # Tasks that did not run through a Crew (reused ones) still reach the callback
+        if self.task_callback is not None:
+            for output in outputs:
+                self.task_callback(output)
+
+    def _execute_factor(self, name, agent):
+        from crewai import Crew
+        stages = self._factor_stages()
+        with factor_scope(name):
+            # Fetch first, so the later stages can be handed the records the tools produced
+            fetch = build_task(f"{name}.{stages[0]}", self.task_specs[stages[0]], agent, self.country)
+            Crew(agents=[agent], tasks=[fetch], task_callback=self.task_callback, **CREW_OPTIONS).kickoff()
+
+            tasks = [fetch]
+            facts_json = self.facts.to_prompt(factor=name)
+            for stage in stages[1:]:
+                spec = with_facts(self.task_specs[stage], facts_json)
+                tasks.append(build_task(f"{name}.{stage}", spec, agent, self.country, context=list(tasks)))
+            if len(tasks) > 1:
+                Crew(agents=[agent], tasks=tasks[1:], task_callback=self.task_callback, **CREW_OPTIONS).kickoff()
+        return tasks
+
+    def kickoff(self):
+        # An empty store is falsy (len 0), so test for None explicitly
+        store = current_fact_store()
+        self.facts = store if store is not None else FactStore(self.country)
+        with use_fact_store(self.facts):
+            return self._kickoff()
+
+    def _kickoff(self):
+        completed_tasks = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="grisp-factor") as pool:
+            # Each worker runs in a copy of the caller's context so context-local run state follows it
+            futures = {
+                pool.submit(contextvars.copy_context().run, self._run_factor, name): name
+                for name in factor_agent_names(self.agent_map)
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    tasks = future.result()
+                except Exception as e:
+                    # One failing factor shouldn't sink the others; synthesis works with what completed
+                    print(f"⚠️ Factor {name} failed: {e}")
+                    self.failed_factors[name] = str(e)
+                    continue
+                self.factor_outputs[name] = [task.output for task in tasks]
+                completed_tasks.extend(tasks)
+
+        if not completed_tasks:
+            raise RuntimeError("Every factor chain failed; nothing to synthesize.")
+
+        # LLI and risk are computed here, without an LLM call
+        factor_task_outputs = [task.output for task in completed_tasks]
+        self.factor_scores = factor_scores_from_outputs(factor_task_outputs)
+        self.scores = score_factors(self.factor_scores)
+        if not self.narrative:
+            return ScoredOutput(self.scores, factor_task_outputs, self.facts)
+
+        from crewai import Crew
+        synthesis_tasks = build_synthesis_tasks(self.task_specs, self.agent_map, completed_tasks, self.country, self.scores)
+        synthesis_agents = [task.agent for task in synthesis_tasks if task.agent is not None]
+
+        # The narrative only depends on its prompts and the factor outputs it reads
+        synthesis_key = None
+        if self.memo is not None:
+            synthesis_key = task_memo.digest([
+                self.country,
+                [(task.description, task.tier, task.reasoning_effort) for task in synthesis_tasks],
+                [agent_fingerprint(agent) for agent in synthesis_agents],
+                model_fingerprint(),
+                sorted((task.name, task.output.raw) for task in completed_tasks),
+            ])
+            entry = self.memo.get(synthesis_key) if self.reuse else None
+            if entry is not None:
+                outputs = [task_memo.load_output(output) for output in entry["outputs"]]
+                self.stage_status.update((output.name, "reused") for output in outputs)
+                self._completed(outputs)
+                return ScoredOutput(self.scores, outputs, self.facts, raw=outputs[-1].raw if outputs else None)
+
+        crew = Crew(agents=synthesis_agents, tasks=synthesis_tasks, output_file="reports/final_report.md",
+                    task_callback=self.task_callback, **CREW_OPTIONS)
+        output = crew.kickoff()
+        self.stage_status.update((task.name, "ran") for task in synthesis_tasks)
+        if synthesis_key is not None:
+            self.memo.put(synthesis_key, [task_memo.dump_output(task.output) for task in synthesis_tasks])
+        return output
+
 
 # Create Crew
-def callCrew():
+def callCrew(country=None, parallel=None, max_concurrency=None, narrative=None, reuse=True, task_callback=None):
+    """
+    Returns an object with a kickoff() method analyzing `country`.
+    parallel=True (or GRISP_PARALLEL=1) runs the factor chains concurrently and scores them with
+    scoring.py, using the synthesizer LLMs only for the narrative (narrative=False skips them).
+    Otherwise one sequential Crew runs every factor chain and then the synthesis tasks;
+    score_outputs() can score its output afterwards.
+    In parallel mode, stages whose inputs are unchanged since an earlier run are reused from the
+    task memo (task_memo.py) unless reuse=False or GRISP_TASK_CACHE=off.
+    `task_callback(task_output)` is called as each task completes.
+    """
+    from crewai import Crew
+
+    # Agent and task YAMLs are parsed once per process; Agent/Task objects are built per run
+    agent_map = build_agents(load_agent_specs("agents"))
+    task_specs = load_task_specs("tasks")
+
+    if parallel is None:
+        parallel = os.getenv("GRISP_PARALLEL", "0").strip().lower() in ("1", "true", "on", "yes")
+    if parallel:
+        return ParallelCrew(agent_map, task_specs, country, max_concurrency or MAX_CONCURRENCY,
+                            LLM_NARRATIVE if narrative is None else narrative,
+                            memo=task_memo.TaskMemo() if task_memo.cache_enabled() else None, reuse=reuse,
+                            task_callback=task_callback)
+
+    factor_tasks = []
+    for name in factor_agent_names(agent_map):
+        factor_tasks += build_factor_tasks(name, agent_map[name], task_specs, country)
+    tasks = factor_tasks + build_synthesis_tasks(task_specs, agent_map, factor_tasks, country)
+
     crew = Crew(
-        agents=agents,
+        agents=list(agent_map.values()),
         tasks=tasks,
-        memory=True,
-        memory_path="memory/shared_memory.json",
         output_file="reports/final_report.md",
-        verbose=True,
-        llm=llm
+        task_callback=task_callback,
+        **CREW_OPTIONS
     )
 
-    return crew
\ No newline at end of file
+    return crew
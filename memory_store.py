@@ -0,0 +1,162 @@
+"""
+Agent memory: task outputs from earlier runs in an indexed SQLite (FTS5) store.
+
+Replaces crewai's built-in memory and its single growing JSON file. Every completed task's
+output is saved with its country, agent and task name (identical outputs are stored once);
+before a task runs, the few most relevant earlier outputs for the same country and agent are
+looked up by full-text search (BM25) and added to its context, inside the task's token budget
+(see budgeted_task.py).
+
+    memory/grisp_memory.sqlite
+
+Set GRISP_MEMORY=off to disable, GRISP_MEMORY_MAX_AGE_DAYS to bound what is kept (default 30).
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+MEMORY_DB_PATH = "memory/grisp_memory.sqlite"
+
+# Earlier outputs handed to one task
+RECALL_LIMIT = 3
+
+# Words too common in the task prompts to help the search
+_STOPWORDS = frozenset(
+    "the and for with that this from into your their about based each then than what which "
+    "country countries data agent output analysis provide using given should must score".split()
+)
+_WORDS = re.compile(r"[^\W\d_]{4,}", re.UNICODE)
+
+
+def memory_enabled() -> bool:
+    return os.getenv("GRISP_MEMORY", "on").strip().lower() not in ("0", "false", "off", "no")
+
+
+def search_terms(text: str, limit: int = 12) -> List[str]:
+    """Distinctive words of `text`, in order of first appearance."""
+    seen = {}
+    for word in _WORDS.findall((text or "").casefold()):
+        if word not in _STOPWORDS:
+            seen.setdefault(word, None)
+    return list(seen)[:limit]
+
+
+class MemoryStore:
+    """Thread-safe SQLite store of task outputs with an FTS5 index over their text."""
+
+    def __init__(self, path: str = MEMORY_DB_PATH, max_age_days: Optional[float] = None):
+        self.path = path
+        if max_age_days is None:
+            max_age_days = float(os.getenv("GRISP_MEMORY_MAX_AGE_DAYS", "30"))
+        self.max_age = max_age_days * 86400
+        # Outputs saved by this process are not recalled back into the same run
+        self.run_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    id INTEGER PRIMARY KEY,
+                    created REAL NOT NULL,
+                    run_id TEXT NOT NULL,
+                    country TEXT,
+                    agent TEXT,
+                    task TEXT,
+                    content TEXT NOT NULL,
+                    digest TEXT NOT NULL UNIQUE
+                );
+                CREATE INDEX IF NOT EXISTS memories_scope ON memories (country, agent, created);
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    content, task, content='memories', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts (rowid, content, task) VALUES (new.id, new.content, new.task);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts (memories_fts, rowid, content, task)
+                    VALUES ('delete', old.id, old.content, old.task);
+                END;
+            """)
+        self.prune()
+
+    def add(self, content: str, country: Optional[str] = None, agent: Optional[str] = None,
+            task: Optional[str] = None) -> bool:
+        """Saves one task output. False if the same output was already stored for this scope."""
+        if not content or not content.strip():
+            return False
+        digest = hashlib.sha256("\x1f".join([country or "", agent or "", task or "", content]).encode("utf-8")).hexdigest()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO memories (created, run_id, country, agent, task, content, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), self.run_id, country, agent, task, content, digest),
+            )
+        return cursor.rowcount > 0
+
+    def search(self, query: str, country: Optional[str] = None, agent: Optional[str] = None,
+               limit: int = RECALL_LIMIT, include_current_run: bool = False) -> List[dict]:
+        """Earlier outputs matching `query`, best first, optionally limited to one country/agent."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Quoted terms OR'ed together: any match counts, BM25 ranks documents matching more of them
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = (
+            "SELECT m.country, m.agent, m.task, m.content, m.created FROM memories_fts f "
+            "JOIN memories m ON m.id = f.rowid WHERE memories_fts MATCH ?"
+        )
+        params: list = [match]
+        for column, value in (("country", country), ("agent", agent)):
+            if value is not None:
+                sql += f" AND m.{column} = ?"
+                params.append(value)
+        if not include_current_run:
+            sql += " AND m.run_id != ?"
+            params.append(self.run_id)
+        sql += " ORDER BY bm25(memories_fts), m.created DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            {"country": c, "agent": a, "task": t, "content": content, "created": created}
+            for c, a, t, content, created in rows
+        ]
+
+    def prune(self):
+        """Drops memories older than the maximum age."""
+        if not self.max_age:
+            return
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM memories WHERE created < ?", (time.time() - self.max_age,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_memory_store() -> Optional[MemoryStore]:
+    """The process-wide memory store, opened on first use; None when memory is disabled."""
+    global _store
+    if not memory_enabled():
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = MemoryStore()
+        return _store
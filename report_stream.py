@@ -0,0 +1,170 @@
+"""
+Streaming run output: task results are written the moment they complete, LLM tokens as they arrive.
+
+A run opens a ReportStream on its report path and installs it with `use_report_stream(...)`;
+`task_completed`, passed as crewai's `task_callback`, then appends every finished task's output to
+    reports/final_report_<timestamp>.md            (markdown, readable while the run goes on)
+    reports/final_report_<timestamp>.tasks.jsonl   (one JSON object per line, for tools)
+and flushes both to disk, so whatever completed survives a crash at a later step. run.py
+replaces the markdown with the full report once the run succeeds; the JSONL sidecar stays.
+
+`use_token_sink(callback)` forwards the LLM's streamed chunks (LLM_CONFIG has stream=True) to
+`callback(chunk, agent_role, task_name)` for the duration of a block; TokenPrinter prints them.
+"""
+import contextvars
+import datetime
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, TextIO
+
+_current_stream = contextvars.ContextVar("grisp_report_stream", default=None)
+_current_sink = contextvars.ContextVar("grisp_token_sink", default=None)
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class ReportStream:
+    """Append-only markdown report plus JSONL sidecar, written and flushed task by task."""
+
+    def __init__(self, report_path: str, jsonl_path: Optional[str] = None, title: str = "GRiSP Report"):
+        self.report_path = report_path
+        self.jsonl_path = jsonl_path or os.path.splitext(report_path)[0] + ".tasks.jsonl"
+        self.tasks_written = 0
+        self._lock = threading.Lock()
+
+        for path in (self.report_path, self.jsonl_path):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._report = open(self.report_path, "w", encoding="utf-8")
+        self._jsonl = open(self.jsonl_path, "a", encoding="utf-8")
+        self._write(f"# {title} (in progress)\n\nStarted {_now()}. Task results are appended as they complete.\n",
+                    {"event": "run_started", "title": title})
+
+    def _write(self, markdown: Optional[str], record: dict):
+        with self._lock:
+            if self._report.closed:
+                return
+            if markdown:
+                self._report.write(markdown)
+                self._report.flush()
+                os.fsync(self._report.fileno())
+            self._jsonl.write(json.dumps({"time": _now(), **record}, ensure_ascii=False, default=str) + "\n")
+            self._jsonl.flush()
+            os.fsync(self._jsonl.fileno())
+
+    def task_completed(self, output):
+        """Appends one crewai TaskOutput (name, agent, raw text) to both files."""
+        name = getattr(output, "name", None) or (getattr(output, "description", "") or "task")[:60]
+        agent = getattr(output, "agent", None)
+        raw = getattr(output, "raw", None)
+        raw = str(output) if raw is None else raw
+        with self._lock:
+            self.tasks_written += 1
+        self._write(f"\n## {name}" + (f" ({agent})" if agent else "") + f"\n\n{raw}\n",
+                    {"event": "task_completed", "task": name, "agent": agent, "raw": raw})
+
+    def event(self, kind: str, markdown: Optional[str] = None, **data):
+        """Any other run event (scores, failures, ...); `markdown` also goes into the report."""
+        self._write(markdown, {"event": kind, **data})
+
+    def failed(self, error: BaseException):
+        self.event("run_failed", f"\n## Run failed\n\n{type(error).__name__}: {error}\n",
+                   error=f"{type(error).__name__}: {error}", tasks_completed=self.tasks_written)
+
+    def close(self):
+        with self._lock:
+            self._report.close()
+            self._jsonl.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def current_report_stream() -> Optional[ReportStream]:
+    return _current_stream.get()
+
+
+@contextmanager
+def use_report_stream(stream: ReportStream):
+    """Makes `stream` the current report stream for the duration of the block."""
+    token = _current_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _current_stream.reset(token)
+
+
+def task_completed(output):
+    """
+    crewai task_callback writing to the current run's ReportStream, if any. A module-level function
+    rather than a bound method, since crewai only knows how to serialize those with the crew.
+    """
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.task_completed(output)
+
+
+class TokenPrinter:
+    """Token sink writing the chunks to `out`, with a header line whenever another agent starts talking."""
+
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+        self._speaker = None
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk: str, agent: Optional[str] = None, task: Optional[str] = None):
+        with self._lock:
+            # Parallel factor chains stream at the same time; label each switch between them
+            speaker = (agent, task)
+            if speaker != self._speaker:
+                self._speaker = speaker
+                self.out.write(f"\n\n💬 {agent or 'LLM'}" + (f" · {task}" if task else "") + "\n")
+            self.out.write(chunk)
+            self.out.flush()
+
+
+_listener_installed = False
+_listener_lock = threading.Lock()
+
+
+def install_stream_listener():
+    """Registers (once per process) the crewai handler that forwards stream chunks to the current sink."""
+    global _listener_installed
+    with _listener_lock:
+        if _listener_installed:
+            return
+        try:
+            from crewai.events import crewai_event_bus
+            from crewai.events.types.llm_events import LLMStreamChunkEvent
+        except ImportError:
+            return
+
+        # Chunk events are handled synchronously on the emitting thread, in order, so the
+        # sink of the run that made the call is the one in the current context.
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _stream_chunk(source, event):
+            sink = _current_sink.get()
+            if sink is not None and event.chunk:
+                sink(event.chunk, event.agent_role, event.task_name)
+
+        _listener_installed = True
+
+
+@contextmanager
+def use_token_sink(sink: Optional[Callable[[str, Optional[str], Optional[str]], None]]):
+    """Sends streamed LLM chunks to `sink(chunk, agent_role, task_name)` for the duration of the block."""
+    if sink is not None:
+        install_stream_listener()
+    token = _current_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _current_sink.reset(token)
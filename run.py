@@ -1,4 +1,7 @@
 import os
+import glob
+import json
+import argparse
 import datetime
 from dotenv import load_dotenv
 
@@ -6,32 +9,191 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import the crew instance from crew.py (not from_yaml anymore!)
-from crew_grisp import callCrew
+from crew_grisp import callCrew, score_outputs
+from report_stream import ReportStream, TokenPrinter, task_completed, use_report_stream, use_token_sink
+from tools.call_memo import use_call_memo
+from tools.fact_store import FactStore, use_fact_store
+from tools.snapshot import Snapshot, use_snapshot
+from tools.tracing import Tracer, use_tracer
+
+# Timing / token section appended to each report; it is ignored when comparing with the last report
+TIMING_HEADER = "\n\n## Timing\n\n"
 
 # Ensure output directory exists
 os.makedirs("reports", exist_ok=True)
 
-def run_grisp_pipeline():
+def latest_report():
+    reports = sorted(glob.glob("reports/final_report_*.md"))
+    return reports[-1] if reports else None
+
+def new_report_path(timestamp):
+    """
+    Claims reports/final_report_<timestamp>.md, or <timestamp>_02.md, _03.md, ... when a run in the
+    same second already has it, so a run never streams over another run's report or trace.
+    The suffixes sort after the plain name, so latest_report() still finds the newest.
+    """
+    os.makedirs("reports", exist_ok=True)
+    n = 1
+    while True:
+        stem = f"reports/final_report_{timestamp}" + (f"_{n:02d}" if n > 1 else "")
+        try:
+            # Created exclusively: two runs starting together can't both get it
+            open(f"{stem}.md", "x", encoding="utf-8").close()
+            return f"{stem}.md"
+        except FileExistsError:
+            n += 1
+
+def run_summary(stage_status):
+    """Markdown list of the stages that were reused from an earlier run and those that ran."""
+    reused = [name for name, status in stage_status.items() if status == "reused"]
+    ran = [name for name, status in stage_status.items() if status == "ran"]
+    lines = [f"- Reused from an earlier run ({len(reused)}): {', '.join(sorted(reused)) or 'none'}",
+             f"- Recomputed ({len(ran)}): {', '.join(sorted(ran)) or 'none'}"]
+    return "\n".join(lines)
+
+def run_grisp_pipeline(country=None, parallel=None, max_concurrency=None, narrative=None, reuse=True, otlp=None,
+                       stream_tokens=None, token_callback=None, record=None, replay=None):
+    """
+    Runs the crew and writes reports/final_report_<timestamp>.md. Each task's output is appended to
+    that file (and to a .tasks.jsonl sidecar) as soon as it completes, so a failed run still leaves
+    its partial results; a successful run then replaces the markdown with the full report.
+    LLM tokens stream to `token_callback(chunk, agent_role, task_name)`, or to the console when
+    stream_tokens is on (GRISP_STREAM_TOKENS, default on).
+    `record` (True or an archive path) saves every tool call's result to a snapshot archive;
+    `replay` (an archive path) answers the tool calls from one instead (tools/snapshot.py).
+    """
     print("\n🧠 Initializing GRiSP — Global Risk & Stability Predictor...")
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    if stream_tokens is None:
+        stream_tokens = os.getenv("GRISP_STREAM_TOKENS", "1").strip().lower() in ("1", "true", "on", "yes")
+    if token_callback is None and stream_tokens:
+        token_callback = TokenPrinter()
+
+    # Read before the streamed report (same name pattern) is created
+    previous = latest_report()
+    previous_text = open(previous, "r", encoding="utf-8").read() if previous else None
+    report_path = new_report_path(timestamp)
+    report_stem = report_path[:-len(".md")]
+    trace_path = f"{report_stem}.trace.jsonl"
+    stream = ReportStream(report_path, title=f"GRiSP Report{f' — {country}' if country else ''}")
+
+    snapshot = None
+    if replay:
+        snapshot = Snapshot.load(replay)
+        print(f"\n📼 Replaying tool calls from {replay} ({snapshot.summary()['calls']} recorded)")
+    elif record:
+        snapshot = Snapshot.recorder(country or "run", None if record is True else record)
+    if snapshot is not None:
+        # Reused stages would skip their tool calls: a recording has to see them, a replay has to rerun them
+        reuse = False
 
-    # Kickoff CrewAI execution
-    print("\n🚀 Running full risk and stability analysis...\n")
-    crew = callCrew()
-    result = crew.kickoff()
+    # Kickoff CrewAI execution, tracing tool calls, HTTP traffic and LLM calls along the way.
+    # Identical tool calls within the run share one request (tools/call_memo.py).
+    print(f"\n🚀 Running full risk and stability analysis{f' for {country}' if country else ''}...\n")
+    print(f"📝 Streaming task results to: {report_path}\n")
+    tracer = Tracer(f"grisp-{timestamp}", {"country": country or ""})
+    try:
+        with use_tracer(tracer), tracer.span("run", "run", country=country or ""), \
+                use_call_memo() as call_memo, use_snapshot(snapshot), use_report_stream(stream), \
+                use_token_sink(token_callback):
+            crew = callCrew(country=country, parallel=parallel, max_concurrency=max_concurrency, narrative=narrative,
+                            reuse=reuse, task_callback=task_completed)
+            with use_fact_store(FactStore(country)) as facts:
+                output = crew.kickoff()
+    except BaseException as e:
+        # Keep what completed: the streamed report, its JSONL sidecar and the trace so far
+        stream.failed(e)
+        stream.close()
+        tracer.write_jsonl(trace_path)
+        if snapshot is not None and snapshot.mode == "record":
+            snapshot.save()
+        print(f"\n❌ Run failed after {stream.tasks_written} completed task(s): {e}")
+        print(f"📄 Partial report: {report_path}")
+        print(f"⏱️ Trace: {trace_path}")
+        raise
 
-    # Save output with timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
-    report_path = f"reports/final_report_{timestamp}.md"
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(result)
+    # Deterministic LLI / risk scores (already computed by the parallel crew, scored here otherwise)
+    scores = getattr(crew, "scores", None) or score_outputs(output.tasks_output)
+    result = f"## Scores\n\n```json\n{json.dumps(scores, indent=2)}\n```\n\n{output}"
+    if len(facts):
+        # The exact values behind the analysis, as returned by the tools
+        result += f"\n\n## Source Data\n\n```json\n{json.dumps(facts.to_dicts(), indent=2, ensure_ascii=False)}\n```\n"
+
+    stage_status = getattr(crew, "stage_status", None)
+    if stage_status:
+        result += f"\n\n## Run Summary\n\n{run_summary(stage_status)}\n"
+
+    if snapshot is not None and snapshot.mode == "record":
+        snapshot.save()
+    stream.event("run_completed", scores=scores, tool_calls=call_memo.summary() if call_memo else None,
+                 snapshot=snapshot.summary() if snapshot is not None else None)
+    stream.close()
+
+    # Structured trace of the run (and optionally an OpenTelemetry OTLP/JSON copy) next to the reports
+    tracer.write_jsonl(trace_path)
+    if otlp is None:
+        otlp = os.getenv("GRISP_TRACE_OTLP", "0").strip().lower() in ("1", "true", "on", "yes")
+    if otlp:
+        tracer.write_otlp_json(f"{report_stem}.otlp.json")
+    timing = tracer.summary_table()
+    if call_memo is not None:
+        timing += "\n\n" + call_memo.summary_table()
+
+    # Save output with timestamp, unless it is identical to the latest report
+    if previous_text is not None and previous_text.split(TIMING_HEADER)[0] == result:
+        os.remove(report_path)  # the streamed copy
+        report_path = previous
+        print("\n✅ Nothing changed since the last run.")
+        print(f"📄 Report unchanged: {report_path}")
+    else:
+        # The streamed per-task report becomes the full report (the sidecar keeps the per-task log)
+        with open(report_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(result + TIMING_HEADER + timing + "\n")
+        os.replace(report_path + ".tmp", report_path)
+        print("\n✅ GRiSP Report Generated!")
+        print(f"📄 Saved to: {report_path}")
+    print(f"🧾 Task log: {stream.jsonl_path}")
+    print(f"⏱️ Trace: {trace_path}")
+    if snapshot is not None:
+        summary = snapshot.summary()
+        if snapshot.mode == "record":
+            print(f"📼 Tool calls recorded: {summary['path']} ({summary['calls']} calls, {summary['tool_seconds']} s of tool time)")
+        else:
+            print(f"📼 Replayed {summary['served']} tool calls ({summary['tool_seconds_saved']} s of tool time saved); "
+                  f"{summary['misses']} not in the snapshot, {summary['unused']} recorded calls unused")
 
     # Show summary preview
-    print("\n✅ GRiSP Report Generated!")
-    print(f"📄 Saved to: {report_path}")
     print("\n📊 Summary Preview:\n")
     print("=" * 60)
     print(result[:1500] + ("\n..." if len(result) > 1500 else ""))
     print("=" * 60)
+    print("\n⏱️ Where the time went:\n")
+    print(timing)
 
 if __name__ == "__main__":
-    run_grisp_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="GRiSP — Global Risk & Stability Predictor")
+    parser.add_argument("--country", default=os.getenv("GRISP_COUNTRY"),
+                        help="Country to analyze (or set GRISP_COUNTRY). Use batch_run.py for many countries.")
+    parser.add_argument("--parallel", action="store_true", default=None,
+                        help="Run the independent factor agents concurrently (or set GRISP_PARALLEL=1)")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Maximum number of factor chains running at once in parallel mode")
+    parser.add_argument("--no-narrative", action="store_true",
+                        help="Parallel mode: skip the LLM synthesis narrative and report the computed scores only")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Parallel mode: recompute every stage instead of reusing unchanged ones from earlier runs")
+    parser.add_argument("--otlp", action="store_true", default=None,
+                        help="Also write the trace as an OpenTelemetry OTLP/JSON file (or set GRISP_TRACE_OTLP=1)")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Don't echo the LLM tokens to the console as they stream (or set GRISP_STREAM_TOKENS=0)")
+    parser.add_argument("--record", nargs="?", const=True, default=None, metavar="ARCHIVE",
+                        help="Save every tool call's result to a snapshot archive (default: snapshots/<country>_<timestamp>.jsonl.gz)")
+    parser.add_argument("--replay", default=None, metavar="ARCHIVE",
+                        help="Answer the tool calls from a recorded snapshot archive instead of the live APIs")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+
+    run_grisp_pipeline(country=args.country, parallel=args.parallel, max_concurrency=args.max_concurrency,
+                       narrative=False if args.no_narrative else None, reuse=not args.fresh, otlp=args.otlp,
+                       stream_tokens=False if args.no_stream else None, record=args.record, replay=args.replay)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Deterministic scoring engine for GRiSP.
+
+Turns the structured `{"score", "confidence"}` outputs of the analyze_and_score task into the
+Living Likeliness Index (LLI), a terrorism risk score and cross-country percentile ranks with
+NumPy. Every factor's weight is scaled by the confidence the agent reported, and factors
+without a usable score simply drop out of the weighted average.
+
+Weights can be overridden with a YAML file (see `load_weights`), e.g.:
+
+    lli_weights:
+      EconomicAgent: 0.2
+    risk_weights:
+      SecurityAgent: 0.4
+    min_confidence: 0.2
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import yaml
+
+# Factor agent -> weight in the Living Likeliness Index (higher factor score = more livable)
+DEFAULT_LLI_WEIGHTS: Dict[str, float] = {
+    "EconomicAgent": 0.15,
+    "PoliticalAgent": 0.12,
+    "SecurityAgent": 0.12,
+    "InfrastructureAgent": 0.12,
+    "EnvironmentAgent": 0.10,
+    "GrowthAgent": 0.10,
+    "SocietalMindsetAgent": 0.10,
+    "TechnologyAgent": 0.08,
+    "SentimentAgent": 0.06,
+    "ReligiousBeliefsAgent": 0.05,
+}
+
+# Factor agent -> weight in the terrorism risk score. Risk is 100 minus the weighted stability.
+DEFAULT_RISK_WEIGHTS: Dict[str, float] = {
+    "SecurityAgent": 0.30,
+    "PoliticalAgent": 0.20,
+    "SentimentAgent": 0.15,
+    "ReligiousBeliefsAgent": 0.10,
+    "SocietalMindsetAgent": 0.10,
+    "EconomicAgent": 0.10,
+    "GrowthAgent": 0.05,
+}
+
+# Risk score thresholds for the Low / Medium / High buckets
+RISK_LEVELS = ((100 / 3, "Low"), (200 / 3, "Medium"), (float("inf"), "High"))
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def extract_json(text):
+    """Pulls the JSON object out of an LLM answer (which may wrap it in prose or ``` fences)."""
+    if not text:
+        return None
+    match = _JSON_OBJECT.search(text)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(0))
+    except ValueError:
+        return None
+
+
+@dataclass
+class ScoringConfig:
+    lli_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LLI_WEIGHTS))
+    risk_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_RISK_WEIGHTS))
+    # Factor scores reported with a lower confidence than this are ignored
+    min_confidence: float = 0.0
+
+
+def load_weights(path: Optional[str] = None) -> ScoringConfig:
+    """Default config, with any keys from the YAML file at `path` layered on top."""
+    config = ScoringConfig()
+    if not path:
+        return config
+    with open(path, "r") as f:
+        data = yaml.safe_load(f) or {}
+    config.lli_weights.update(data.get("lli_weights") or {})
+    config.risk_weights.update(data.get("risk_weights") or {})
+    config.min_confidence = float(data.get("min_confidence", config.min_confidence))
+    return config
+
+
+@dataclass
+class ScoreTable:
+    """Country x factor matrices of scores (0-100) and confidences (0-1); NaN where missing."""
+    countries: List[str]
+    factors: List[str]
+    scores: np.ndarray
+    confidence: np.ndarray
+
+    @classmethod
+    def from_results(cls, results: Mapping[str, Mapping[str, Optional[dict]]], factors: Optional[List[str]] = None):
+        """
+        Builds the table from {country: {factor: {"score": .., "confidence": ..}}}.
+        Missing or malformed entries become NaN; a missing confidence counts as 1.0.
+        """
+        countries = list(results)
+        if factors is None:
+            factors = sorted({f for per_country in results.values() for f in per_country})
+
+        scores = np.full((len(countries), len(factors)), np.nan)
+        confidence = np.full_like(scores, np.nan)
+        factor_pos = {f: j for j, f in enumerate(factors)}
+
+        for i, country in enumerate(countries):
+            for factor, value in results[country].items():
+                j = factor_pos.get(factor)
+                if j is None or not isinstance(value, Mapping):
+                    continue
+                scores[i, j] = _as_float(value.get("score"))
+                conf = _as_float(value.get("confidence", 1.0))
+                confidence[i, j] = 1.0 if np.isnan(conf) else conf
+
+        return cls(countries, list(factors), np.clip(scores, 0, 100), np.clip(confidence, 0, 1))
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def weighted_index(table: ScoreTable, weights: Mapping[str, float], min_confidence: float = 0.0) -> np.ndarray:
+    """Confidence-weighted average of the factor scores per country (NaN if no factor applies)."""
+    w = np.array([weights.get(f, 0.0) for f in table.factors], dtype=float)
+    usable = ~np.isnan(table.scores) & (np.nan_to_num(table.confidence) >= min_confidence)
+    effective = np.where(usable, w[None, :] * np.nan_to_num(table.confidence), 0.0)
+
+    total = effective.sum(axis=1)
+    weighted = (effective * np.nan_to_num(table.scores)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Percentile (0-100) of each value among the finite values; ties share the mid-rank. NaN stays NaN."""
+    out = np.full(values.shape, np.nan)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return out
+    ordered = np.sort(values[finite])
+    below = np.searchsorted(ordered, values[finite], side="left")
+    at_or_below = np.searchsorted(ordered, values[finite], side="right")
+    out[finite] = (below + at_or_below) / 2 / len(ordered) * 100
+    return out
+
+
+def risk_levels(risk: np.ndarray) -> List[Optional[str]]:
+    thresholds = np.array([t for t, _ in RISK_LEVELS])
+    labels = [label for _, label in RISK_LEVELS]
+    return [None if np.isnan(r) else labels[int(np.searchsorted(thresholds, r, side="right"))] for r in risk]
+
+
+def score_table(table: ScoreTable, config: Optional[ScoringConfig] = None) -> Dict[str, dict]:
+    """Computes LLI, terrorism risk and percentile ranks for every country in one vectorized pass."""
+    config = config or ScoringConfig()
+    lli = weighted_index(table, config.lli_weights, config.min_confidence)
+    risk = 100 - weighted_index(table, config.risk_weights, config.min_confidence)
+    lli_pct = percentile_ranks(lli)
+    risk_pct = percentile_ranks(risk)
+    levels = risk_levels(risk)
+
+    factors_used = (~np.isnan(table.scores)).sum(axis=1)
+    return {
+        country: {
+            "LLI_index": _rounded(lli[i]),
+            "LLI_percentile": _rounded(lli_pct[i]),
+            "terrorism_risk_score": _rounded(risk[i]),
+            "risk_percentile": _rounded(risk_pct[i]),
+            "risk_level": levels[i],
+            "factors_scored": int(factors_used[i]),
+        }
+        for i, country in enumerate(table.countries)
+    }
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 1)
+
+
+def score_country(factor_results: Mapping[str, Optional[dict]], config: Optional[ScoringConfig] = None) -> dict:
+    """Scores a single country from {factor: {"score", "confidence"}}. Percentiles need a batch, so they are left out."""
+    scores = score_table(ScoreTable.from_results({"_": factor_results}), config)["_"]
+    scores.pop("LLI_percentile")
+    scores.pop("risk_percentile")
+    return scores
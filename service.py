@@ -0,0 +1,378 @@
+"""
+Long-running GRiSP service: one warm process that accepts analysis jobs over HTTP.
+
+`python run.py` pays for importing crewai and pandas, loading the workbooks, building the
+sentiment analyzer and parsing the agent/task YAMLs on every run. The service does all of that
+once at startup and keeps it (tools, indexes, the HTTP session and cache) for every job after.
+
+Slow-changing sources (World Bank watchlist, GTD / ND-GAIN workbooks) are kept fresh by the
+refresh scheduler (tools/freshness.py) in a background thread, so jobs answer them locally;
+GRISP_REFRESH=off turns it off.
+
+Jobs wait in a bounded queue and run `workers` at a time, each as one batch_run.analyze_country
+call on a worker thread. When the queue is full new jobs are refused with 429 and a Retry-After
+estimate instead of piling up. Finished jobs are kept in memory (the newest `keep_jobs`).
+
+    python service.py [--host 127.0.0.1] [--port 8787] [--unix /tmp/grisp.sock] [--workers 2] [--queue 16]
+
+    POST   /jobs              {"country": "India", "narrative": false}  -> 202 {"id", "status", "position"}
+    GET    /jobs              every known job, without results
+    GET    /jobs/<id>         status of one job
+    GET    /jobs/<id>/result  the job's result row (as in batch_results.json) once it is done
+    DELETE /jobs/<id>         cancels a job that has not started yet
+    GET    /health            queue depth, running jobs, loaded tools, uptime
+
+The API speaks plain HTTP/1.1 with JSON bodies (one request per connection), so curl is enough:
+    curl -s -XPOST localhost:8787/jobs -d '{"country": "India"}'
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import contextvars
+import signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load env vars
+load_dotenv()
+
+SERVICE_HOST = os.getenv("GRISP_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("GRISP_SERVICE_PORT", "8787"))
+SERVICE_WORKERS = int(os.getenv("GRISP_SERVICE_WORKERS", "2"))
+SERVICE_QUEUE = int(os.getenv("GRISP_SERVICE_QUEUE", "16"))
+# Per-job timeout in seconds (0 = none). A timed-out job's thread is abandoned, not killed.
+SERVICE_JOB_TIMEOUT = float(os.getenv("GRISP_SERVICE_JOB_TIMEOUT", "0"))
+SERVICE_REFRESH = os.getenv("GRISP_REFRESH", "on").strip().lower() not in ("0", "false", "off", "no")
+
+# Largest request body accepted, in bytes
+MAX_BODY = 64 * 1024
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+@dataclass
+class Job:
+    id: str
+    country: str
+    options: dict
+    status: str = "queued"  # queued -> running -> done | failed | timeout; or cancelled
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    # True while the job's thread runs; a timed-out job keeps its thread (and slot) until it returns
+    holding_slot: bool = False
+
+    def to_dict(self, with_result=False):
+        data = {
+            "id": self.id,
+            "country": self.country,
+            "options": self.options,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "queue_seconds": round((self.started or time.time()) - self.submitted, 3) if self.status != "cancelled" else None,
+            "run_seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            "error": self.error,
+            "holding_slot": self.holding_slot,
+        }
+        if with_result:
+            data["result"] = self.result
+        return data
+
+
+class GrispService:
+    """Bounded job queue + worker pool around batch_run.analyze_country, with warm shared state."""
+
+    def __init__(self, workers=SERVICE_WORKERS, queue_size=SERVICE_QUEUE, job_timeout=SERVICE_JOB_TIMEOUT, keep_jobs=200,
+                 refresh=SERVICE_REFRESH):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.job_timeout = job_timeout or None
+        self.keep_jobs = keep_jobs
+        self.jobs = OrderedDict()
+        self.started = time.time()
+        self.warmup_seconds = None
+        self.refresh = refresh
+        self.scheduler = None
+        self._queue = None
+        # Threads free to start a job. A slot is taken when a job's thread starts and given back
+        # only when that thread returns, so a timed-out job's thread still counts against it.
+        self._slots = None
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="grisp-job")
+        self._worker_tasks = []
+        # Recent job run times, for Retry-After estimates
+        self._durations = []
+
+    # --- startup -------------------------------------------------------------------------
+
+    def warm_up(self):
+        """Pays every per-process startup cost once: imports, YAML specs, tools and their data, the LLM clients."""
+        started = time.perf_counter()
+        import crewai  # noqa: F401 (the import itself is the slow part)
+        import crew_grisp
+        crew_grisp.load_agent_specs()
+        crew_grisp.load_task_specs()
+        crew_grisp.get_llm()
+        for name in crew_grisp.referenced_tools():
+            try:
+                crew_grisp.TOOL_MAP[name]
+            except Exception as e:
+                # The job's agents report the missing tool; the service still starts
+                print(f"⚠️ Could not load {name}: {e}")
+        self.warmup_seconds = time.perf_counter() - started
+        print(f"🔥 Warm in {self.warmup_seconds:.1f} s (tools: {', '.join(crew_grisp.TOOL_MAP.loaded()) or 'none'})")
+
+    async def start(self):
+        if self.refresh:
+            from crew_grisp import TOOL_MAP
+            from tools.freshness import RefreshScheduler
+            # First round runs in the scheduler's thread, so the service accepts jobs right away
+            self.scheduler = RefreshScheduler(tool_map=TOOL_MAP).start()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.scheduler is not None:
+            self.scheduler.stop(timeout=5)
+
+    # --- jobs ----------------------------------------------------------------------------
+
+    def submit(self, country: str, options: dict) -> Job:
+        """Queues a job; raises asyncio.QueueFull when the queue is at capacity."""
+        job = Job(uuid.uuid4().hex[:12], country, options)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        if job.status != "queued":
+            return False
+        # The worker skips it when it comes out of the queue
+        job.status = "cancelled"
+        job.finished = time.time()
+        return True
+
+    def position(self, job: Job) -> int:
+        """1-based place of a queued job in line."""
+        queued = [j for j in self.jobs.values() if j.status == "queued"]
+        return queued.index(job) + 1 if job in queued else 0
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        typical = sorted(self._durations)[len(self._durations) // 2] if self._durations else 60.0
+        return max(1, int(typical * self._queue.qsize() / self.workers))
+
+    def _forget_old_jobs(self):
+        finished = [j.id for j in self.jobs.values() if j.status not in ("queued", "running") and not j.holding_slot]
+        for job_id in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job_id]
+
+    async def _worker(self, number: int):
+        from batch_run import analyze_country
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == "cancelled":
+                    continue
+                # The job stays queued until a thread is free (timed-out jobs may still occupy some)
+                await self._slots.acquire()
+                if job.status == "cancelled":
+                    self._slots.release()
+                    continue
+                began = asyncio.Event()
+
+                def work(job=job, began=began):
+                    loop.call_soon_threadsafe(began.set)
+                    return analyze_country(job.country, job.options.get("parallel", True),
+                                           job.options.get("max_concurrency"), job.options.get("narrative"),
+                                           run_id=job.id)
+
+                # Each job runs in its own copy of the context, so its tracer, fact store and call memo stay its own
+                call = loop.run_in_executor(self._pool, contextvars.copy_context().run, work)
+                call.add_done_callback(lambda _, job=job: self._release(job))
+                began_wait = asyncio.ensure_future(began.wait())
+                await asyncio.wait({began_wait, call}, return_when=asyncio.FIRST_COMPLETED)
+                began_wait.cancel()
+                # Running (and on the timeout clock) from the moment the work actually starts
+                job.status = "running"
+                job.started = time.time()
+                job.holding_slot = not call.done()
+                try:
+                    # shield: on timeout the thread can't be stopped, so `call` must stay pending
+                    # (and keep its slot) until the thread really returns
+                    job.result = await asyncio.wait_for(asyncio.shield(call), self.job_timeout)
+                    job.status = "done"
+                except asyncio.TimeoutError:
+                    job.status, job.error = "timeout", f"exceeded {self.job_timeout}s (its thread holds a slot until it returns)"
+                except Exception as e:
+                    job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+                job.finished = time.time()
+                self._durations = (self._durations + [job.finished - job.started])[-50:]
+                print(f"  {'✅' if job.status == 'done' else '❌'} job {job.id} ({job.country}): {job.status}")
+            finally:
+                self._queue.task_done()
+
+    def _release(self, job: Job):
+        """Done callback of a job's thread: frees its slot (late, for a job that timed out)."""
+        job.holding_slot = False
+        self._slots.release()
+        if job.status == "timeout":
+            job.error = f"exceeded {self.job_timeout}s (its thread has since returned)"
+            print(f"  ↩️ job {job.id} ({job.country}): timed-out thread returned, slot freed")
+
+    def health(self) -> dict:
+        from crew_grisp import TOOL_MAP
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "warmup_seconds": round(self.warmup_seconds, 2) if self.warmup_seconds is not None else None,
+            "workers": self.workers,
+            "busy_slots": sum(job.holding_slot for job in self.jobs.values()),
+            # Threads still held by jobs that already timed out
+            "stuck_slots": sum(job.holding_slot and job.status == "timeout" for job in self.jobs.values()),
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize(),
+            "jobs": counts,
+            "tools_loaded": TOOL_MAP.loaded(),
+            "refresh": self.scheduler.status() if self.scheduler is not None else None,
+        }
+
+    # --- HTTP ----------------------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body, headers = await self._respond(reader)
+        except Exception as e:
+            status, body, headers = 500, {"error": f"{type(e).__name__}: {e}"}, {}
+        payload = json.dumps(body, indent=2, default=str).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(payload)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return 400, {"error": "empty request"}, {}
+        method, target, *_ = request_line.split(" ") + ["", ""]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            return 413, {"error": f"request body over {MAX_BODY} bytes"}, {}
+        raw = await reader.readexactly(length) if length else b""
+
+        parts = [p for p in target.split("?")[0].split("/") if p]
+        if parts == ["health"]:
+            return 200, self.health(), {}
+        if not parts or parts[0] != "jobs" or len(parts) > 3:
+            return 404, {"error": f"no route for {target}"}, {}
+
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, {"jobs": [job.to_dict() for job in self.jobs.values()]}, {}
+            if method != "POST":
+                return 405, {"error": "use GET or POST on /jobs"}, {}
+            try:
+                data = json.loads(raw or b"{}")
+            except ValueError:
+                return 400, {"error": "body must be JSON"}, {}
+            country = str(data.get("country") or "").strip() if isinstance(data, dict) else ""
+            if not country:
+                return 400, {"error": "missing 'country'"}, {}
+            options = {k: data[k] for k in ("parallel", "max_concurrency", "narrative") if k in data}
+            try:
+                job = self.submit(country, options)
+            except asyncio.QueueFull:
+                # Backpressure: the caller retries later instead of the queue growing without bound
+                retry = self.retry_after()
+                return 429, {"error": f"queue full ({self.queue_size} jobs waiting)", "retry_after": retry}, {"Retry-After": str(retry)}
+            return 202, {**job.to_dict(), "position": self.position(job)}, {"Location": f"/jobs/{job.id}"}
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return 404, {"error": f"unknown job {parts[1]}"}, {}
+        if len(parts) == 3:
+            if parts[2] != "result" or method != "GET":
+                return 404, {"error": f"no route for {target}"}, {}
+            if job.status in ("queued", "running"):
+                return 409, {**job.to_dict(), "error": "job not finished yet"}, {"Retry-After": "5"}
+            return 200, job.to_dict(with_result=True), {}
+        if method == "DELETE":
+            if not self.cancel(job):
+                return 409, {**job.to_dict(), "error": f"job is {job.status}; only queued jobs can be cancelled"}, {}
+            return 200, job.to_dict(), {}
+        if method != "GET":
+            return 405, {"error": "use GET or DELETE on /jobs/<id>"}, {}
+        return 200, {**job.to_dict(), "position": self.position(job)}, {}
+
+
+async def serve(service: GrispService, host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None):
+    await service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = "http://" + ":".join(str(part) for part in server.sockets[0].getsockname()[:2])
+    print(f"🛰️ GRiSP service listening on {where} ({service.workers} workers, queue of {service.queue_size})")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows, or not the main thread
+    async with server:
+        await stop.wait()
+    print("\n👋 Shutting down")
+    await service.stop()
+    if unix_path and os.path.exists(unix_path):
+        os.remove(unix_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GRiSP as a long-running local service")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Interface to listen on (or set GRISP_SERVICE_HOST)")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="TCP port (or set GRISP_SERVICE_PORT)")
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jobs running at the same time")
+    parser.add_argument("--queue", type=int, default=SERVICE_QUEUE, help="Jobs allowed to wait; more are refused with 429")
+    parser.add_argument("--timeout", type=float, default=SERVICE_JOB_TIMEOUT, help="Per-job timeout in seconds (0 = none)")
+    parser.add_argument("--no-refresh", action="store_true", help="Don't pre-fetch the slow-changing sources in the background")
+    args = parser.parse_args()
+
+    service = GrispService(workers=args.workers, queue_size=args.queue, job_timeout=args.timeout,
+                           refresh=SERVICE_REFRESH and not args.no_refresh)
+    service.warm_up()
+    asyncio.run(serve(service, args.host, args.port, args.unix))
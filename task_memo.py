@@ -0,0 +1,116 @@
+"""
+Content-addressed memoization of task outputs across runs.
+
+A factor's fetch/analyze/summarize outputs are stored under a key derived from
+- the prompts: agent YAML, task YAMLs, model config and country (the "prompt digest"), and
+- the data: every tool call the factor made (tool, arguments, digest of the output).
+
+On the next run the factor's previous tool calls are replayed directly (no LLM, and mostly
+answered from the HTTP / Excel caches). If every replayed output hashes the same and the
+prompts are unchanged, the stored task outputs are reused; otherwise the factor runs again.
+The synthesis stages are keyed on their prompts plus the factor outputs they read.
+
+    data/cache/tasks/calls/<factor slot>.json   last tool calls per (factor, country, prompt digest)
+    data/cache/tasks/entries/<key>.json         stored task outputs
+
+Set GRISP_TASK_CACHE=off to disable, GRISP_TASK_CACHE_MAX_AGE_DAYS to bound reuse (default 7).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+TASK_CACHE_DIR = "data/cache/tasks"
+# Bump when the stored entry layout changes
+MEMO_VERSION = 1
+
+
+def cache_enabled() -> bool:
+    return os.getenv("GRISP_TASK_CACHE", "on").strip().lower() not in ("0", "false", "off", "no")
+
+
+def digest(obj) -> str:
+    """SHA-256 of the canonical JSON form of `obj`."""
+    payload = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def calls_signature(calls) -> list:
+    """The parts of the tool calls that identify the data a factor worked from."""
+    return [[call.tool, call.arguments, call.digest] for call in calls]
+
+
+class TaskMemo:
+    def __init__(self, root: str = TASK_CACHE_DIR, max_age_days: Optional[float] = None):
+        self.root = root
+        if max_age_days is None:
+            max_age_days = float(os.getenv("GRISP_TASK_CACHE_MAX_AGE_DAYS", "7"))
+        self.max_age = max_age_days * 86400
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, f"{key}.json")
+
+    def _read(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
+    # --- factor tool calls ---------------------------------------------------------------
+
+    def slot(self, factor: str, country: Optional[str], prompt_digest: str) -> str:
+        return digest([MEMO_VERSION, factor, country, prompt_digest])
+
+    def last_calls(self, slot: str) -> Optional[List[dict]]:
+        """The tool calls ({tool, arguments}) the factor made the last time it actually ran."""
+        data = self._read(self._path("calls", slot))
+        return None if data is None else data["calls"]
+
+    def remember_calls(self, slot: str, calls):
+        self._write(self._path("calls", slot), {
+            "calls": [{"tool": call.tool, "arguments": call.arguments} for call in calls],
+        })
+
+    # --- stored outputs ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._read(self._path("entries", key))
+        if entry is None or entry.get("version") != MEMO_VERSION:
+            return None
+        if self.max_age and time.time() - entry.get("created", 0) > self.max_age:
+            return None
+        return entry
+
+    def put(self, key: str, outputs: List[dict]):
+        self._write(self._path("entries", key), {
+            "version": MEMO_VERSION,
+            "created": time.time(),
+            "outputs": outputs,
+        })
+
+
+def dump_output(output) -> dict:
+    """The parts of a crewai TaskOutput worth keeping."""
+    return {
+        "name": output.name,
+        "description": output.description,
+        "expected_output": output.expected_output,
+        "summary": output.summary,
+        "raw": output.raw,
+        "agent": output.agent,
+    }
+
+
+def load_output(data: dict):
+    from crewai.tasks.task_output import TaskOutput
+    return TaskOutput(**data)
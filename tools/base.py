@@ -0,0 +1,83 @@
+import functools
+import inspect
+
+from crewai.tools import BaseTool
+
+from tools import tracing
+from tools.call_memo import current_call_memo, is_error
+from tools.compaction import TOOL_OUTPUT_TOKENS, compact
+from tools.fact_store import current_fact_store, current_factor
+from tools.records import Record
+from tools.snapshot import current_snapshot
+
+
+class GrispTool(BaseTool):
+    """
+    Base class for the GRiSP tools. A subclass's `_run` may return a typed record
+    (tools/records.py) instead of a string: the record is added to the current run's fact
+    store and the agent gets its rendered text, compacted to GRISP_TOOL_OUTPUT_TOKENS
+    (tools/compaction.py; the store keeps the full record). Error strings pass through unchanged.
+    Every call (arguments plus a digest of the returned text) is logged in the fact store too,
+    and timed as a `tool` span when the run is traced (tools/tracing.py).
+    Within a run with a CallMemo (tools/call_memo.py), identical calls share one execution, and
+    with a Snapshot (tools/snapshot.py) that execution is recorded, or replayed from an archive.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("_run")
+        if run is not None and not getattr(run, "_grisp_wrapped", False):
+            cls._run = _record_output(run)
+
+
+def _record_output(run):
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        arguments = _call_arguments(signature, self, args, kwargs)
+        with tracing.span(self.name, "tool", factor=current_factor(), arguments=arguments) as span:
+            memo, snapshot = current_call_memo(), current_snapshot()
+            # Defaults filled in, so country="India" and country="india", mode="all" are the same call
+            key_arguments = _call_arguments(signature, self, args, kwargs, defaults=True) if memo is not None or snapshot is not None else None
+            execute = lambda: run(self, *args, **kwargs)
+            if snapshot is not None:
+                execute = functools.partial(snapshot.call, self.name, key_arguments, execute)
+                if snapshot.mode == "replay":
+                    span.set(replayed=True)
+            if memo is None:
+                result = execute()
+            else:
+                result, deduped = memo.call(self.name, key_arguments, execute)
+                if deduped:
+                    span.set(deduped=deduped)
+            store = current_fact_store()
+            # Error strings reach the agent whole (compaction could cut off the part that explains them)
+            error = is_error(result)
+            if isinstance(result, Record):
+                if store is not None:
+                    store.add(result, tool=self.name)
+                result = result.render()
+            if isinstance(result, str) and not error:
+                full_chars = len(result)
+                result = compact(result, TOOL_OUTPUT_TOKENS)
+                span.set(output_chars=full_chars, compacted_chars=len(result))
+        if store is not None:
+            store.add_call(self.name, arguments, result)
+        return result
+
+    wrapper._grisp_wrapped = True
+    # crewai derives the tool's args schema from this signature; to the agent it returns text
+    wrapper.__signature__ = signature.replace(return_annotation=str)
+    return wrapper
+
+
+def _call_arguments(signature, tool, args, kwargs, defaults=False) -> dict:
+    """Call arguments by parameter name, so the call can be replayed as `tool._run(**arguments)`."""
+    try:
+        bound = signature.bind(tool, *args, **kwargs)
+    except TypeError:
+        return dict(kwargs)
+    if defaults:
+        bound.apply_defaults()
+    return {name: value for name, value in bound.arguments.items() if name != "self"}
@@ -0,0 +1,156 @@
+"""
+Per-run de-duplication of tool calls.
+
+Several agents share tools (Economic, Growth and Infrastructure all query the World Bank, most
+agents search Google), and their LLMs often ask the same thing twice, at the same time or one
+after the other. While a run has a CallMemo installed (`use_call_memo(...)`), GrispTool calls
+go through it:
+- concurrent identical calls wait for the one request already in flight (single-flight),
+- later identical calls get the memoized result,
+where "identical" means same tool and same arguments after normalization: case and whitespace
+of strings are ignored, as is the order of keyword arguments. Failed calls and error messages
+are not memoized, so a later call tries again.
+
+`summary()` / `summary_table()` report how many external calls were saved per tool.
+Set GRISP_TOOL_DEDUPE=off to disable.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_current_memo = contextvars.ContextVar("grisp_call_memo", default=None)
+
+
+def dedupe_enabled() -> bool:
+    return os.getenv("GRISP_TOOL_DEDUPE", "on").strip().lower() not in ("0", "false", "off", "no")
+
+
+def normalize(value: Any) -> Any:
+    """Argument value with case, whitespace and key order normalized away."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def call_key(tool: str, arguments: dict) -> str:
+    return json.dumps([tool, normalize(arguments)], sort_keys=True, default=str, ensure_ascii=False)
+
+
+def is_error(result: Any) -> bool:
+    # The tools report failures as text ("Error: ...", "Network or API error ...")
+    return isinstance(result, str) and "error" in result[:120].lower()
+
+
+class _Flight:
+    """One call: the future its waiters block on, and how long the real call took."""
+    __slots__ = ("future", "seconds")
+
+    def __init__(self):
+        self.future = Future()
+        self.seconds = 0.0
+
+
+class CallMemo:
+    """Thread-safe single-flight + memo of tool results for one run."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, tool: str, outcome: str, seconds: float = 0.0):
+        with self._lock:
+            row = self._stats.setdefault(tool, {"calls": 0, "executed": 0, "coalesced": 0, "memo_hits": 0, "seconds_saved": 0.0})
+            row["calls"] += 1
+            row[outcome] += 1
+            row["seconds_saved"] += seconds
+
+    def call(self, tool: str, arguments: dict, run: Callable[[], Any]) -> Tuple[Any, Optional[str]]:
+        """
+        Result of `run()` for this tool call, and how it was obtained: None (executed here),
+        "coalesced" (waited for the same call in flight) or "memo" (an earlier call's result).
+        """
+        key = call_key(tool, arguments)
+        with self._lock:
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+            in_flight = not flight.future.done()
+
+        if not owner:
+            # Raises the original call's exception if it failed
+            result = flight.future.result()
+            outcome = "coalesced" if in_flight else "memo_hits"
+            self._count(tool, outcome, flight.seconds)
+            return result, "coalesced" if in_flight else "memo"
+
+        started = time.perf_counter()
+        try:
+            result = run()
+        except BaseException as e:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.future.set_exception(e)
+            self._count(tool, "executed")
+            raise
+        flight.seconds = time.perf_counter() - started
+        if is_error(result):
+            # Callers already waiting share the error; later ones retry
+            with self._lock:
+                self._flights.pop(key, None)
+        flight.future.set_result(result)
+        self._count(tool, "executed")
+        return result, None
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {tool: dict(row) for tool, row in self._stats.items()}
+
+    def saved_calls(self) -> int:
+        return sum(row["coalesced"] + row["memo_hits"] for row in self.summary().values())
+
+    def summary_table(self) -> str:
+        """Markdown table of tool calls executed vs. served from the memo, per tool."""
+        summary = self.summary()
+        saved = sum(row["coalesced"] + row["memo_hits"] for row in summary.values())
+        total = sum(row["calls"] for row in summary.values())
+        lines = [
+            f"Duplicate tool calls avoided: {saved} of {total} "
+            f"(≈{sum(row['seconds_saved'] for row in summary.values()):.1f} s of tool time)",
+            "",
+            "| Tool | Calls | Executed | Waited on in-flight call | From run memo | Saved s |",
+            "|---|---:|---:|---:|---:|---:|",
+        ]
+        for tool, row in sorted(summary.items(), key=lambda kv: -(kv[1]["coalesced"] + kv[1]["memo_hits"])):
+            lines.append(f"| {tool} | {row['calls']} | {row['executed']} | {row['coalesced']} | "
+                         f"{row['memo_hits']} | {row['seconds_saved']:.2f} |")
+        return "\n".join(lines)
+
+
+def current_call_memo() -> Optional[CallMemo]:
+    return _current_memo.get()
+
+
+@contextmanager
+def use_call_memo(memo: Optional[CallMemo] = None):
+    """
+    Makes `memo` (a new CallMemo by default) the current one for the duration of the block.
+    Yields None, leaving tool calls un-deduplicated, when GRISP_TOOL_DEDUPE is off.
+    """
+    if memo is None and dedupe_enabled():
+        memo = CallMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
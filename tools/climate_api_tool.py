@@ -1,28 +1,40 @@
-import pandas as pd
-from crewai.tools import BaseTool
 from typing import Optional # Import Optional
+from tools.base import GrispTool
+from tools.ndgain_store import NDGAIN_CACHE_DIR, NdGainCube, load_ndgain_cube
+from tools.records import ClimateRecord
 
-class ClimateApiTool(BaseTool):
+# What ClimateApiTool returns: the values for one year, their trend, their rank among countries, or all three
+MODES = ("latest", "trend", "percentile", "all")
+
+class ClimateApiTool(GrispTool):
     name: str = "ClimateApiTool"
     description: str = (
         "Fetches climate vulnerability and readiness score from ND-GAIN index "
-        "for a given country. Input should be a country name (e.g., 'India')."
+        "for a given country. Input should be a country name or ISO code (e.g., 'India' or 'IND'). "
+        "Optional: mode = 'latest' (most recent values), 'trend' (change per year over the last "
+        "trend_years years), 'percentile' (rank among all countries) or 'all' (default: all three); "
+        "year = use that year instead of the most recent one."
     )
 
-    excel_path: str = "data/static_reports/ndgain.xlsx" 
-    
-    # Declare 'df' as an optional field of type pandas.DataFrame
-    # It will be initialized to None by default, and then populated in __init__
-    df: Optional[pd.DataFrame] = None 
-    
+    excel_path: str = "data/static_reports/ndgain.xlsx"
+
+    # Folder holding the country x year NumPy cube built by tools/ndgain_store.py
+    cache_dir: str = NDGAIN_CACHE_DIR
+
+    # The memory-mapped cube, loaded in __init__
+    cube: Optional[NdGainCube] = None
+
+    # Default window for mode='trend'
+    trend_years: int = 10
+
     def __init__(self, **kwargs):
-        super().__init__(**kwargs) 
-        
+        super().__init__(**kwargs)
+
         try:
-            # IMPORTANT: Replace 'ndgain' with your actual sheet name if it's different.
-            # If your data is on the first sheet and you don't know its name, use sheet_name=0
-            self.df = pd.read_excel(self.excel_path, sheet_name='ndgain') 
-            
+            # The workbook is converted once into a float32 country x year x metric cube
+            # (see tools/ndgain_store.py); later starts just memory-map it.
+            self.cube = load_ndgain_cube(self.excel_path, self.cache_dir)
+
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"Error: The Excel file was not found at {self.excel_path}. "
@@ -40,29 +52,67 @@ class ClimateApiTool(BaseTool):
         except Exception as e:
             raise Exception(f"An unexpected error occurred while reading the Excel file: {e}")
 
-    def _run(self, country: str) -> str:
+    def _run(self, country: str, mode: str = "all", year: Optional[int] = None, trend_years: Optional[int] = None):
         """
         Fetches climate vulnerability and readiness score for a given country.
-        Input: country name (e.g., 'India')
+        Input: country name or ISO code (e.g., 'India'), optionally mode, year and trend_years
         """
-        # Ensure that df is not None before proceeding
-        if self.df is None:
+        # Ensure that the cube is loaded before proceeding
+        if self.cube is None:
             return "Error: Climate data could not be loaded. Please check the Excel file path and content."
 
-        # Ensure country matching is case-insensitive
-        row = self.df[self.df["Country"].str.lower() == country.lower()]
-        
-        if row.empty:
+        mode = (mode or "all").strip().lower()
+        if mode not in MODES:
+            return f"Error: unknown mode '{mode}'. Use one of: {', '.join(MODES)}."
+
+        # Names, aliases and ISO codes ("USA", "US", "United States") all resolve to the same row
+        row = self.cube.find(country)
+        if row is None:
             return f"No data found for {country} in ND-GAIN dataset."
 
-        # Get the first matching row
-        row = row.iloc[0]
-
-        # Format the output string
-        return (
-            f"Climate Risk Score for {country}:\n"
-            f"- ND-GAIN Index: {row['ND-GAIN Index']}\n"
-            f"- Vulnerability: {row['Vulnerability']}\n"
-            f"- Readiness: {row['Readiness']}\n"
-            f"- Year: {int(row['Year'])}"
-        )
\ No newline at end of file
+        # LLMs sometimes pass "latest" or "2020s"; tell them what is accepted instead of failing
+        try:
+            year = int(year) if year else None
+            # Only a missing trend_years gets the default; 0 or less is rejected below, not replaced
+            trend_years = self.trend_years if trend_years is None else int(trend_years)
+            if trend_years < 1:
+                raise ValueError(trend_years)
+        except (TypeError, ValueError):
+            return (f"Error: year and trend_years must be whole numbers, trend_years at least 1 (e.g. year=2021, trend_years=5), "
+                    f"got year={year!r}, trend_years={trend_years!r}. Leave year out for the latest data.")
+
+        latest = self.cube.latest(row, year)
+        if latest is None:
+            suffix = f" up to {year}" if year else ""
+            return f"No data found for {country} in ND-GAIN dataset{suffix}."
+        data_year, values = latest
+
+        trend_first_year, trend_slopes = None, ()
+        if mode in ("trend", "all"):
+            trend = self.cube.trend(row, data_year, trend_years)
+            trend_first_year, trend_slopes = trend.first_year, tuple(_rounded(s, 6) for s in trend.slopes)
+
+        percentiles, countries_ranked = (), 0
+        if mode in ("percentile", "all"):
+            ranks, countries_ranked = self.cube.percentiles(row, data_year)
+            percentiles = tuple(_rounded(p, 1) for p in ranks)
+
+        return ClimateRecord(
+            country=str(self.cube.names[row]),  # the dataset's spelling, whichever alias or code was asked for
+            year=data_year,
+            ndgain_index=_rounded(values[0]),
+            vulnerability=_rounded(values[1]),
+            readiness=_rounded(values[2]),
+            iso3=str(self.cube.iso3[row]),
+            trend_first_year=trend_first_year,
+            trend_slopes=trend_slopes,
+            percentiles=percentiles,
+            countries_ranked=countries_ranked,
+        )
+
+
+def _rounded(value, digits: int = 4) -> Optional[float]:
+    # The cube is float32; rounding drops the float32 -> float64 noise (45.9632 instead of 45.96320867...)
+    if value is None or value != value:
+        return None
+    return round(float(value), digits)
@@ -0,0 +1,139 @@
+"""
+Token-budgeted compaction of the text handed to the LLMs.
+
+Tool outputs (article descriptions, URLs, search snippets) and earlier task outputs would
+otherwise go verbatim into every downstream prompt. `compact()` brings a text under a token
+budget in two steps:
+1. drop repeated sentences (lines of a few words or more with the same normalized text, see
+   tools/dedupe.py), also across the sections of one prompt when they share a Deduper;
+2. if it is still too long, shorten overly long lines (an article description rarely needs more
+   than its first sentence or two), then keep the lines carrying the most facts (numbers,
+   headings, the first line) in their original order, and note how many lines were left out.
+
+Token counts are estimated at ~4 characters per token, which is close enough for budgeting.
+"""
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from tools.dedupe import Deduper
+
+# Budget for the text one tool call returns to the agent (0 = no limit)
+TOOL_OUTPUT_TOKENS = int(os.getenv("GRISP_TOOL_OUTPUT_TOKENS", "1200"))
+# Default budget for the context (earlier task outputs + recalled memory) of one task.
+# An agent YAML can set its own with `context_tokens`.
+CONTEXT_TOKENS = int(os.getenv("GRISP_CONTEXT_TOKENS", "3000"))
+
+CHARS_PER_TOKEN = 4
+
+# Shorter lines ("- Year: 2023", "},") repeat legitimately and are never dropped as duplicates
+MIN_DEDUPE_WORDS = 5
+
+_DIGITS = re.compile(r"\d")
+_URL_ONLY = re.compile(r"^\W*(?:link:\s*)?(?:https?://|www\.)\S+\s*$", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def _line_score(line: str, index: int) -> float:
+    """How much a line is worth keeping: facts (numbers), structure (headings) and the opening line."""
+    stripped = line.strip()
+    if _URL_ONLY.match(stripped):
+        return -3.0
+    score = 0.0
+    if index == 0:
+        score += 3.0
+    if _DIGITS.search(stripped):
+        score += 2.0
+    if stripped.endswith(":") or stripped.startswith(("#", "-", "*", "•")) or stripped[:1] in "{[\"":
+        score += 1.0
+    if len(stripped.split()) < 3 and not stripped.endswith(":"):
+        score -= 1.0
+    return score
+
+
+def _truncate(line: str, tokens: int) -> str:
+    limit = max(0, tokens * CHARS_PER_TOKEN - 1)
+    return line if len(line) <= limit else line[:limit].rstrip() + "…"
+
+
+def compact(text: str, budget: int, deduper: Optional[Deduper] = None) -> str:
+    """`text` without repeated sentences, cut down to the most informative lines if it exceeds `budget` tokens."""
+    if not text or budget <= 0:
+        return text
+    deduper = deduper if deduper is not None else Deduper()
+
+    lines: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            # Keep paragraph breaks, but never two in a row
+            if lines and lines[-1]:
+                lines.append("")
+        elif len(line.split()) < MIN_DEDUPE_WORDS or deduper.add_text(line):
+            lines.append(line.rstrip())
+    while lines and not lines[-1]:
+        lines.pop()
+
+    compacted = "\n".join(lines)
+    if estimate_tokens(compacted) <= budget:
+        return compacted
+
+    # No single line gets more than an eighth of the budget
+    line_cap = max(24, budget // 8)
+    lines = [_truncate(line, line_cap) for line in lines]
+    compacted = "\n".join(lines)
+    if estimate_tokens(compacted) <= budget:
+        return compacted
+
+    # Rank the lines, keep as many of the best as fit, and restore the original order
+    content = [(i, line) for i, line in enumerate(lines) if line]
+    ranked = sorted(content, key=lambda item: (-_line_score(item[1], item[0]), item[0]))
+    remaining = budget - 12  # room for the note below
+    kept = []
+    for i, line in ranked:
+        cost = estimate_tokens(line) + 1
+        if cost <= remaining:
+            kept.append((i, line))
+            remaining -= cost
+        elif not kept and remaining > 0:
+            # A single line longer than the whole budget is truncated rather than dropped
+            kept.append((i, _truncate(line, remaining)))
+            remaining = 0
+    kept.sort()
+
+    output, previous = [], None
+    for i, line in kept:
+        if previous is not None and i > previous + 1 and lines[i - 1] == "":
+            output.append("")
+        output.append(line)
+        previous = i
+    omitted = len(content) - len(kept)
+    output.append(f"[compacted: {omitted} of {len(content)} lines omitted]")
+    return "\n".join(output)
+
+
+def compact_sections(sections: Iterable[Tuple[str, str]], budget: int) -> str:
+    """
+    Joins labelled texts into one context under a shared budget. Each section gets an equal
+    share of what is left, so a short section leaves more room for the ones after it, and a
+    sentence repeated from an earlier section is dropped from the later ones.
+    """
+    sections = [(label, text) for label, text in sections if text and text.strip()]
+    if budget <= 0:
+        return "\n\n".join(f"### {label}\n{text}" for label, text in sections)
+
+    deduper = Deduper()
+    remaining = budget
+    parts = []
+    for n, (label, text) in enumerate(sections):
+        header = f"### {label}"
+        share = remaining // (len(sections) - n) - estimate_tokens(header) - 1
+        body = compact(text, max(share, 1), deduper)
+        if not body.strip():
+            continue
+        part = f"{header}\n{body}"
+        parts.append(part)
+        remaining -= estimate_tokens(part) + 1
+    return "\n\n".join(parts)
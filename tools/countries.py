@@ -0,0 +1,344 @@
+"""
+Country resolution shared by the data tools.
+
+Agents name countries every which way ("USA", "US", "United States", "United States of
+America"), and each dataset has its own spelling ("Korea, Rep.", "South Korea", "Korea,
+Republic of"). The resolver maps all of them to one `Country` through a hash index of names,
+aliases and ISO2/ISO3 codes built once per process, so a lookup is a dict hit. Unknown inputs
+fall back to a fuzzy match (difflib) on the names, cached per input.
+
+Datasets key their rows with `country_key(name)`: the ISO3 code when the name resolves, else
+the normalized name itself (historical entries like "West Germany (FRG)" stay distinct).
+"""
+import difflib
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# ISO2 ISO3 Name|alias|alias... (ISO 3166-1 plus the spellings used by the World Bank,
+# ND-GAIN and the GTD). Kosovo uses the codes the World Bank uses.
+_COUNTRY_TABLE = """
+AF AFG Afghanistan|Islamic Republic of Afghanistan
+AX ALA Aland Islands
+AL ALB Albania
+DZ DZA Algeria
+AS ASM American Samoa
+AD AND Andorra
+AO AGO Angola
+AI AIA Anguilla
+AG ATG Antigua and Barbuda|Antigua
+AR ARG Argentina
+AM ARM Armenia
+AW ABW Aruba
+AU AUS Australia
+AT AUT Austria
+AZ AZE Azerbaijan
+BS BHS Bahamas|Bahamas, The|The Bahamas
+BH BHR Bahrain
+BD BGD Bangladesh
+BB BRB Barbados
+BY BLR Belarus|Byelorussia
+BE BEL Belgium
+BZ BLZ Belize
+BJ BEN Benin|Dahomey
+BM BMU Bermuda
+BT BTN Bhutan
+BO BOL Bolivia|Bolivia (Plurinational State of)|Plurinational State of Bolivia
+BA BIH Bosnia and Herzegovina|Bosnia-Herzegovina|Bosnia
+BW BWA Botswana
+BR BRA Brazil|Brasil
+VG VGB British Virgin Islands|Virgin Islands, British
+BN BRN Brunei|Brunei Darussalam
+BG BGR Bulgaria
+BF BFA Burkina Faso|Upper Volta
+BI BDI Burundi
+CV CPV Cabo Verde|Cape Verde
+KH KHM Cambodia|Kampuchea
+CM CMR Cameroon
+CA CAN Canada
+KY CYM Cayman Islands
+CF CAF Central African Republic|CAR
+TD TCD Chad
+CL CHL Chile
+CN CHN China|People's Republic of China|PRC|Mainland China
+CO COL Colombia
+KM COM Comoros
+CG COG Congo|Republic of the Congo|Congo, Rep.|Congo (Brazzaville)|People's Republic of the Congo
+CD COD Democratic Republic of the Congo|Congo, Dem. Rep.|DR Congo|DRC|Congo (Kinshasa)|Zaire|Congo, The Democratic Republic of the
+CK COK Cook Islands
+CR CRI Costa Rica
+CI CIV Cote d'Ivoire|Côte d'Ivoire|Ivory Coast
+HR HRV Croatia
+CU CUB Cuba
+CW CUW Curacao|Curaçao
+CY CYP Cyprus
+CZ CZE Czechia|Czech Republic
+DK DNK Denmark
+DJ DJI Djibouti
+DM DMA Dominica
+DO DOM Dominican Republic
+EC ECU Ecuador
+EG EGY Egypt|Egypt, Arab Rep.|Arab Republic of Egypt
+SV SLV El Salvador
+GQ GNQ Equatorial Guinea
+ER ERI Eritrea
+EE EST Estonia
+SZ SWZ Eswatini|Swaziland
+ET ETH Ethiopia
+FK FLK Falkland Islands|Falkland Islands (Malvinas)
+FO FRO Faroe Islands
+FJ FJI Fiji
+FI FIN Finland
+FR FRA France
+GF GUF French Guiana
+PF PYF French Polynesia
+GA GAB Gabon
+GM GMB Gambia|Gambia, The|The Gambia
+GE GEO Georgia
+DE DEU Germany|Federal Republic of Germany
+GH GHA Ghana
+GI GIB Gibraltar
+GR GRC Greece
+GL GRL Greenland
+GD GRD Grenada
+GP GLP Guadeloupe
+GU GUM Guam
+GT GTM Guatemala
+GG GGY Guernsey
+GN GIN Guinea
+GW GNB Guinea-Bissau
+GY GUY Guyana
+HT HTI Haiti
+VA VAT Holy See|Vatican|Vatican City
+HN HND Honduras
+HK HKG Hong Kong|Hong Kong SAR, China|Hong Kong, China
+HU HUN Hungary
+IS ISL Iceland
+IN IND India|Bharat
+ID IDN Indonesia
+IR IRN Iran|Iran, Islamic Rep.|Islamic Republic of Iran|Iran (Islamic Republic of)
+IQ IRQ Iraq
+IE IRL Ireland|Republic of Ireland
+IM IMN Isle of Man
+IL ISR Israel
+IT ITA Italy
+JM JAM Jamaica
+JP JPN Japan
+JE JEY Jersey
+JO JOR Jordan
+KZ KAZ Kazakhstan
+KE KEN Kenya
+KI KIR Kiribati
+KP PRK North Korea|Korea, Dem. People's Rep.|Korea, Dem. Rep.|Democratic People's Republic of Korea|DPRK
+KR KOR South Korea|Korea, Rep.|Republic of Korea|Korea
+XK XKX Kosovo
+KW KWT Kuwait
+KG KGZ Kyrgyzstan|Kyrgyz Republic
+LA LAO Laos|Lao PDR|Lao People's Democratic Republic
+LV LVA Latvia
+LB LBN Lebanon
+LS LSO Lesotho
+LR LBR Liberia
+LY LBY Libya|Libyan Arab Jamahiriya
+LI LIE Liechtenstein
+LT LTU Lithuania
+LU LUX Luxembourg
+MO MAC Macao|Macau|Macao SAR, China
+MG MDG Madagascar
+MW MWI Malawi
+MY MYS Malaysia
+MV MDV Maldives
+ML MLI Mali
+MT MLT Malta
+MH MHL Marshall Islands
+MQ MTQ Martinique
+MR MRT Mauritania
+MU MUS Mauritius
+YT MYT Mayotte
+MX MEX Mexico
+FM FSM Micronesia|Micronesia, Fed. Sts.|Federated States of Micronesia|Micronesia (Federated States of)
+MD MDA Moldova|Republic of Moldova
+MC MCO Monaco
+MN MNG Mongolia
+ME MNE Montenegro
+MS MSR Montserrat
+MA MAR Morocco
+MZ MOZ Mozambique
+MM MMR Myanmar|Burma
+NA NAM Namibia
+NR NRU Nauru
+NP NPL Nepal
+NL NLD Netherlands|Holland|The Netherlands
+NC NCL New Caledonia
+NZ NZL New Zealand
+NI NIC Nicaragua
+NE NER Niger
+NG NGA Nigeria
+MK MKD North Macedonia|Macedonia|Republic of North Macedonia|Macedonia, FYR
+MP MNP Northern Mariana Islands
+NO NOR Norway
+OM OMN Oman
+PK PAK Pakistan
+PW PLW Palau
+PS PSE Palestine|West Bank and Gaza|State of Palestine|Palestinian Territories|West Bank and Gaza Strip
+PA PAN Panama
+PG PNG Papua New Guinea
+PY PRY Paraguay
+PE PER Peru
+PH PHL Philippines
+PL POL Poland
+PT PRT Portugal
+PR PRI Puerto Rico
+QA QAT Qatar
+RE REU Reunion|Réunion
+RO ROU Romania
+RU RUS Russia|Russian Federation
+RW RWA Rwanda
+KN KNA Saint Kitts and Nevis|St. Kitts and Nevis
+LC LCA Saint Lucia|St. Lucia
+MF MAF Saint Martin|St. Martin (French part)
+VC VCT Saint Vincent and the Grenadines|St. Vincent and the Grenadines
+WS WSM Samoa|Western Samoa
+SM SMR San Marino
+ST STP Sao Tome and Principe|São Tomé and Príncipe
+SA SAU Saudi Arabia
+SN SEN Senegal
+RS SRB Serbia
+SC SYC Seychelles
+SL SLE Sierra Leone
+SG SGP Singapore
+SX SXM Sint Maarten|Sint Maarten (Dutch part)
+SK SVK Slovakia|Slovak Republic
+SI SVN Slovenia
+SB SLB Solomon Islands
+SO SOM Somalia
+ZA ZAF South Africa
+SS SSD South Sudan
+ES ESP Spain
+LK LKA Sri Lanka|Ceylon
+SD SDN Sudan
+SR SUR Suriname|Surinam
+SE SWE Sweden
+CH CHE Switzerland
+SY SYR Syria|Syrian Arab Republic
+TW TWN Taiwan|Taiwan, China|Republic of China
+TJ TJK Tajikistan
+TZ TZA Tanzania|United Republic of Tanzania
+TH THA Thailand
+TL TLS Timor-Leste|East Timor
+TG TGO Togo
+TO TON Tonga
+TT TTO Trinidad and Tobago
+TN TUN Tunisia
+TR TUR Turkey|Türkiye|Turkiye
+TM TKM Turkmenistan
+TC TCA Turks and Caicos Islands
+TV TUV Tuvalu
+UG UGA Uganda
+UA UKR Ukraine
+AE ARE United Arab Emirates|UAE
+GB GBR United Kingdom|UK|Great Britain|Britain|United Kingdom of Great Britain and Northern Ireland|England
+US USA United States|United States of America|America|U.S.|U.S.A.
+UY URY Uruguay
+UZ UZB Uzbekistan
+VU VUT Vanuatu|New Hebrides
+VE VEN Venezuela|Venezuela, RB|Bolivarian Republic of Venezuela|Venezuela (Bolivarian Republic of)
+VN VNM Vietnam|Viet Nam
+VI VIR U.S. Virgin Islands|Virgin Islands (U.S.)
+EH ESH Western Sahara
+YE YEM Yemen|Yemen, Rep.|Republic of Yemen
+ZM ZMB Zambia
+ZW ZWE Zimbabwe|Rhodesia
+"""
+
+# Minimum difflib ratio for a fuzzy name match
+FUZZY_CUTOFF = 0.85
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_", re.UNICODE)
+
+
+@dataclass(slots=True, frozen=True)
+class Country:
+    iso2: str
+    iso3: str
+    name: str
+    aliases: Tuple[str, ...] = ()
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key: accents, case, punctuation, '&' and a leading 'the' don't matter."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    text = _PUNCTUATION.sub(" ", text.casefold().replace("&", " and ").replace("'", ""))
+    words = text.split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    return " ".join(words)
+
+
+def _parse_table(table: str) -> Tuple[Country, ...]:
+    countries = []
+    for line in table.strip().splitlines():
+        iso2, iso3, names = line.split(" ", 2)
+        name, *aliases = names.split("|")
+        countries.append(Country(iso2, iso3, name, tuple(aliases)))
+    return tuple(countries)
+
+
+class CountryResolver:
+    """Name / alias / ISO2 / ISO3 -> Country, through one precomputed dict."""
+
+    def __init__(self, countries: Tuple[Country, ...] = None):
+        self.countries = countries if countries is not None else _parse_table(_COUNTRY_TABLE)
+        self._codes: Dict[str, Country] = {}
+        self._names: Dict[str, Country] = {}
+        for country in self.countries:
+            self._codes[country.iso2] = country
+            self._codes[country.iso3] = country
+            for name in (country.name, *country.aliases):
+                self._names.setdefault(normalize_name(name), country)
+        self._fuzzy: Dict[str, Optional[Country]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, text: str, fuzzy: bool = True) -> Optional[Country]:
+        """The country `text` names or codes, or None."""
+        if not text or not str(text).strip():
+            return None
+        text = str(text).strip()
+        code = text.upper().replace(".", "")
+        if len(code) in (2, 3) and code in self._codes and (text.isupper() or normalize_name(text) not in self._names):
+            return self._codes[code]
+        key = normalize_name(text)
+        country = self._names.get(key)
+        if country is not None or not fuzzy:
+            return country
+
+        with self._lock:
+            if key in self._fuzzy:
+                return self._fuzzy[key]
+        # Short strings match too loosely; they must be exact codes or names
+        match = None
+        if len(key) > 4:
+            close = difflib.get_close_matches(key, self._names.keys(), n=1, cutoff=FUZZY_CUTOFF)
+            match = self._names[close[0]] if close else None
+        with self._lock:
+            self._fuzzy[key] = match
+        return match
+
+
+@lru_cache(maxsize=1)
+def get_resolver() -> CountryResolver:
+    """The process-wide resolver, built on first use."""
+    return CountryResolver()
+
+
+def resolve_country(text: str, fuzzy: bool = True) -> Optional[Country]:
+    return get_resolver().resolve(text, fuzzy)
+
+
+def country_key(name: str, fuzzy: bool = True) -> str:
+    """Dataset key for a country name or code: its ISO3 code, or the normalized name if unknown."""
+    country = resolve_country(name, fuzzy)
+    return country.iso3 if country is not None else normalize_name(name)
@@ -0,0 +1,203 @@
+"""
+Hash-based duplicate detection for streamed text (tweets, headlines, snippets).
+
+Texts are normalized (case, URLs, @mentions, a leading "RT @user:", punctuation and whitespace
+are dropped) and reduced to a 64-bit BLAKE2 fingerprint, so the set of seen items costs a few
+bytes per unique text no matter how long the texts are. Near-identical texts (syndicated copies
+of one article, a tweet re-posted with a hashtag added or a word changed) are caught by SimHash,
+see NearDuplicateIndex below.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_RETWEET_PREFIX = re.compile(r"^\s*rt\s+@\w+:?\s*", re.IGNORECASE)
+_URLS = re.compile(r"https?://\S+|www\.\S+")
+_MENTIONS = re.compile(r"@\w+")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    text = _RETWEET_PREFIX.sub("", text or "")
+    text = _URLS.sub(" ", text)
+    text = _MENTIONS.sub(" ", text)
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+def fingerprint(value: str) -> int:
+    """64-bit hash of a string."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def text_fingerprint(text: str) -> int:
+    """Fingerprint of the normalized text: retweets, re-shares with another link and case/punctuation variants collide."""
+    return fingerprint(normalize_text(text))
+
+
+class Deduper:
+    """
+    Remembers fingerprints of the items seen so far. With `max_distance`, add_text also drops
+    near-duplicates: texts whose SimHash (below) is within max_distance bits of an earlier kept
+    text's. Texts under `min_words` words are only matched exactly, since on a few words one
+    changed word ("love" / "hate") is a different text.
+    """
+
+    def __init__(self, max_distance: Optional[int] = None, min_words: int = 6):
+        self._seen = set()
+        self.duplicates = 0
+        self.min_words = min_words
+        self.max_distance = max_distance
+        # SimHashes of the texts kept so far (near-duplicate matching only)
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def add(self, key: Hashable) -> bool:
+        """True if `key` is new (and remembers it), False for a duplicate."""
+        if isinstance(key, str):
+            key = fingerprint(key)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        return True
+
+    def add_text(self, text: str) -> bool:
+        return self.add_texts([text])[0]
+
+    def add_texts(self, texts: Sequence[str]) -> List[bool]:
+        """add_text() for each text in order; the SimHashes of a batch are computed together."""
+        normalized = [normalize_text(text) for text in texts]
+        new = [self.add(fingerprint(n)) for n in normalized]
+        if self.max_distance is None:
+            return new
+        words = {i: normalized[i].split() for i in range(len(texts)) if new[i]}
+        check = [i for i, w in words.items() if len(w) >= self.min_words]
+        if not check:
+            return new
+        # A batch is compared with every kept text in one go: tweet searches keep a few thousand
+        # texts at most, and a band index (NearDuplicateIndex) with the narrow bands of a large
+        # max_distance ends up comparing most of them one by one anyway
+        hashes = np.array(_simhashes([_word_shingles(words[i]) for i in check]), dtype=np.uint64)
+        near_kept = (hamming_matrix(hashes, self._hashes) <= self.max_distance).any(axis=1).tolist()
+        # Pairs of this batch within max_distance, each under its later text: {j: [earlier k, ...]}
+        near_batch: Dict[int, List[int]] = {}
+        for j, k in zip(*np.nonzero(np.tril(hamming_matrix(hashes, hashes) <= self.max_distance, -1))):
+            near_batch.setdefault(int(j), []).append(int(k))
+        kept = []
+        is_kept = [False] * len(check)
+        for j, i in enumerate(check):
+            # Like adding the texts one at a time: a text is a copy of a kept one, earlier or in this batch
+            if near_kept[j] or any(is_kept[k] for k in near_batch.get(j, ())):
+                self.duplicates += 1
+                new[i] = False
+            else:
+                kept.append(j)
+                is_kept[j] = True
+        self._hashes = np.concatenate([self._hashes, hashes[kept]])
+        return new
+
+    def __len__(self):
+        return len(self._seen)
+
+
+
+# --- near-duplicates -------------------------------------------------------------------
+#
+# Syndicated articles and re-posted headlines are rarely byte-identical: a wire story shows up
+# with "- Reuters" appended, a trimmed description or a changed word. SimHash maps a text to 64
+# bits such that similar texts differ in few bits; NearDuplicateIndex finds an earlier text
+# within `max_distance` bits without comparing against every one of them.
+
+SIMHASH_BITS = 64
+# Texts are compared by their word n-grams. Headlines and descriptions are short, and on short
+# texts single words separate best: a syndicated copy lands 2-4 bits from the original, a
+# different story on the same subject ("holds rates" vs. "cuts rates") 8 or more.
+SHINGLE_WORDS = 1
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> List[str]:
+    return _word_shingles(normalize_text(text).split(), size)
+
+
+def _word_shingles(words: List[str], size: int = SHINGLE_WORDS) -> List[str]:
+    if len(words) <= size:
+        return [" ".join(words)]
+    if size == 1:
+        return words
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+# The same words come back in text after text (a search's tweets share most of their vocabulary),
+# so shingle fingerprints are cached
+_shingle_fingerprint = lru_cache(maxsize=1 << 16)(fingerprint)
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the normalized text's word shingles."""
+    return simhashes([text])[0]
+
+
+def simhashes(texts: Sequence[str]) -> List[int]:
+    """simhash() of every text, with one set of NumPy calls for the whole batch (short texts add up)."""
+    return _simhashes([shingles(text) for text in texts])
+
+
+def _simhashes(per_text: List[List[str]]) -> List[int]:
+    if not per_text:
+        return []
+    counts = np.fromiter((len(s) for s in per_text), dtype=np.int64, count=len(per_text))
+    hashes = np.fromiter((_shingle_fingerprint(s) for group in per_text for s in group), dtype=np.uint64,
+                         count=int(counts.sum()))
+    # One row of 64 bits per shingle (little-endian bytes, so bit i of the row is bit i of the hash)
+    bits = np.unpackbits(hashes.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    # Per text, a bit is set when most of its shingles have it set
+    starts = np.cumsum(counts) - counts
+    votes = np.add.reduceat(bits.astype(np.int32), starts, axis=0) * 2 > counts[:, None]
+    return [int(v) for v in np.packbits(votes, axis=1, bitorder="little").view("<u8")[:, 0]]
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def hamming_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Bit distances between every hash of `a` (rows) and every hash of `b` (columns), both uint64 arrays."""
+    if hasattr(np, "bitwise_count"):
+        # NumPy 2.0+: a popcount instruction per element
+        return np.bitwise_count(a[:, None] ^ b[None, :])
+    xor = (a[:, None] ^ b[None, :]).astype("<u8")
+    return _BYTE_BITS[xor.view(np.uint8)].reshape(len(a), len(b), 8).sum(axis=2, dtype=np.uint8)
+
+
+class NearDuplicateIndex:
+    """
+    SimHashes seen so far, each with the item it stands for. The 64 bits are split into
+    max_distance + 1 bands: two hashes within max_distance bits agree on at least one whole band,
+    so only items sharing a band value are compared.
+    """
+
+    def __init__(self, max_distance: int = 5):
+        self.max_distance = max_distance
+        self._band_bits = SIMHASH_BITS // (max_distance + 1)
+        self._mask = (1 << self._band_bits) - 1
+        self._bands: List[Dict[int, List[Tuple[int, Hashable]]]] = [{} for _ in range(max_distance + 1)]
+
+    def _keys(self, value: int):
+        return ((value >> (i * self._band_bits)) & self._mask for i in range(len(self._bands)))
+
+    def find(self, value: int) -> Optional[Hashable]:
+        """The item of an indexed hash within max_distance bits of `value`, or None."""
+        for band, key in zip(self._bands, self._keys(value)):
+            for other, item in band.get(key, ()):
+                if hamming(value, other) <= self.max_distance:
+                    return item
+        return None
+
+    def add(self, value: int, item: Hashable):
+        for band, key in zip(self._bands, self._keys(value)):
+            band.setdefault(key, []).append((value, item))
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Root folder for every binary cache derived from the static Excel reports.
+CACHE_ROOT = "data/cache"
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Streams a file through SHA-256 so large workbooks are never fully held in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: str) -> dict:
+    """Cheap fingerprint (mtime + size) of a source file. The hash is only computed when needed."""
+    stat = os.stat(path)
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def read_manifest(cache_dir: str) -> Optional[dict]:
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A half-written or corrupt manifest is treated as a missing cache
+        return None
+
+
+def is_cache_fresh(cache_dir: str, source_path: str, version: int = 1) -> bool:
+    """
+    Checks whether the cache in `cache_dir` was built from the current `source_path`.
+    The mtime/size pair is checked first; when it differs (e.g. the file was touched or copied)
+    the SHA-256 decides, and a matching hash refreshes the stored mtime so the next check is cheap again.
+    """
+    manifest = read_manifest(cache_dir)
+    if manifest is None or manifest.get("version") != version:
+        return False
+
+    source = manifest.get("source", {})
+    current = source_fingerprint(source_path)
+    if source.get("mtime") == current["mtime"] and source.get("size") == current["size"]:
+        return True
+
+    if source.get("size") != current["size"] or source.get("sha256") != file_sha256(source_path):
+        return False
+
+    # Same content, new mtime: remember it so we don't re-hash on every start
+    manifest["source"].update(current)
+    _write_json_atomic(os.path.join(cache_dir, MANIFEST_NAME), manifest)
+    return True
+
+
+def write_columns(
+    cache_dir: str,
+    source_path: str,
+    columns: Dict[str, np.ndarray],
+    meta: Optional[dict] = None,
+    version: int = 1,
+) -> None:
+    """
+    Writes each column as its own `.npy` file plus a manifest describing the source file.
+    The cache is built in a temporary sibling folder and swapped in, so a reader never sees a half-written cache.
+    """
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".building-", dir=parent)
+
+    try:
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+
+        manifest = {
+            "version": version,
+            "source": {
+                "path": source_path,
+                **source_fingerprint(source_path),
+                "sha256": file_sha256(source_path),
+            },
+            "columns": {name: {"dtype": str(values.dtype), "rows": int(len(values))} for name, values in columns.items()},
+            "meta": meta or {},
+        }
+        _write_json_atomic(os.path.join(tmp_dir, MANIFEST_NAME), manifest)
+
+        _swap_in(tmp_dir, cache_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _swap_in(new_dir: str, cache_dir: str) -> None:
+    """
+    Replaces `cache_dir` with `new_dir` by two renames: the old cache is moved aside, the new one
+    moved in, and only then is the old one deleted. The cache is never half-deleted, readers that
+    already mapped the old columns keep them, and a failed rename puts the old cache back.
+    """
+    if not os.path.exists(cache_dir):
+        os.replace(new_dir, cache_dir)
+        return
+    old_dir = os.path.join(os.path.dirname(new_dir), ".replaced-" + os.path.basename(new_dir))
+    os.replace(cache_dir, old_dir)
+    try:
+        os.replace(new_dir, cache_dir)
+    except Exception:
+        os.replace(old_dir, cache_dir)
+        raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_columns(cache_dir: str, names: Iterable[str], mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Loads the requested `.npy` columns. With `mmap=True` the arrays are read-only memory maps,
+    so loading is O(1) and several worker processes share the same page cache.
+    """
+    mode = "r" if mmap else None
+    return {
+        name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+        for name in names
+    }
+
+
+def _write_json_atomic(path: str, payload: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,138 @@
+"""
+Per-run store of the typed records (tools/records.py) the tools produce.
+
+A run installs its store with `use_fact_store(...)`; tool calls made anywhere inside that run,
+including on crewai's worker threads (they copy the caller's context), add their records to it.
+`factor_scope(name)` tags the records with the factor agent that fetched them.
+"""
+import contextvars
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set, Tuple
+
+from tools.records import Record
+
+_current_store = contextvars.ContextVar("grisp_fact_store", default=None)
+_current_factor = contextvars.ContextVar("grisp_factor", default=None)
+
+
+@dataclass(slots=True, frozen=True)
+class Fact:
+    factor: Optional[str]
+    tool: str
+    record: Record
+
+
+@dataclass(slots=True, frozen=True)
+class ToolCall:
+    """One tool invocation: its arguments and a digest of the text the agent got back."""
+    factor: Optional[str]
+    tool: str
+    arguments: dict
+    digest: str
+
+
+class FactStore:
+    """Thread-safe, append-only list of the records (and tool calls) produced during one run."""
+
+    def __init__(self, country: Optional[str] = None):
+        self.country = country
+        self._facts: List[Fact] = []
+        self._calls: List[ToolCall] = []
+        # (id(record), factor) of every record added: a deduplicated tool call (tools/call_memo.py)
+        # hands back the same record object, which is stored once per factor. The store keeps
+        # the record alive, so its id cannot be reused meanwhile.
+        self._added: Set[Tuple[int, Optional[str]]] = set()
+        self._lock = threading.Lock()
+
+    def add_call(self, tool: str, arguments: dict, output: str, factor: Optional[str] = None):
+        factor = factor if factor is not None else _current_factor.get()
+        call = ToolCall(factor, tool, arguments, hashlib.sha256(str(output).encode("utf-8")).hexdigest())
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self, factor: Optional[str] = None) -> List[ToolCall]:
+        with self._lock:
+            calls = list(self._calls)
+        return [c for c in calls if factor is None or c.factor == factor]
+
+    def add(self, record: Record, tool: str = "", factor: Optional[str] = None):
+        """Stores `record` (composite records are split into their members); once per factor."""
+        factor = factor if factor is not None else _current_factor.get()
+        with self._lock:
+            for r in record.flatten():
+                if (id(r), factor) not in self._added:
+                    self._added.add((id(r), factor))
+                    self._facts.append(Fact(factor, tool, r))
+
+    def merge(self, other: "FactStore"):
+        """Appends every record and tool call of `other`."""
+        facts, calls = other.facts(), other.calls()
+        with self._lock:
+            for f in facts:
+                if (id(f.record), f.factor) not in self._added:
+                    self._added.add((id(f.record), f.factor))
+                    self._facts.append(f)
+            self._calls.extend(calls)
+
+    def facts(self, kind: Optional[str] = None, factor: Optional[str] = None) -> List[Fact]:
+        with self._lock:
+            facts = list(self._facts)
+        return [
+            f for f in facts
+            if (kind is None or f.record.kind == kind) and (factor is None or f.factor == factor)
+        ]
+
+    def records(self, kind: Optional[str] = None, factor: Optional[str] = None) -> List[Record]:
+        return [f.record for f in self.facts(kind, factor)]
+
+    def to_dicts(self, kind: Optional[str] = None, factor: Optional[str] = None) -> List[dict]:
+        return [
+            {"factor": f.factor, "tool": f.tool, **f.record.to_dict()}
+            for f in self.facts(kind, factor)
+        ]
+
+    def to_prompt(self, factor: Optional[str] = None) -> str:
+        """Compact JSON of the records, for pasting into a task description. Identical records appear once."""
+        seen = {}
+        for f in self.facts(factor=factor):
+            seen.setdefault(f.record, None)
+        return json.dumps([r.to_dict() for r in seen], separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._facts)
+
+    def __iter__(self) -> Iterator[Fact]:
+        return iter(self.facts())
+
+
+def current_fact_store() -> Optional[FactStore]:
+    return _current_store.get()
+
+
+def current_factor() -> Optional[str]:
+    return _current_factor.get()
+
+
+@contextmanager
+def use_fact_store(store: FactStore):
+    """Makes `store` the current fact store for the duration of the block."""
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
+
+
+@contextmanager
+def factor_scope(factor: str):
+    """Tags every record added in the block with `factor`."""
+    token = _current_factor.set(factor)
+    try:
+        yield
+    finally:
+        _current_factor.reset(token)
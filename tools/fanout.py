@@ -0,0 +1,51 @@
+"""
+Several queries in one tool call.
+
+GoogleSearchTool and NewsApiTool take an optional list of `queries`: the tool runs them at the same
+time on a small thread pool and returns the merged, URL-deduplicated results in one answer, so an
+agent gathers in one LLM turn what used to take one turn per query. The per-host connection pool
+and rate limits of tools/http_client.py apply to every request as usual.
+
+GRISP_FANOUT_WORKERS caps the requests in flight per tool call, GRISP_MAX_QUERIES the queries
+accepted per call (the rest are dropped, and the tool says so).
+"""
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar, Union
+
+FANOUT_WORKERS = int(os.getenv("GRISP_FANOUT_WORKERS", "5"))
+MAX_QUERIES = int(os.getenv("GRISP_MAX_QUERIES", "8"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def query_list(query: Optional[str] = None, queries: Union[Sequence[str], str, None] = None) -> List[str]:
+    """`query` followed by `queries`, blanks and repeats (ignoring case and spacing) removed."""
+    if isinstance(queries, str):
+        # LLMs sometimes pass the list as JSON text, or one query per line
+        try:
+            parsed = json.loads(queries)
+        except ValueError:
+            parsed = queries.splitlines()
+        queries = parsed if isinstance(parsed, list) else [queries]
+    merged, seen = [], set()
+    for item in [query] + list(queries or []):
+        text = " ".join(str(item or "").split())
+        if text and text.casefold() not in seen:
+            seen.add(text.casefold())
+            merged.append(text)
+    return merged
+
+
+def fan_out(fn: Callable[[T], R], items: Sequence[T], max_workers: Optional[int] = None) -> List[R]:
+    """`[fn(item) for item in items]`, run concurrently; results in input order."""
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    workers = min(len(items), max_workers or FANOUT_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grisp-fanout") as pool:
+        # A copy of the caller's context per call, so the requests show up in the run's trace
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
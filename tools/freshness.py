@@ -0,0 +1,234 @@
+"""
+Background refresh of the slow-changing data sources, so tools answer them locally.
+
+World Bank indicators and the GTD / ND-GAIN workbooks change at most yearly; news, tweets and web
+search change by the minute. The RefreshScheduler keeps the first kind up to date off the request
+path, each on its own cadence (watchlist.yaml, or GRISP_WATCHLIST):
+- worldbank: every series of the watchlist's countries x indicators older than the cadence is
+  re-fetched (batched, tools/world_bank_api.py) into the local indicator store
+  (tools/indicator_store.py), which WorldBankApiTool answers from.
+- static_reports: the GTD and ND-GAIN caches (data/cache) are rebuilt when their workbook changed,
+  and a loaded tool is reloaded with the new data (tools/registry.py).
+NewsApiTool, TwitterSentimentTool and GoogleSearchTool stay live.
+
+service.py runs the scheduler in a background thread. On its own:
+    python -m tools.freshness            # refresh what is due, then keep refreshing
+    python -m tools.freshness --once     # refresh what is due and exit
+    python -m tools.freshness --force    # refresh everything now
+"""
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from tools.indicator_store import get_indicator_store, series_key
+
+WATCHLIST_PATH = os.getenv("GRISP_WATCHLIST", "watchlist.yaml")
+
+DEFAULT_CADENCE = {"worldbank": 24 * 3600, "static_reports": 10 * 60}
+
+# Countries per World Bank refresh batch (one paged request per batch)
+WORLDBANK_BATCH = 20
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value) -> float:
+    """Seconds in '90', '30s', '10m', '6h' or '1d'."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"invalid duration: {value!r} (use e.g. 30s, 10m, 6h, 1d)")
+    return float(match.group(1)) * _UNITS[match.group(2) or "s"]
+
+
+@dataclass
+class Watchlist:
+    countries: List[str] = field(default_factory=list)
+    indicators: List[str] = field(default_factory=list)
+    cadence: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_CADENCE))
+
+
+def load_watchlist(path: Optional[str] = None) -> Watchlist:
+    """The watchlist YAML at `path`; an empty watchlist (static reports only) when there is none."""
+    path = path or WATCHLIST_PATH
+    if not os.path.exists(path):
+        return Watchlist()
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    cadence = dict(DEFAULT_CADENCE)
+    cadence.update({name: parse_duration(value) for name, value in (data.get("cadence") or {}).items()})
+    return Watchlist(
+        countries=[str(c).strip() for c in data.get("countries") or [] if str(c).strip()],
+        indicators=[str(i).strip() for i in data.get("indicators") or [] if str(i).strip()],
+        cadence=cadence,
+    )
+
+
+@dataclass
+class SourceState:
+    name: str
+    cadence: float
+    refresh: Callable[[bool], str]
+    last_run: Optional[float] = None
+    last_status: Optional[str] = None
+    last_detail: str = ""
+    last_seconds: float = 0.0
+
+    def due(self, now: float) -> bool:
+        return self.last_run is None or now - self.last_run >= self.cadence
+
+
+class RefreshScheduler:
+    """Runs each source's refresh on its cadence, in one background thread (or on demand)."""
+
+    def __init__(self, watchlist: Optional[Watchlist] = None, tool_map=None):
+        self.watchlist = watchlist or load_watchlist()
+        self.tool_map = tool_map
+        self.sources: Dict[str, SourceState] = {}
+        if self.watchlist.countries and self.watchlist.indicators:
+            self.sources["worldbank"] = SourceState("worldbank", self.watchlist.cadence["worldbank"], self.refresh_worldbank)
+        self.sources["static_reports"] = SourceState(
+            "static_reports", self.watchlist.cadence["static_reports"], self.refresh_static_reports)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # --- sources -------------------------------------------------------------------------
+
+    def refresh_worldbank(self, force: bool = False) -> str:
+        store = get_indicator_store()
+        if store is None:
+            return "skipped (GRISP_WORLDBANK_STORE is off)"
+        from tools.world_bank_api import WorldBankApiTool
+
+        # Only what is older than the cadence (everything when forced), a batch of countries at a time
+        max_age = 0.0 if force else self.watchlist.cadence["worldbank"]
+        stale = store.stale_pairs(self.watchlist.countries, self.watchlist.indicators, max_age)
+        countries = list(dict.fromkeys(country for country, _ in stale))
+        if not countries:
+            return "up to date"
+        tool = WorldBankApiTool()
+        stored, failures = 0, []
+        for start in range(0, len(countries), WORLDBANK_BATCH):
+            batch = countries[start:start + WORLDBANK_BATCH]
+            try:
+                stored += store.put_matrix(tool.fetch_matrix(batch, self.watchlist.indicators))
+            except Exception as e:
+                # The next round retries these; the store keeps serving their previous values meanwhile
+                failures.append(f"{', '.join(batch)}: {e}")
+        detail = f"{stored} series refreshed for {len(countries)} countries"
+        if failures:
+            raise RuntimeError(detail + "; failed: " + " | ".join(failures))
+        return detail
+
+    def refresh_static_reports(self, force: bool = False) -> str:
+        from tools.excel_cache import is_cache_fresh
+        from tools.gtd_store import GTD_CACHE_DIR, GTD_CACHE_VERSION, GTD_EXCEL_PATH, convert_gtd
+        from tools.ndgain_store import NDGAIN_CACHE_DIR, NDGAIN_CACHE_VERSION, NDGAIN_EXCEL_PATH, convert_ndgain
+
+        reports = (
+            ("GlobalTerrorismDatabaseTool", GTD_EXCEL_PATH, GTD_CACHE_DIR, GTD_CACHE_VERSION, convert_gtd),
+            ("ClimateApiTool", NDGAIN_EXCEL_PATH, NDGAIN_CACHE_DIR, NDGAIN_CACHE_VERSION, convert_ndgain),
+        )
+        rebuilt = []
+        for tool_name, excel_path, cache_dir, version, convert in reports:
+            if not os.path.exists(excel_path):
+                # Nothing to rebuild from (a shipped data/cache is used as is)
+                continue
+            if force or not is_cache_fresh(cache_dir, excel_path, version=version):
+                convert(excel_path, cache_dir)
+                if self.tool_map is not None:
+                    self.tool_map.reload(tool_name)
+                rebuilt.append(os.path.basename(excel_path))
+        return f"rebuilt {', '.join(rebuilt)}" if rebuilt else "up to date"
+
+    # --- scheduling ----------------------------------------------------------------------
+
+    def run_due(self, force: bool = False) -> Dict[str, str]:
+        """Refreshes every source that is due (all of them when forced); source -> status."""
+        results = {}
+        with self._lock:
+            now = time.time()
+            for source in self.sources.values():
+                if not (force or source.due(now)):
+                    continue
+                started = time.perf_counter()
+                try:
+                    source.last_detail = source.refresh(force)
+                    source.last_status = "ok"
+                except Exception as e:
+                    source.last_detail = f"{type(e).__name__}: {e}"
+                    source.last_status = "error"
+                source.last_run = time.time()
+                source.last_seconds = time.perf_counter() - started
+                results[source.name] = f"{source.last_status}: {source.last_detail}"
+                print(f"🔄 Refresh {source.name}: {results[source.name]} ({source.last_seconds:.1f} s)")
+        return results
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_due()
+            now = time.time()
+            wait = min((s.last_run or now) + s.cadence - now for s in self.sources.values())
+            # Wake up at least once a minute, so a stop or a changed clock is noticed
+            self._stop.wait(max(1.0, min(wait, 60.0)))
+
+    def start(self) -> "RefreshScheduler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="grisp-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        now = time.time()
+        store = get_indicator_store(create=False)
+        return {
+            "watchlist": {"countries": len(self.watchlist.countries), "indicators": len(self.watchlist.indicators)},
+            "sources": {
+                s.name: {
+                    "cadence_seconds": s.cadence,
+                    "last_run": s.last_run,
+                    "last_status": s.last_status,
+                    "last_detail": s.last_detail,
+                    "next_in_seconds": round(max(0.0, (s.last_run or now) + s.cadence - now), 1),
+                }
+                for s in self.sources.values()
+            },
+            "indicator_store": store.stats() if store is not None else None,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Pre-fetch the slow-changing GRiSP data sources")
+    parser.add_argument("--watchlist", default=None, help="Watchlist YAML (default: watchlist.yaml or GRISP_WATCHLIST)")
+    parser.add_argument("--once", action="store_true", help="Refresh what is due and exit")
+    parser.add_argument("--force", action="store_true", help="Refresh every source now, due or not")
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(load_watchlist(args.watchlist))
+    keys = sorted({series_key(c) for c in scheduler.watchlist.countries})
+    print(f"📋 Watchlist: {len(keys)} countries x {len(scheduler.watchlist.indicators)} indicators")
+    scheduler.run_due(force=args.force)
+    if not args.once:
+        try:
+            scheduler.start()
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -1,28 +1,49 @@
+import datetime
 import pandas as pd
-from crewai.tools import BaseTool
-from typing import Optional # Import Optional
+from collections import Counter
+from typing import Dict, Optional # Import Optional
+from tools.base import GrispTool
+from tools.records import TerrorismRecord
+from tools.countries import country_key, resolve_country
+from tools.gtd_store import GTD_CACHE_DIR, YearStats, build_country_year_index, load_gtd_frame
 
-class GlobalTerrorismDatabaseTool(BaseTool):
+class GlobalTerrorismDatabaseTool(GrispTool):
     name: str = "GlobalTerrorismDatabaseTool"
-    description: str = "Fetches recent terrorism statistics such as attacks, fatalities, and injuries for a given country."
+    description: str = (
+        "Fetches recent terrorism statistics such as attacks, fatalities, and injuries for a given country "
+        "(name or ISO code). "
+        "Optionally pass lookback_years to change the window (default: last 5 years)."
+    )
 
     # Declare excel_path as a Pydantic field with a default value.
     # This is the path to your .xlsx file.
     excel_path: str = "data/static_reports/gtd.xlsx" 
+
+    # Folder holding the columnar (.npy) copy of the workbook built by tools/gtd_store.py
+    cache_dir: str = GTD_CACHE_DIR
     
     # Declare df as an optional Pydantic field of type pandas.DataFrame.
     # It will be initialized to None by default, and then populated in __init__.
     df: Optional[pd.DataFrame] = None
 
+    # Pre-aggregated country key -> year -> YearStats table, built once in __init__
+    index: Optional[Dict[str, Dict[int, YearStats]]] = None
+
+    # Query window: years from reference_year - lookback_years to reference_year are counted.
+    # reference_year defaults to the current calendar year when left as None.
+    lookback_years: int = 5
+    reference_year: Optional[int] = None
+
     def __init__(self, **kwargs):
         # Call the parent's __init__ method. Pydantic (via BaseTool)
         # will initialize the declared fields (name, description, excel_path).
         super().__init__(**kwargs) 
         
         try:
-            # --- IMPORTANT: Replace 'YOUR_ACTUAL_GTD_SHEET_NAME' with the real sheet name from your Excel file ---
-            # If your data is on the first sheet and you don't know its name, use sheet_name=0
-            self.df = pd.read_excel(self.excel_path, sheet_name=0) 
+            # The workbook is converted once into memory-mapped NumPy columns (see tools/gtd_store.py),
+            # so this only re-parses the Excel file when it has changed since the last conversion.
+            self.df = load_gtd_frame(self.excel_path, self.cache_dir)
+            self.index = build_country_year_index(self.df)
             
         except FileNotFoundError:
             raise FileNotFoundError(
@@ -41,67 +62,46 @@ class GlobalTerrorismDatabaseTool(BaseTool):
         except Exception as e:
             raise Exception(f"An unexpected error occurred while reading the Excel file: {e}")
 
-    def _run(self, country: str) -> str:
+    def _run(self, country: str, lookback_years: Optional[int] = None):
         """
         Fetches recent terrorism statistics for a given country.
-        Input: country name (e.g., 'United States')
+        Input: country name (e.g., 'United States'), optionally the number of years to look back (default 5).
         """
-        # Ensure df is loaded before proceeding
-        if self.df is None:
+        # Ensure the index is built before proceeding
+        if self.index is None:
             return "Error: Terrorism data could not be loaded. Please check the Excel file path and content."
 
         try:
-            # Making country matching case-insensitive for robustness
-            # Ensure 'country_txt' column exists
-            if "country_txt" not in self.df.columns:
-                return "Error: 'country_txt' column not found in GTD data. Cannot process country query."
+            # An explicit 0 means "the reference year only", not the default window
+            lookback = self.lookback_years if lookback_years is None else lookback_years
+            reference_year = datetime.date.today().year if self.reference_year is None else self.reference_year
+            first_year = reference_year - lookback
 
-            recent_data = self.df[self.df["country_txt"].str.lower() == country.lower()]
-            
-            # Assuming current year is 2025 (adjust if needed or import datetime)
-            current_year = 2025 
-            
-            # Ensure 'iyear' column exists and is numeric for filtering
-            if "iyear" not in recent_data.columns:
-                 return "Error: 'iyear' column not found in GTD data. Cannot filter by year."
-            # Convert 'iyear' to numeric, coercing errors to NaN
-            recent_data["iyear"] = pd.to_numeric(recent_data["iyear"], errors='coerce')
-            recent_data = recent_data.dropna(subset=['iyear']) # Drop rows where 'iyear' became NaN
-            recent_data = recent_data[recent_data["iyear"] >= (current_year - 5)]
+            # O(years) lookup in the pre-aggregated index instead of scanning the whole frame.
+            # Names, aliases and ISO codes ("USA", "US", "United States") all resolve to the same key.
+            years = self.index.get(country_key(country), {})
+            recent = [stats for year, stats in years.items() if first_year <= year <= reference_year]
 
-            if recent_data.empty:
-                return f"No terrorism data found for {country} in the last 5 years."
+            if not recent:
+                return f"No terrorism data found for {country} in the last {lookback} years."
 
-            total_attacks = recent_data.shape[0]
-            
-            # Ensure 'nkill' and 'nwound' columns exist and are numeric before summing
-            fatalities = 0
-            if "nkill" in recent_data.columns:
-                recent_data["nkill"] = pd.to_numeric(recent_data["nkill"], errors='coerce')
-                fatalities = int(recent_data["nkill"].sum(skipna=True)) if not recent_data["nkill"].isnull().all() else 0
-            
-            injuries = 0
-            if "nwound" in recent_data.columns:
-                recent_data["nwound"] = pd.to_numeric(recent_data["nwound"], errors='coerce')
-                injuries = int(recent_data["nwound"].sum(skipna=True)) if not recent_data["nwound"].isnull().all() else 0
-            
-            # Check if 'target1' column exists before trying to get value_counts
-            top_targets_str = "  - No target information available."
-            if "target1" in recent_data.columns:
-                # Fill NaN values in 'target1' to avoid errors in value_counts if any are present
-                top_targets = recent_data["target1"].fillna("Unknown Target").value_counts().head(3).to_dict()
-                if top_targets:
-                    top_targets_str = "\n".join([f"  - {k}: {v} times" for k, v in top_targets.items()])
+            total_attacks = sum(stats.attacks for stats in recent)
+            fatalities = sum(stats.fatalities for stats in recent)
+            injuries = sum(stats.injuries for stats in recent)
 
+            targets = Counter()
+            for stats in recent:
+                targets.update(stats.targets)
 
-            return (
-                f"Recent Terrorism Stats for {country} (Last 5 Years):\n"
-                f"- Total Attacks: {total_attacks}\n"
-                f"- Fatalities: {fatalities}\n"
-                f"- Injuries: {injuries}\n"
-                f"- Top Targets:\n{top_targets_str}"
+            resolved = resolve_country(country)
+            return TerrorismRecord(
+                country=resolved.name if resolved is not None else country,
+                lookback_years=lookback,
+                first_year=first_year,
+                attacks=int(total_attacks),
+                fatalities=int(fatalities),
+                injuries=int(injuries),
+                top_targets=tuple(targets.most_common(3)),
             )
-        except KeyError as e:
-            return f"Error: Missing expected column in GTD data ({e}). Please check column names like 'country_txt', 'iyear', 'nkill', 'nwound', 'target1'."
         except Exception as e:
-            return f"Error retrieving terrorism data for {country}: {str(e)}"
\ No newline at end of file
+            return f"Error retrieving terrorism data for {country}: {str(e)}"
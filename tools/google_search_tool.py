@@ -1,14 +1,19 @@
 import os
 import requests
-from crewai.tools import BaseTool
-from typing import Optional # Import Optional for fields that might be None initially
+from tools import http_client
+from tools.base import GrispTool
+from tools.fanout import MAX_QUERIES, fan_out, query_list
+from tools.records import SearchBatch, SearchRecord, SearchResult
+from typing import List, Optional # Import Optional for fields that might be None initially
 
-class GoogleSearchTool(BaseTool):
+class GoogleSearchTool(GrispTool):
     name: str = "GoogleSearchTool"
     description: str = (
         "Performs a Google search and returns a snippet of the top results. "
         "Useful for getting real-time information or validating facts. "
-        "Input should be a concise search query string."
+        "Input should be a concise search query string. To research several angles at once, pass them "
+        "as a list in 'queries' (e.g. ['India inflation 2025', 'India protests']): they are searched "
+        "in parallel and returned together, with duplicate links removed."
     )
 
     # Declare api_key and cx_id as optional Pydantic fields.
@@ -18,6 +23,9 @@ class GoogleSearchTool(BaseTool):
     api_key: Optional[str] = None
     cx_id: Optional[str] = None
 
+    # GOOGLE_CSE_URL points the tool elsewhere (e.g. the local stub in benchmarks/stub_server.py)
+    base_url: str = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
+
     def __init__(self, **kwargs):
         # Always call the parent's __init__ when inheriting from BaseTool
         # to ensure Pydantic fields are correctly initialized.
@@ -35,16 +43,39 @@ class GoogleSearchTool(BaseTool):
             # Raise a more informative error specific to missing env var
             raise ValueError("GOOGLE_CX_ID environment variable not set. Please set it before running.")
 
-    def _run(self, query: str) -> str:
+    def _run(self, query: str = "", queries: Optional[List[str]] = None):
         """
-        Performs a Google Custom Search for the given query.
-        Input: query (str) - the search query
+        Performs a Google Custom Search for the given query, or for each of `queries` concurrently.
+        Input: query (str) - the search query; queries (list of str) - several queries in one call
         """
         # Defensive check in _run in case __init__ somehow failed to set them (though it raises errors now)
         if not self.api_key or not self.cx_id:
             return "Error: Google Search API keys are not properly configured. Cannot perform search."
 
-        search_url = "https://www.googleapis.com/customsearch/v1"
+        wanted = query_list(query, queries)
+        if not wanted:
+            return "Error: no search query given. Pass 'query' or a list of 'queries'."
+        if len(wanted) == 1:
+            return self._search(wanted[0])
+
+        results = fan_out(self._search, wanted[:MAX_QUERIES])
+        searches, errors, seen, duplicates = [], [], set(), 0
+        for q, result in zip(wanted, results):
+            if not isinstance(result, SearchRecord):
+                errors.append((q, result))
+                continue
+            # Links already listed for an earlier query are dropped
+            fresh = tuple(r for r in result.results if r.link not in seen)
+            duplicates += len(result.results) - len(fresh)
+            seen.update(r.link for r in fresh)
+            searches.append(SearchRecord(q, fresh))
+        if not searches:
+            return "Error: every search failed.\n" + "\n".join(f"- {q}: {error}" for q, error in errors)
+        return SearchBatch(tuple(searches), duplicates, tuple(errors), tuple(wanted[MAX_QUERIES:]))
+
+    def _search(self, query: str):
+        """One Google Custom Search request: a SearchRecord, or a message saying why there is none."""
+        search_url = self.base_url
         params = {
             "key": self.api_key,
             "cx": self.cx_id, # This will now be the ID without a colon, as per your screenshot
@@ -52,7 +83,7 @@ class GoogleSearchTool(BaseTool):
         }
 
         try:
-            response = requests.get(search_url, params=params)
+            response = http_client.get(search_url, params=params, source="google")
             response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
             search_results = response.json()
 
@@ -60,13 +91,13 @@ class GoogleSearchTool(BaseTool):
                 # This can happen if no results are found or if the API key/CX ID is invalid
                 return "No relevant Google search results found for your query or an API issue occurred (e.g., invalid key/CX ID, quota exceeded)."
 
-            snippets = []
-            for item in search_results["items"][:3]: # Get top 3 snippets
-                snippet = item.get("snippet", "No snippet available.")
-                link = item.get("link", "No link available.")
-                snippets.append(f"Snippet: {snippet}\nLink: {link}")
-            
-            return "\n\n".join(snippets)
+            return SearchRecord(query, tuple(
+                SearchResult(
+                    snippet=item.get("snippet", "No snippet available."),
+                    link=item.get("link", "No link available."),
+                )
+                for item in search_results["items"][:3] # Keep the top 3 snippets
+            ))
 
         except requests.exceptions.RequestException as e:
             # Catch network-related errors or bad HTTP responses
@@ -0,0 +1,153 @@
+"""
+Columnar cache for the Global Terrorism Database workbook.
+
+Parsing `gtd.xlsx` with openpyxl takes tens of seconds and gigabytes of RAM, so the workbook is
+converted once into typed NumPy columns (only the ones GlobalTerrorismDatabaseTool uses) and
+memory-mapped on every later start.
+
+Run the conversion ahead of time with:
+    python -m tools.gtd_store [path/to/gtd.xlsx]
+"""
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from tools.countries import country_key
+from tools.excel_cache import CACHE_ROOT, is_cache_fresh, load_columns, read_manifest, write_columns
+
+GTD_EXCEL_PATH = "data/static_reports/gtd.xlsx"
+GTD_CACHE_DIR = os.path.join(CACHE_ROOT, "gtd")
+
+# Bump when the on-disk layout below changes so stale caches get rebuilt
+GTD_CACHE_VERSION = 1
+
+# The only columns GlobalTerrorismDatabaseTool._run reads
+GTD_COLUMNS = ["country_txt", "iyear", "nkill", "nwound", "target1"]
+CATEGORY_COLUMNS = ["country_txt", "target1"]
+
+
+def convert_gtd(excel_path: str = GTD_EXCEL_PATH, cache_dir: str = GTD_CACHE_DIR) -> None:
+    """
+    One-time conversion of the GTD workbook into `.npy` columns:
+    - country_txt / target1 -> integer codes + a fixed-width string array of categories (-1 = missing)
+    - iyear -> int16 (0 = missing)
+    - nkill / nwound -> float32 (NaN = missing)
+    """
+    df = pd.read_excel(excel_path, sheet_name=0, usecols=lambda c: c in GTD_COLUMNS)
+
+    missing = [c for c in GTD_COLUMNS if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing expected column(s) in GTD data: {', '.join(missing)}")
+
+    columns: Dict[str, np.ndarray] = {}
+    for name in CATEGORY_COLUMNS:
+        values = df[name].astype("string").str.strip()
+        categorical = pd.Categorical(values)
+        code_dtype = np.int16 if len(categorical.categories) < np.iinfo(np.int16).max else np.int32
+        columns[f"{name}.codes"] = categorical.codes.astype(code_dtype)
+        columns[f"{name}.categories"] = np.asarray(categorical.categories, dtype=str)
+
+    columns["iyear"] = pd.to_numeric(df["iyear"], errors="coerce").fillna(0).astype(np.int16).to_numpy()
+    for name in ("nkill", "nwound"):
+        columns[name] = pd.to_numeric(df[name], errors="coerce").astype(np.float32).to_numpy()
+
+    write_columns(cache_dir, excel_path, columns, meta={"rows": int(len(df))}, version=GTD_CACHE_VERSION)
+
+
+def ensure_gtd_cache(excel_path: str = GTD_EXCEL_PATH, cache_dir: str = GTD_CACHE_DIR) -> None:
+    """Builds the cache if it is missing or was built from a different workbook."""
+    if not os.path.exists(excel_path):
+        # A pre-built cache is enough on its own (e.g. workers that only ship data/cache)
+        if read_manifest(cache_dir) is not None:
+            return
+        raise FileNotFoundError(excel_path)
+
+    if not is_cache_fresh(cache_dir, excel_path, version=GTD_CACHE_VERSION):
+        convert_gtd(excel_path, cache_dir)
+
+
+def load_gtd_frame(excel_path: str = GTD_EXCEL_PATH, cache_dir: str = GTD_CACHE_DIR) -> pd.DataFrame:
+    """
+    Returns the GTD columns as a DataFrame backed by memory-mapped arrays.
+    Category columns come back as pandas categoricals, numeric columns keep their compact dtypes.
+    """
+    ensure_gtd_cache(excel_path, cache_dir)
+
+    names = ["iyear", "nkill", "nwound"]
+    for name in CATEGORY_COLUMNS:
+        names += [f"{name}.codes", f"{name}.categories"]
+    arrays = load_columns(cache_dir, names)
+
+    data = {}
+    for name in GTD_COLUMNS:
+        if name in CATEGORY_COLUMNS:
+            data[name] = pd.Categorical.from_codes(
+                arrays[f"{name}.codes"], categories=pd.Index(arrays[f"{name}.categories"])
+            )
+        else:
+            data[name] = arrays[name]
+    return pd.DataFrame(data, copy=False)
+
+
+@dataclass
+class YearStats:
+    attacks: int = 0
+    fatalities: int = 0
+    injuries: int = 0
+    targets: Counter = field(default_factory=Counter)
+
+
+def build_country_year_index(df: pd.DataFrame) -> Dict[str, Dict[int, YearStats]]:
+    """
+    Pre-aggregates the GTD frame into country key (tools/countries.py) -> year -> YearStats.
+    Works on the categorical codes, so it is a couple of grouped reductions instead of a
+    full-column string scan per query.
+    """
+    countries = df["country_txt"].cat
+    targets = df["target1"].cat
+
+    frame = pd.DataFrame({
+        "country": countries.codes,
+        "year": df["iyear"].to_numpy(),
+        "nkill": df["nkill"].to_numpy(),
+        "nwound": df["nwound"].to_numpy(),
+        "target": targets.codes,
+    }, copy=False)
+    # Rows with no country or no usable year can never match a query
+    frame = frame[(frame["country"] >= 0) & (frame["year"] > 0)]
+
+    totals = frame.groupby(["country", "year"], sort=False).agg(
+        attacks=("year", "size"), fatalities=("nkill", "sum"), injuries=("nwound", "sum")
+    )
+    target_counts = frame.groupby(["country", "year", "target"], sort=False).size()
+
+    # One resolution per distinct country name, not per row
+    country_keys = [country_key(name) for name in countries.categories]
+    target_names = targets.categories
+
+    index: Dict[str, Dict[int, YearStats]] = {}
+    for (country_code, year), row in zip(totals.index, totals.itertuples(index=False)):
+        # Spelling variants of the same country (e.g. "Zaire" and "Democratic Republic of the Congo") are merged
+        key = country_keys[country_code]
+        stats = index.setdefault(key, {}).setdefault(int(year), YearStats())
+        stats.attacks += int(row.attacks)
+        stats.fatalities += int(row.fatalities)
+        stats.injuries += int(row.injuries)
+
+    for (country_code, year, target_code), count in target_counts.items():
+        target = target_names[target_code] if target_code >= 0 else "Unknown Target"
+        stats = index[country_keys[country_code]][int(year)]
+        stats.targets[target] += int(count)
+
+    return index
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else GTD_EXCEL_PATH
+    convert_gtd(path, GTD_CACHE_DIR)
+    print(f"GTD cache written to {GTD_CACHE_DIR}")
@@ -0,0 +1,239 @@
+"""
+Persistent on-disk cache for the HTTP responses of the API tools.
+
+Entries live in a single SQLite file keyed by a normalized form of the URL and its query
+parameters (credentials are stripped from the key). Each source has its own freshness TTL and
+a longer stale window: a stale entry is served immediately while a background refresh runs
+(stale-while-revalidate). The least recently used entries are evicted once the cache grows past
+`max_bytes`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from tools.excel_cache import CACHE_ROOT
+
+HTTP_CACHE_PATH = os.path.join(CACHE_ROOT, "http_cache.sqlite")
+
+# source -> (fresh_ttl, stale_ttl) in seconds. World Bank data changes at most daily,
+# news and tweets within minutes.
+SOURCE_TTLS: Dict[str, Tuple[int, int]] = {
+    "worldbank": (24 * 3600, 7 * 24 * 3600),
+    "google": (6 * 3600, 24 * 3600),
+    "newsapi": (10 * 60, 60 * 60),
+    "twitter": (5 * 60, 30 * 60),
+    "default": (60 * 60, 6 * 3600),
+}
+
+# Host -> source, used when the caller doesn't name the source explicitly
+HOST_SOURCES = {
+    "api.worldbank.org": "worldbank",
+    "www.googleapis.com": "google",
+    "newsapi.org": "newsapi",
+    "api.twitter.com": "twitter",
+}
+
+# Query parameters that carry credentials; they never become part of the cache key
+SECRET_PARAMS = {"key", "apikey", "api_key", "token", "access_token"}
+
+
+def source_for_url(url: str) -> str:
+    return HOST_SOURCES.get(urlsplit(url).hostname or "", "default")
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    """
+    Normalizes a request into a stable key: lower-cased scheme/host, params merged from the URL
+    and the `params` dict, sorted, with credentials removed.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(k, str(v)) for k, v in (params or {}).items() if v is not None]
+    query = sorted((k, v) for k, v in query if k.lower() not in SECRET_PARAMS)
+
+    normalized = urlunsplit((parts.scheme.lower(), (parts.netloc or "").lower(), parts.path, urlencode(query), ""))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """The subset of `requests.Response` the tools use, rebuilt from a cache entry or a live response."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes, from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "CachedResponse":
+        return cls(response.url, response.status_code, dict(response.headers), response.content)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=None)
+
+
+class HttpCache:
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024, ttls: Optional[dict] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "revalidations": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                fresh_until REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access);
+            """
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers and the writer work side by side
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["hits"] + counters["stale_hits"]) / lookups if lookups else 0.0
+        return counters
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict],
+        fetch: Callable[[], CachedResponse],
+        source: Optional[str] = None,
+    ) -> CachedResponse:
+        """
+        Returns the cached response for (url, params) when fresh, a stale copy (while `fetch`
+        refreshes it in the background) when inside the stale window, and otherwise calls `fetch`
+        and stores successful responses.
+        """
+        source = source or source_for_url(url)
+        key = cache_key(url, params)
+        now = time.time()
+
+        row = self._connect().execute(
+            "SELECT url, status, headers, body, fresh_until, stale_until FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            cached_url, status, headers, body, fresh_until, stale_until = row
+            if now < stale_until:
+                self._connect().execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                response = CachedResponse(cached_url, status, json.loads(headers), body, from_cache=True)
+                if now < fresh_until:
+                    self._count("hits")
+                else:
+                    self._count("stale_hits")
+                    self._revalidate(key, url, source, fetch)
+                return response
+
+        self._count("misses")
+        response = fetch()
+        self.store(key, url, source, response)
+        return response
+
+    def store(self, key: str, url: str, source: str, response: CachedResponse) -> None:
+        # Only successful responses are worth replaying
+        if not 200 <= response.status_code < 300:
+            return
+
+        fresh_ttl, stale_ttl = self.ttls.get(source, self.ttls["default"])
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key, source, url, response.status_code, json.dumps(dict(response.headers)), response.content,
+                len(response.content), now, now + fresh_ttl, now + max(stale_ttl, fresh_ttl), now,
+            ),
+        )
+        self._count("stores")
+        self._evict()
+
+    def _revalidate(self, key: str, url: str, source: str, fetch: Callable[[], CachedResponse]) -> None:
+        """Refreshes a stale entry in a daemon thread; concurrent requests for the same key share one refresh."""
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def refresh():
+            try:
+                self.store(key, url, source, fetch())
+                self._count("revalidations")
+            except Exception:
+                # The stale copy keeps being served until the stale window closes
+                pass
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=refresh, name=f"http-cache-revalidate-{key[:8]}", daemon=True).start()
+
+    def _evict(self) -> None:
+        """Drops expired entries, then least recently used ones until the cache fits in `max_bytes`."""
+        conn = self._connect()
+        expired = conn.execute("DELETE FROM responses WHERE stale_until < ?", (time.time(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        evicted = max(expired, 0)
+        if total > self.max_bytes:
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM responses")
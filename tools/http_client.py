@@ -0,0 +1,229 @@
+"""
+Single entry point for outbound HTTP calls made by the tools.
+
+- One pooled `requests.Session` per process, so repeated calls to the same API reuse
+  keep-alive connections instead of paying a new TCP+TLS handshake each time.
+- Connect/read timeouts on every request and an overall deadline per call, so one stalled API
+  can't hang the whole crew.
+- Retries with exponential backoff and full jitter on connection errors, 429 and 5xx,
+  honouring `Retry-After`.
+- A per-host token bucket rate budget; a 429 pauses the whole host for every thread.
+- Every request goes through the shared on-disk response cache (tools/http_cache.py) unless it is
+  disabled with GRISP_HTTP_CACHE=off.
+- Each call is an `http` span (bytes, status, cache hit) when the run is traced (tools/tracing.py).
+"""
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools import tracing
+from tools.http_cache import CachedResponse, HttpCache, source_for_url
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT: Tuple[float, float] = (
+    float(os.getenv("GRISP_HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("GRISP_HTTP_READ_TIMEOUT", "30")),
+)
+# Upper bound for one logical call, retries and backoff included
+CALL_DEADLINE = float(os.getenv("GRISP_HTTP_DEADLINE", "90"))
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# An attempt with less time than this left before the call deadline is not started
+MIN_ATTEMPT_SECONDS = 1.0
+
+# host -> (requests per second, burst). Hosts not listed get DEFAULT_RATE.
+HOST_RATES: Dict[str, Tuple[float, int]] = {
+    "api.worldbank.org": (10.0, 20),
+    "www.googleapis.com": (5.0, 10),
+    "newsapi.org": (2.0, 5),
+    "api.twitter.com": (1.0, 3),
+    # Local stubs and mocks (benchmarks/stub_server.py) are effectively unthrottled
+    "127.0.0.1": (1000.0, 1000),
+    "localhost": (1000.0, 1000),
+}
+DEFAULT_RATE = (5.0, 10)
+
+POOL_CONNECTIONS = 8   # number of per-host pools kept
+POOL_MAXSIZE = 16      # keep-alive connections per host, enough for concurrent agents
+
+_cache: Optional[HttpCache] = None
+_session: Optional[requests.Session] = None
+_init_lock = threading.Lock()
+
+
+class RateBudget:
+    """Token bucket for one host. `pause()` blocks every caller until a server-imposed cooldown ends."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        """Waits for a token; returns False if it can't get one before `deadline` (monotonic time)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_budgets: Dict[str, RateBudget] = {}
+
+
+def _budget_for(host: str) -> RateBudget:
+    with _init_lock:
+        budget = _budgets.get(host)
+        if budget is None:
+            budget = _budgets[host] = RateBudget(*HOST_RATES.get(host, DEFAULT_RATE))
+        return budget
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    with _init_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are handled in get() so they can honour Retry-After and the rate budget
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def cache_enabled() -> bool:
+    return os.getenv("GRISP_HTTP_CACHE", "on").strip().lower() not in ("0", "off", "false", "no")
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Returns the process-wide cache, creating it on first use (None when caching is disabled)."""
+    global _cache
+    if not cache_enabled():
+        return None
+    with _init_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Parses Retry-After given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def _backoff(attempt: int) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _attempt_timeout(timeout, left: float):
+    """`timeout` (seconds, or a (connect, read) pair) capped at the `left` seconds before the deadline."""
+    if isinstance(timeout, tuple):
+        return tuple(left if t is None else min(t, left) for t in timeout)
+    return left if timeout is None else min(timeout, left)
+
+
+def _send(url: str, params: Optional[dict], headers: Optional[dict], timeout) -> requests.Response:
+    """One logical GET: rate-limited, retried on transient failures, bounded by CALL_DEADLINE."""
+    host = urlsplit(url).hostname or ""
+    budget = _budget_for(host)
+    deadline = time.monotonic() + CALL_DEADLINE
+    session = get_session()
+
+    attempt = 0
+    previous = None
+    while True:
+        if not budget.acquire(deadline):
+            raise requests.exceptions.Timeout(f"Rate budget for {host} exhausted before the call deadline")
+
+        # Each attempt only gets the time left before the deadline, so a slow read can't overrun it
+        left = deadline - time.monotonic()
+        if left < MIN_ATTEMPT_SECONDS:
+            if previous is not None:
+                return previous
+            raise requests.exceptions.Timeout(f"Call deadline exceeded for {host}")
+
+        response = None
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=_attempt_timeout(timeout, left))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff(attempt)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                return response
+            retry_after = _retry_after(response)
+            delay = retry_after if retry_after is not None else _backoff(attempt)
+            if response.status_code == 429:
+                budget.pause(delay)
+
+        if time.monotonic() + delay > deadline:
+            # Not enough time left for another attempt; surface what we have
+            if response is not None:
+                return response
+            raise requests.exceptions.Timeout(f"Call deadline exceeded for {host}")
+
+        time.sleep(delay)
+        previous = response if response is not None else previous
+        attempt += 1
+
+
+def get(
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    source: Optional[str] = None,
+    timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+) -> CachedResponse:
+    """
+    GET `url` and return a response object with `status_code`, `json()` and `raise_for_status()`.
+    `source` selects the cache TTL ('worldbank', 'newsapi', 'google', 'twitter'); it is inferred from the host otherwise.
+    """
+    def fetch() -> CachedResponse:
+        return CachedResponse.from_response(_send(url, params, headers, timeout))
+
+    with tracing.span(f"GET {urlsplit(url).netloc}", "http", source=source or source_for_url(url)) as span:
+        cache = get_cache()
+        response = fetch() if cache is None else cache.get(url, params, fetch, source)
+        span.set(status=response.status_code, bytes=len(response.content), cached=response.from_cache)
+        return response
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the shared cache for this process."""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
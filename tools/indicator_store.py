@@ -0,0 +1,166 @@
+"""
+Local store of World Bank indicator series, filled ahead of time by the refresh scheduler.
+
+World Bank indicators change at most once a year, yet WorldBankApiTool used to fetch them while
+the LLM waited. The scheduler (tools/freshness.py) pre-fetches a watchlist of countries x
+indicators into this SQLite file, and the tool answers from it whenever the pair was fetched
+recently enough (GRISP_WORLDBANK_MAX_AGE_DAYS, default 30); anything else still goes to the API,
+and batch lookups made on the request path are written through so the next run finds them.
+
+    data/cache/worldbank.sqlite
+
+Countries are keyed by ISO3 where the resolver knows them, so 'IN', 'IND' and 'India' are one
+series. Set GRISP_WORLDBANK_STORE=off to always ask the API.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tools.countries import resolve_country
+from tools.excel_cache import CACHE_ROOT
+
+INDICATOR_STORE_PATH = os.path.join(CACHE_ROOT, "worldbank.sqlite")
+
+
+def store_enabled() -> bool:
+    return os.getenv("GRISP_WORLDBANK_STORE", "on").strip().lower() not in ("0", "false", "off", "no")
+
+
+def series_key(code: str) -> str:
+    """ISO3 for any country code or name the resolver knows; the upper-cased code otherwise (aggregates)."""
+    # Exact codes, names and aliases only: a fuzzy guess could file an aggregate under a country
+    country = resolve_country(code.strip(), fuzzy=False)
+    return country.iso3 if country is not None else code.strip().upper()
+
+
+@dataclass(frozen=True)
+class StoredValue:
+    country_name: str
+    indicator_name: str
+    # Most recent non-missing observation in the requested years (None, None when there is none)
+    year: Optional[int]
+    value: Optional[float]
+    fetched_at: float
+
+
+class IndicatorStore:
+    """Thread-safe SQLite store of (country, indicator) -> yearly values, with when each series was fetched."""
+
+    def __init__(self, path: str = INDICATOR_STORE_PATH, max_age_days: Optional[float] = None):
+        self.path = path
+        if max_age_days is None:
+            max_age_days = float(os.getenv("GRISP_WORLDBANK_MAX_AGE_DAYS", "30"))
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS series (
+                    country TEXT NOT NULL,
+                    indicator TEXT NOT NULL,
+                    country_name TEXT,
+                    indicator_name TEXT,
+                    first_year INTEGER NOT NULL,
+                    last_year INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (country, indicator)
+                );
+                CREATE TABLE IF NOT EXISTS observations (
+                    country TEXT NOT NULL,
+                    indicator TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    value REAL,
+                    PRIMARY KEY (country, indicator, year)
+                );
+            """)
+
+    def put_matrix(self, matrix, fetched_at: Optional[float] = None) -> int:
+        """Stores every series of an IndicatorMatrix (tools/world_bank_api.py); returns how many."""
+        fetched_at = fetched_at or time.time()
+        first_year, last_year = min(matrix.years), max(matrix.years)
+        series, observations = [], []
+        for c, country in enumerate(matrix.countries):
+            key = series_key(country)
+            for i, indicator in enumerate(matrix.indicators):
+                series.append((key, indicator, matrix.country_names.get(country, country),
+                               matrix.indicator_names.get(indicator, indicator), first_year, last_year, fetched_at))
+                for y, year in enumerate(matrix.years):
+                    value = float(matrix.values[c, i, y])
+                    observations.append((key, indicator, int(year), None if math.isnan(value) else value))
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?)", series)
+            self._db.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?)", observations)
+        return len(series)
+
+    def latest(self, country: str, indicator: str, first_year: int, last_year: int) -> Optional[StoredValue]:
+        """
+        The latest value in [first_year, last_year] when the series was fetched within max_age and
+        covers those years; None (ask the API) otherwise.
+        """
+        key, indicator = series_key(country), indicator.strip()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT country_name, indicator_name, first_year, last_year, fetched_at FROM series "
+                "WHERE country = ? AND indicator = ?", (key, indicator)).fetchone()
+            fresh = (row is not None and time.time() - row[4] <= self.max_age
+                     and row[2] <= first_year and row[3] >= last_year)
+            if not fresh:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            observation = self._db.execute(
+                "SELECT year, value FROM observations WHERE country = ? AND indicator = ? AND year BETWEEN ? AND ? "
+                "AND value IS NOT NULL ORDER BY year DESC LIMIT 1", (key, indicator, first_year, last_year)).fetchone()
+        year, value = observation if observation else (None, None)
+        return StoredValue(row[0], row[1], year, value, row[4])
+
+    def stale_pairs(self, countries: Iterable[str], indicators: Iterable[str], max_age: float) -> List[Tuple[str, str]]:
+        """The (country key, indicator) pairs not fetched within `max_age` seconds."""
+        pairs = [(series_key(c), i.strip()) for c in countries for i in indicators]
+        with self._lock:
+            fetched: Dict[Tuple[str, str], float] = {
+                (c, i): at for c, i, at in self._db.execute("SELECT country, indicator, fetched_at FROM series")
+            }
+        now = time.time()
+        return [pair for pair in pairs if now - fetched.get(pair, 0.0) > max_age]
+
+    def stats(self) -> dict:
+        with self._lock:
+            series, oldest, newest = self._db.execute(
+                "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM series").fetchone()
+            counters = dict(self._counters)
+        return {"series": series, "oldest_fetch": oldest, "newest_fetch": newest, **counters}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store: Optional[IndicatorStore] = None
+_init_lock = threading.Lock()
+
+
+def get_indicator_store(create: bool = True) -> Optional[IndicatorStore]:
+    """
+    Returns the process-wide store, creating it on first use (None when the store is disabled).
+    Lookups pass create=False: with no store file yet there is nothing to find, and the tool
+    skips setting up the database on the request path.
+    """
+    global _store
+    if not store_enabled():
+        return None
+    if not create and _store is None and not os.path.exists(INDICATOR_STORE_PATH):
+        return None
+    with _init_lock:
+        if _store is None:
+            _store = IndicatorStore()
+        return _store
@@ -0,0 +1,165 @@
+"""
+Country x year cube for the ND-GAIN workbook.
+
+`ndgain.xlsx` is converted once into a float32 cube `values[country, year, metric]` (ND-GAIN
+index, vulnerability, readiness; NaN = missing) plus the country codes/names and the years,
+stored as `.npy` files next to the GTD cache and memory-mapped on every later start. Latest
+values, multi-year trends and cross-country percentiles are then plain array operations.
+
+Run the conversion ahead of time with:
+    python -m tools.ndgain_store [path/to/ndgain.xlsx]
+"""
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tools.countries import country_key
+from tools.excel_cache import CACHE_ROOT, is_cache_fresh, load_columns, read_manifest, write_columns
+
+NDGAIN_EXCEL_PATH = "data/static_reports/ndgain.xlsx"
+NDGAIN_CACHE_DIR = os.path.join(CACHE_ROOT, "ndgain")
+NDGAIN_SHEET = "ndgain"
+
+# Bump when the on-disk layout below changes so stale caches get rebuilt
+NDGAIN_CACHE_VERSION = 1
+
+# Workbook column per metric, in cube order
+METRICS = ("ND-GAIN Index", "Vulnerability", "Readiness")
+
+
+def convert_ndgain(excel_path: str = NDGAIN_EXCEL_PATH, cache_dir: str = NDGAIN_CACHE_DIR) -> None:
+    """
+    One-time conversion of the ND-GAIN sheet into:
+    - values: float32 (countries x years x metrics), NaN where the workbook has no value
+    - iso3 / names: fixed-width string arrays, one entry per country in workbook order
+    - years: int16, ascending
+    """
+    df = pd.read_excel(excel_path, sheet_name=NDGAIN_SHEET)
+    missing = [c for c in ("Country", "Year", *METRICS) if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing expected column(s) in ND-GAIN data: {', '.join(missing)}")
+
+    df = df[pd.to_numeric(df["Year"], errors="coerce").notna() & df["Country"].notna()]
+    names = df["Country"].astype(str).str.strip()
+    codes = df["ISO3"].astype("string").fillna("").str.strip() if "ISO3" in df.columns else names.map(lambda _: "")
+    # One country per ISO3 code (or name, when the code is missing), in order of appearance
+    country_ids = codes.where(codes != "", names).to_numpy()
+    country_pos, iso3, country_names = {}, [], []
+    for country_id, code, name in zip(country_ids, codes.to_numpy(), names.to_numpy()):
+        if country_id not in country_pos:
+            country_pos[country_id] = len(iso3)
+            iso3.append(code)
+            country_names.append(name)
+
+    year_values = df["Year"].astype(int).to_numpy()
+    years = np.unique(year_values)
+    rows = np.fromiter((country_pos[c] for c in country_ids), dtype=np.int32, count=len(country_ids))
+    cols = np.searchsorted(years, year_values)
+
+    values = np.full((len(iso3), len(years), len(METRICS)), np.nan, dtype=np.float32)
+    for m, metric in enumerate(METRICS):
+        values[rows, cols, m] = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=np.float32)
+
+    write_columns(cache_dir, excel_path, {
+        "values": values,
+        "iso3": np.asarray(iso3, dtype=str),
+        "names": np.asarray(country_names, dtype=str),
+        "years": years.astype(np.int16),
+    }, meta={"metrics": list(METRICS)}, version=NDGAIN_CACHE_VERSION)
+
+
+def ensure_ndgain_cache(excel_path: str = NDGAIN_EXCEL_PATH, cache_dir: str = NDGAIN_CACHE_DIR) -> None:
+    """Builds the cache if it is missing or was built from a different workbook."""
+    if not os.path.exists(excel_path):
+        # A pre-built cache is enough on its own
+        if read_manifest(cache_dir) is not None:
+            return
+        raise FileNotFoundError(excel_path)
+
+    if not is_cache_fresh(cache_dir, excel_path, version=NDGAIN_CACHE_VERSION):
+        convert_ndgain(excel_path, cache_dir)
+
+
+@dataclass
+class Trend:
+    first_year: int
+    last_year: int
+    # Least-squares change per year, one per metric (None with fewer than two observations)
+    slopes: Tuple[Optional[float], ...]
+
+
+@dataclass
+class NdGainCube:
+    iso3: np.ndarray
+    names: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+    # Country key (tools/countries.py) -> row, by name and by ISO3 code
+    rows: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, cache_dir: str = NDGAIN_CACHE_DIR) -> "NdGainCube":
+        arrays = load_columns(cache_dir, ["values", "iso3", "names", "years"])
+        cube = cls(arrays["iso3"], arrays["names"], arrays["years"].astype(int), arrays["values"])
+        for row, (code, name) in enumerate(zip(cube.iso3, cube.names)):
+            for value in (str(name), str(code)):
+                if value.strip():
+                    # Exact matches only: the dataset's own names shouldn't be guessed onto another country
+                    cube.rows.setdefault(country_key(value, fuzzy=False), row)
+        return cube
+
+    def find(self, country: str) -> Optional[int]:
+        return self.rows.get(country_key(country))
+
+    def latest(self, row: int, year: Optional[int] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """(year, metric values) of the last year up to `year` that has an ND-GAIN index, or None."""
+        present = ~np.isnan(self.values[row, :, 0])
+        if year is not None:
+            present &= self.years <= year
+        positions = np.flatnonzero(present)
+        if positions.size == 0:
+            return None
+        last = positions[-1]
+        return int(self.years[last]), self.values[row, last]
+
+    def trend(self, row: int, last_year: int, span: int) -> Trend:
+        """Per-metric linear trend over the `span` years ending at `last_year`."""
+        window = (self.years > last_year - span) & (self.years <= last_year)
+        years = self.years[window].astype(float)
+        slopes = []
+        for m in range(self.values.shape[2]):
+            series = self.values[row, window, m]
+            valid = ~np.isnan(series)
+            slopes.append(float(np.polyfit(years[valid], series[valid], 1)[0]) if valid.sum() >= 2 else None)
+        observed = years[~np.isnan(self.values[row, window, 0])]
+        first = int(observed[0]) if observed.size else last_year
+        return Trend(first, last_year, tuple(slopes))
+
+    def percentiles(self, row: int, year: int) -> Tuple[List[Optional[float]], int]:
+        """
+        Share of countries (in %) whose value in `year` is at or below this country's, per metric,
+        and how many countries have an ND-GAIN index that year.
+        """
+        column = int(np.searchsorted(self.years, year))
+        values = self.values[:, column, :]
+        result = []
+        for m in range(values.shape[1]):
+            others = values[:, m][~np.isnan(values[:, m])]
+            own = values[row, m]
+            result.append(None if np.isnan(own) or others.size == 0 else float((others <= own).mean() * 100))
+        return result, int((~np.isnan(values[:, 0])).sum())
+
+
+def load_ndgain_cube(excel_path: str = NDGAIN_EXCEL_PATH, cache_dir: str = NDGAIN_CACHE_DIR) -> NdGainCube:
+    ensure_ndgain_cache(excel_path, cache_dir)
+    return NdGainCube.load(cache_dir)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else NDGAIN_EXCEL_PATH
+    convert_ndgain(path, NDGAIN_CACHE_DIR)
+    print(f"ND-GAIN cache written to {NDGAIN_CACHE_DIR}")
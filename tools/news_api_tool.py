@@ -1,22 +1,232 @@
 import os
+import datetime
 import requests
-from crewai.tools import BaseTool
+from collections import Counter
+from tools import http_client
+from tools.base import GrispTool
+from tools.dedupe import NearDuplicateIndex, simhash, text_fingerprint
+from tools.fanout import MAX_QUERIES, fan_out, query_list
+from tools.records import Article, NewsDigestRecord, NewsRecord, Story
 from dotenv import load_dotenv
-from typing import ClassVar # Import ClassVar
+from typing import Dict, Iterator, List, Optional, Tuple
 
 load_dotenv()
 
-class NewsApiTool(BaseTool):
+
+class NewsApiError(Exception):
+    pass
+
+
+def _article(raw: dict) -> Article:
+    return Article(
+        title=raw.get("title") or "No Title",
+        source=(raw.get("source") or {}).get("name") or "Unknown Source",
+        description=raw.get("description") or "No Description",
+        url=raw.get("url") or "", # Keep the URL for more context
+        published_at=raw.get("publishedAt") or "",
+    )
+
+
+class NewsApiTool(GrispTool):
     # Add type annotations to 'name' and 'description'
     name: str = "NewsApiTool"
-    description: str = "Fetches the latest news headlines and summaries related to a country's events for sentiment and security analysis."
+    description: str = (
+        "Fetches news related to a country's events for sentiment and security analysis. Input: a search query "
+        "(e.g., the country name). By default it reads every article of the last few days (optional from_date / "
+        "to_date as YYYY-MM-DD), merges syndicated copies of the same story, and returns the number of articles "
+        "per day plus the most widely carried stories. mode='top' returns only the 5 most relevant articles. "
+        "Several related searches (e.g. ['India protests', 'India election']) can be passed at once as "
+        "'queries': they run in parallel and their articles are merged, each URL counted once."
+    )
+
+    # NEWSAPI_URL points the tool elsewhere (e.g. the local stub in benchmarks/stub_server.py)
+    base_url: str = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")
+
+    # Digest mode: default window (days back from to_date), articles per page (the API allows up
+    # to 100) and per digest in total, and how many stories the agent gets to read
+    days: int = int(os.getenv("GRISP_NEWS_DAYS", "7"))
+    page_size: int = 100
+    max_articles: int = int(os.getenv("GRISP_NEWS_BUDGET", "300"))
+    top_stories: int = 8
+    # SimHash bits two articles may differ in and still count as copies (see tools/dedupe.py)
+    max_distance: int = 5
+
+    def iter_pages(self, params: dict, max_articles: Optional[int] = None) -> Iterator[Tuple[List[dict], int]]:
+        """Yields (articles, totalResults) page by page until the budget or the results run out."""
+        budget = max_articles or self.max_articles
+        params = dict(params)
+        fetched = 0
+        page = 1
+        # NewsAPI pages by offset (page - 1) * pageSize, so the page size stays the same on every
+        # page; the last page is trimmed to the budget instead
+        params["pageSize"] = self.page_size
+        while fetched < budget:
+            params["page"] = page
+            response = http_client.get(self.base_url, params=params, source="newsapi")
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            if data.get("status") == "error" or not response.ok:
+                # e.g. maximumResultsReached on free plans once the first 100 results are read
+                raise NewsApiError(f"{data.get('code', response.status_code)} - {data.get('message', 'Unknown Error')}")
 
-    def _run(self, query: str) -> str:
+            articles = data.get("articles") or []
+            if not articles:
+                return
+            total = int(data.get("totalResults") or 0)
+            served = page * self.page_size
+            articles = articles[:budget - fetched]
+            fetched += len(articles)
+            yield articles, total
+            if served >= total:
+                return
+            page += 1
+
+    def _run(self, query: str = "", mode: str = "digest", from_date: Optional[str] = None, to_date: Optional[str] = None,
+             queries: Optional[List[str]] = None):
         api_key = os.getenv("NEWSAPI_KEY")
         if not api_key:
             return "Error: NEWSAPI_KEY not found in environment variables. Please set it."
 
-        url = "https://newsapi.org/v2/everything"
+        wanted = query_list(query, queries)
+        if not wanted:
+            return "Error: no search query given. Pass 'query' or a list of 'queries'."
+        # Queries over the limit are not run; the record lists them
+        wanted, dropped = wanted[:MAX_QUERIES], tuple(wanted[MAX_QUERIES:])
+
+        mode = (mode or "digest").strip().lower()
+        if mode == "top":
+            if len(wanted) == 1:
+                return self._top_articles(wanted[0], api_key)
+            return self._merged_top_articles(wanted, api_key, dropped)
+        if mode != "digest":
+            return f"Error: unknown mode '{mode}'. Use 'digest' or 'top'."
+
+        try:
+            to_day = datetime.date.fromisoformat(to_date.strip()[:10]) if to_date else datetime.date.today()
+            from_day = (datetime.date.fromisoformat(from_date.strip()[:10]) if from_date
+                        else to_day - datetime.timedelta(days=self.days))
+        except ValueError:
+            return f"Error: from_date and to_date must be dates in YYYY-MM-DD format (got '{from_date}', '{to_date}')."
+        if from_day > to_day:
+            return f"Error: from_date {from_day} is after to_date {to_day}."
+
+        return self._digest(wanted, api_key, from_day.isoformat(), to_day.isoformat(), dropped)
+
+    def _fetch_window(self, query: str, api_key: str, from_date: str, to_date: str, budget: int):
+        """Every article on `query` in the window, up to `budget`: (raw articles, totalResults, error or None)."""
+        params = {
+            "q": query,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "from": from_date,
+            "to": to_date,
+            "apiKey": api_key
+        }
+        articles, total = [], 0
+        try:
+            for page, total in self.iter_pages(params, budget):
+                articles.extend(page)
+        except (requests.exceptions.RequestException, NewsApiError) as e:
+            return articles, total, e
+        return articles, total, None
+
+    def _digest(self, queries: List[str], api_key: str, from_date: str, to_date: str, dropped: Tuple[str, ...] = ()):
+        query = " | ".join(queries)
+        # Several queries share the article budget and are fetched at the same time
+        budget = max(1, self.max_articles // len(queries))
+        try:
+            fetched_windows = fan_out(lambda q: self._fetch_window(q, api_key, from_date, to_date, budget), queries)
+        except Exception as e:
+            return f"An unexpected error occurred while processing news for query '{query}': {str(e)}"
+
+        # Articles stream through three checks: a URL already seen (another query found it) is
+        # skipped; the same normalized text (tools/dedupe.py) or a SimHash within max_distance
+        # bits makes an article a copy of an earlier story.
+        stories: List[dict] = []
+        by_text: Dict[int, int] = {}
+        near = NearDuplicateIndex(self.max_distance)
+        daily_articles, daily_stories = Counter(), Counter()
+        seen_urls = set()
+        fetched, overlap, truncated, failures = 0, 0, False, []
+        for q, (page, total, error) in zip(queries, fetched_windows):
+            if error is not None:
+                # What was fetched before the failure is kept; the record says where it stopped
+                failures.append((q, f"stopped after {len(page)} articles: {error}" if page else str(error)))
+            truncated = truncated or total > len(page)
+            for raw in page:
+                article = _article(raw)
+                if article.title == "[Removed]":
+                    continue
+                if article.url:
+                    if article.url in seen_urls:
+                        overlap += 1
+                        continue
+                    seen_urls.add(article.url)
+                fetched += 1
+                day = article.published_at[:10]
+                daily_articles[day] += 1
+
+                text = f"{article.title}. {article.description}"
+                key = text_fingerprint(text)
+                index = by_text.get(key)
+                if index is None:
+                    hashed = simhash(text)
+                    index = near.find(hashed)
+                    if index is None:
+                        index = len(stories)
+                        stories.append({"article": article, "copies": 0, "sources": {}})
+                        near.add(hashed, index)
+                        daily_stories[day] += 1
+                    by_text[key] = index
+                story = stories[index]
+                story["copies"] += 1
+                story["sources"].setdefault(article.source, None)
+
+        if not fetched and failures:
+            failed = "; ".join(f"'{q}': {error}" for q, error in failures)
+            return f"Network or API error while fetching news for query {failed}"
+        if not fetched:
+            return f"No news articles found for the query: '{query}' between {from_date} and {to_date}."
+
+        # Widely carried stories first, the most recent among equals
+        ranked = sorted(stories, key=lambda s: (s["copies"], s["article"].published_at), reverse=True)
+        return NewsDigestRecord(
+            query=query,
+            from_date=from_date,
+            to_date=to_date,
+            articles=fetched,
+            stories=len(stories),
+            duplicates=fetched - len(stories),
+            daily_counts=tuple((day, daily_articles[day], daily_stories[day]) for day in sorted(daily_articles) if day),
+            top_stories=tuple(
+                Story(s["article"], s["copies"], tuple(s["sources"])) for s in ranked[:self.top_stories]
+            ),
+            truncated=truncated,
+            overlap=overlap,
+            failures=tuple(failures),
+            dropped=dropped,
+        )
+
+    def _merged_top_articles(self, queries: List[str], api_key: str, dropped: Tuple[str, ...] = ()):
+        """mode='top' for several queries at once: their articles in query order, each URL once."""
+        results = fan_out(lambda q: self._top_articles(q, api_key), queries)
+        articles, seen, failures = [], set(), []
+        for q, result in zip(queries, results):
+            if not isinstance(result, NewsRecord):
+                failures.append((q, result))
+                continue
+            for article in result.articles:
+                if article.url not in seen:
+                    seen.add(article.url)
+                    articles.append(article)
+        if not articles:
+            return "No news articles found for the queries:\n" + "\n".join(f"- '{q}': {error}" for q, error in failures)
+        return NewsRecord(" | ".join(queries), tuple(articles), tuple(failures), dropped)
+
+    def _top_articles(self, query: str, api_key: str):
+        url = self.base_url
         params = {
             "q": query,
             "language": "en",
@@ -26,7 +236,7 @@ class NewsApiTool(BaseTool):
         }
 
         try:
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params, source="newsapi")
             response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
             data = response.json()
 
@@ -38,18 +248,9 @@ class NewsApiTool(BaseTool):
             if not articles:
                 return f"No news articles found for the query: '{query}'."
 
-            # Format output
-            output = []
-            for article in articles:
-                title = article.get("title", "No Title")
-                description = article.get("description", "No Description")
-                source = article.get("source", {}).get("name", "Unknown Source")
-                url_link = article.get("url", "") # Get the URL for more context
-                output.append(f"📰 {title} ({source}): {description}\n🔗 {url_link}")
-
-            return "Top News Articles:\n\n" + "\n\n".join(output)
+            return NewsRecord(query, tuple(_article(article) for article in articles))
 
         except requests.exceptions.RequestException as e:
             return f"Network or API error while fetching news for query '{query}': {str(e)}"
         except Exception as e:
-            return f"An unexpected error occurred while processing news for query '{query}': {str(e)}"
\ No newline at end of file
+            return f"An unexpected error occurred while processing news for query '{query}': {str(e)}"
@@ -0,0 +1,356 @@
+"""
+Typed records produced by the tools.
+
+Each tool builds one of these compact `__slots__` dataclasses instead of a formatted string.
+The record goes into the per-run fact store (tools/fact_store.py), where the scoring stages and
+downstream prompts read the numbers directly, and `render()` turns it into the human-readable
+text the calling LLM sees.
+"""
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from typing import ClassVar, Iterator, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+
+def format_value(value) -> str:
+    """Formats a number for better readability (e.g., millions/billions for large numbers)."""
+    if isinstance(value, (int, float)):
+        if value >= 1_000_000_000_000:
+            return f"{value/1_000_000_000_000:,.2f} Trillion"
+        elif value >= 1_000_000_000:
+            return f"{value/1_000_000_000:,.2f} Billion"
+        elif value >= 1_000_000:
+            return f"{value/1_000_000:,.2f} Million"
+        elif value >= 1_000:
+            return f"{value/1_000:,.2f} Thousand"
+        else:
+            return f"{value:,.2f}" # Default to 2 decimal places for smaller numbers
+    return str(value) # Fallback for non-numeric values
+
+
+class Record:
+    """Base for every tool record: `kind` names the record type in the fact store."""
+    __slots__ = ()
+    kind: ClassVar[str] = "record"
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, **asdict(self)}
+
+    def flatten(self) -> Iterator["Record"]:
+        """The atomic records this one stands for (composite records override this)."""
+        yield self
+
+    @staticmethod
+    def from_dict(data: dict) -> "Record":
+        """Inverse of to_dict (also after a JSON round trip, which turns the tuples into lists)."""
+        kinds = {cls.kind: cls for cls in _record_classes(Record)}
+        if data.get("kind") not in kinds:
+            raise ValueError(f"unknown record kind: {data.get('kind')!r}")
+        return _rebuild(kinds[data["kind"]], data)
+
+
+def _record_classes(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _record_classes(sub)
+
+
+def _rebuild(tp, value):
+    """`value` (plain JSON data) as an instance of the annotated type `tp`."""
+    if value is None:
+        return None
+    if is_dataclass(tp) and isinstance(value, dict):
+        hints = get_type_hints(tp)
+        return tp(**{f.name: _rebuild(hints[f.name], value[f.name]) for f in fields(tp) if f.name in value})
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is Union:
+        # Optional[X]: value is not None here
+        return _rebuild(next(arg for arg in args if arg is not type(None)), value)
+    if origin is tuple:
+        if len(args) == 2 and args[1] is Ellipsis:
+            return tuple(_rebuild(args[0], item) for item in value)
+        return tuple(_rebuild(arg, item) for arg, item in zip(args, value))
+    return value
+
+
+@dataclass(slots=True, frozen=True)
+class WorldBankRecord(Record):
+    kind: ClassVar[str] = "world_bank"
+    country_code: str
+    country_name: str
+    indicator: str
+    indicator_name: str
+    year: Optional[int]
+    value: Optional[float]
+
+    def render(self) -> str:
+        if self.value is None:
+            return (
+                f"Data for indicator '{self.indicator_name}' for {self.country_name} "
+                f"is not available for year {self.year} (value is null/missing)."
+            )
+        return (
+            f"World Bank Data for {self.country_name} ({self.country_code}):\n"
+            f"- Indicator: {self.indicator_name}\n"
+            f"- Year: {self.year}\n"
+            f"- Value: {format_value(self.value)}\n"
+            f"- Source: World Bank"
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class WorldBankBatch(Record):
+    """Latest value per country/indicator pair of one batch query."""
+    kind: ClassVar[str] = "world_bank_batch"
+    first_year: int
+    last_year: int
+    records: Tuple[WorldBankRecord, ...]
+
+    def flatten(self) -> Iterator[Record]:
+        yield from self.records
+
+    def render(self) -> str:
+        blocks = {}
+        for record in self.records:
+            lines = blocks.setdefault(
+                record.country_code, [f"World Bank Data for {record.country_name} ({record.country_code}):"]
+            )
+            if record.value is None:
+                lines.append(f"- {record.indicator_name}: no data in {self.first_year}-{self.last_year}")
+            else:
+                lines.append(f"- {record.indicator_name} ({record.year}): {format_value(record.value)}")
+        return "\n\n".join("\n".join(lines) for lines in blocks.values()) + "\n\nSource: World Bank"
+
+
+@dataclass(slots=True, frozen=True)
+class TerrorismRecord(Record):
+    kind: ClassVar[str] = "terrorism"
+    country: str
+    lookback_years: int
+    first_year: int
+    attacks: int
+    fatalities: int
+    injuries: int
+    top_targets: Tuple[Tuple[str, int], ...]
+
+    def render(self) -> str:
+        top_targets_str = "  - No target information available."
+        if self.top_targets:
+            top_targets_str = "\n".join([f"  - {k}: {v} times" for k, v in self.top_targets])
+        return (
+            f"Recent Terrorism Stats for {self.country} (Last {self.lookback_years} Years):\n"
+            f"- Total Attacks: {self.attacks}\n"
+            f"- Fatalities: {self.fatalities}\n"
+            f"- Injuries: {self.injuries}\n"
+            f"- Top Targets:\n{top_targets_str}"
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class ClimateRecord(Record):
+    kind: ClassVar[str] = "climate"
+    country: str
+    year: int
+    ndgain_index: float
+    vulnerability: float
+    readiness: float
+    iso3: str = ""
+    # Linear change per year over trend_first_year..year (ND-GAIN index, vulnerability, readiness)
+    trend_first_year: Optional[int] = None
+    trend_slopes: Tuple[Optional[float], ...] = ()
+    # Share of countries (%) at or below this country's value in `year`, same metric order
+    percentiles: Tuple[Optional[float], ...] = ()
+    countries_ranked: int = 0
+
+    def render(self) -> str:
+        lines = [
+            f"Climate Risk Score for {self.country}:",
+            f"- ND-GAIN Index: {self.ndgain_index}",
+            f"- Vulnerability: {self.vulnerability}",
+            f"- Readiness: {self.readiness}",
+            f"- Year: {self.year}",
+        ]
+        labels = ("ND-GAIN Index", "Vulnerability", "Readiness")
+        if self.trend_slopes:
+            changes = ", ".join(
+                f"{label} {'n/a' if slope is None else f'{slope:+.4f}'}" for label, slope in zip(labels, self.trend_slopes)
+            )
+            lines.append(f"- Trend {self.trend_first_year}-{self.year} (change per year): {changes}")
+        if self.percentiles:
+            ranks = ", ".join(
+                f"{label} {'n/a' if pct is None else f'{pct:.0f}'}" for label, pct in zip(labels, self.percentiles)
+            )
+            lines.append(
+                f"- Percentile rank (0-100) among {self.countries_ranked} countries in {self.year}; "
+                f"higher index/readiness is better, higher vulnerability is worse: {ranks}"
+            )
+        return "\n".join(lines)
+
+
+@dataclass(slots=True, frozen=True)
+class SentimentRecord(Record):
+    kind: ClassVar[str] = "sentiment"
+    query: str
+    total: int
+    positive: int
+    neutral: int
+    negative: int
+    # Compound-score distribution (-1 = most negative, 1 = most positive)
+    mean: float = 0.0
+    median: float = 0.0
+    stdev: float = 0.0
+    p10: float = 0.0
+    p90: float = 0.0
+    # Counts per 0.2-wide compound bin, from [-1, -0.8) up to [0.8, 1]
+    histogram: Tuple[int, ...] = ()
+    backend: str = "vader"
+    # Retweets and near-duplicate texts dropped before scoring
+    duplicates: int = 0
+
+    def render(self) -> str:
+        total = self.total
+        lines = [
+            f"Sentiment Analysis of {total} recent tweets about '{self.query}'"
+            + (f" ({self.duplicates} retweets/duplicates skipped):" if self.duplicates else ":"),
+            f"👍 Positive: {self.positive} ({self.positive/total:.1%})",
+            f"😐 Neutral:  {self.neutral} ({self.neutral/total:.1%})",
+            f"👎 Negative: {self.negative} ({self.negative/total:.1%})",
+            f"Compound score: mean {self.mean:+.2f}, median {self.median:+.2f}, "
+            f"std {self.stdev:.2f}, 10th-90th percentile {self.p10:+.2f} to {self.p90:+.2f}",
+        ]
+        if self.histogram:
+            lines.append(f"Distribution from -1 to +1 (0.2-wide bins): {' '.join(str(n) for n in self.histogram)}")
+        return "\n".join(lines)
+
+
+@dataclass(slots=True, frozen=True)
+class Article:
+    title: str
+    source: str
+    description: str
+    url: str
+    # ISO timestamp from the API ("2026-10-10T08:00:00Z"), "" if unknown
+    published_at: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class NewsRecord(Record):
+    kind: ClassVar[str] = "news"
+    query: str
+    articles: Tuple[Article, ...]
+    # Several queries: (query, error message) for the ones that failed
+    failures: Tuple[Tuple[str, str], ...] = ()
+    # Queries over the per-call limit, not run
+    dropped: Tuple[str, ...] = ()
+
+    def render(self) -> str:
+        output = [f"📰 {a.title} ({a.source}): {a.description}\n🔗 {a.url}" for a in self.articles]
+        output += [f"Results for '{query}': {error}" for query, error in self.failures]
+        if self.dropped:
+            output.append(f"(not searched, too many queries in one call: {', '.join(self.dropped)})")
+        return "Top News Articles:\n\n" + "\n\n".join(output)
+
+
+@dataclass(slots=True, frozen=True)
+class Story:
+    """One news story: the first article seen of it, and how many copies of it were collapsed."""
+    article: Article
+    copies: int = 1
+    sources: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True, frozen=True)
+class NewsDigestRecord(Record):
+    """Every article on a query within a date window, collapsed into distinct stories."""
+    kind: ClassVar[str] = "news_digest"
+    query: str
+    from_date: str
+    to_date: str
+    # Articles received, and what was left after exact and near-duplicate copies were merged
+    articles: int
+    stories: int
+    duplicates: int
+    # (YYYY-MM-DD, articles, distinct stories) per day, oldest first
+    daily_counts: Tuple[Tuple[str, int, int], ...] = ()
+    # Most widely carried stories first
+    top_stories: Tuple[Story, ...] = ()
+    # The API had more results than were fetched
+    truncated: bool = False
+    # Several queries: articles (same URL) returned by more than one of them, counted once
+    overlap: int = 0
+    # (query, error message) for the queries that failed or stopped early; the counts above
+    # include whatever they fetched before the error
+    failures: Tuple[Tuple[str, str], ...] = ()
+    # Queries over the per-call limit, not run
+    dropped: Tuple[str, ...] = ()
+
+    def render(self) -> str:
+        lines = [
+            f"News digest for '{self.query}', {self.from_date} to {self.to_date}: {self.articles} articles, "
+            f"{self.stories} distinct stories ({self.duplicates} syndicated/duplicate copies merged"
+            + (f", {self.overlap} found by several queries" if self.overlap else "") + ")"
+            + (", more results were available" if self.truncated else "") + "."
+        ]
+        if self.failures:
+            lines.append("Searches that failed or stopped early:")
+            lines += [f"- '{query}': {error}" for query, error in self.failures]
+        if self.dropped:
+            lines.append(f"Not searched (too many queries in one call): {', '.join(self.dropped)}")
+        if self.daily_counts:
+            lines.append("Articles per day (distinct stories): "
+                         + ", ".join(f"{day[5:]}: {n} ({k})" for day, n, k in self.daily_counts))
+        if self.top_stories:
+            lines.append("Top stories:")
+        for story in self.top_stories:
+            a = story.article
+            carried = ""
+            if story.copies > 1:
+                carried = f"; {story.copies} copies" + (f" incl. {', '.join(story.sources[:3])}" if story.sources else "")
+            description = a.description if len(a.description) <= 200 else a.description[:197].rstrip() + "..."
+            lines.append(f"- {a.title} ({a.source}, {a.published_at[:10] or 'undated'}{carried}): {description}\n  🔗 {a.url}")
+        return "\n".join(lines)
+
+
+@dataclass(slots=True, frozen=True)
+class SearchResult:
+    snippet: str
+    link: str
+
+
+@dataclass(slots=True, frozen=True)
+class SearchRecord(Record):
+    kind: ClassVar[str] = "search"
+    query: str
+    results: Tuple[SearchResult, ...]
+
+    def render(self) -> str:
+        return "\n\n".join(f"Snippet: {r.snippet}\nLink: {r.link}" for r in self.results)
+
+
+@dataclass(slots=True, frozen=True)
+class SearchBatch(Record):
+    """Several searches run in one tool call; a link already returned for an earlier query is left out."""
+    kind: ClassVar[str] = "search_batch"
+    searches: Tuple[SearchRecord, ...]
+    duplicates: int = 0
+    # (query, error message) for the queries that failed
+    errors: Tuple[Tuple[str, str], ...] = ()
+    # Queries over the per-call limit, not run
+    dropped: Tuple[str, ...] = ()
+
+    def flatten(self) -> Iterator[Record]:
+        yield from self.searches
+
+    def render(self) -> str:
+        parts = [f"Results for '{s.query}':\n\n{s.render()}" for s in self.searches if s.results]
+        parts += [f"Results for '{query}': {error}" for query, error in self.errors]
+        notes = []
+        repeated = [s.query for s in self.searches if not s.results]
+        if repeated:
+            notes.append(f"no new links for: {', '.join(repeated)}")
+        if self.duplicates:
+            notes.append(f"{self.duplicates} duplicate link(s) returned by several queries listed once")
+        if self.dropped:
+            notes.append(f"not searched (too many queries in one call): {', '.join(self.dropped)}")
+        return "\n\n".join(parts) + (f"\n\n({'; '.join(notes)})" if notes else "")
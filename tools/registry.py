@@ -0,0 +1,73 @@
+import importlib
+import threading
+from collections.abc import Mapping
+from tools import tracing
+
+# Tool name -> "module:ClassName". Nothing is imported until a tool is first requested.
+TOOL_CLASSES = {
+    "ClimateApiTool": "tools.climate_api_tool:ClimateApiTool",
+    "GlobalTerrorismDatabaseTool": "tools.global_terrorism_database_scraper:GlobalTerrorismDatabaseTool",
+    "GoogleSearchTool": "tools.google_search_tool:GoogleSearchTool",
+    "TwitterSentimentTool": "tools.twitter_sentiment_tool:TwitterSentimentTool",
+    "WorldBankApiTool": "tools.world_bank_api:WorldBankApiTool",
+    "NewsApiTool": "tools.news_api_tool:NewsApiTool",
+}
+
+
+class LazyToolMap(Mapping):
+    """
+    Read-only tool name -> tool instance mapping that imports and constructs each tool on first
+    access, once per process. Tools no agent references are never loaded, so their data files,
+    API keys and heavy imports (pandas, nltk, ...) are never touched.
+    """
+
+    def __init__(self, classes=None):
+        self._classes = dict(classes or TOOL_CLASSES)
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._classes:
+            raise KeyError(f"Unknown tool '{name}'. Known tools: {', '.join(self._classes)}")
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            if name not in self._instances:
+                module_name, class_name = self._classes[name].split(":")
+                # Imports and data loads (Excel workbooks, lexicons, ...) show up as a tool_init span
+                with tracing.span(name, "tool_init"):
+                    tool_class = getattr(importlib.import_module(module_name), class_name)
+                    self._instances[name] = tool_class()
+            return self._instances[name]
+
+    def __iter__(self):
+        return iter(self._classes)
+
+    def __len__(self):
+        return len(self._classes)
+
+    def loaded(self):
+        """Names of the tools constructed so far."""
+        return list(self._instances)
+
+    def preload(self, names):
+        """Constructs the given tools up front (e.g. before forking workers or serving requests)."""
+        for name in names:
+            self[name]
+
+    def reload(self, name):
+        """
+        Rebuilds a loaded tool (e.g. after its data files changed) and swaps it in. Callers holding
+        the old instance keep using it; later lookups get the new one. Unloaded tools stay unloaded.
+        """
+        if name not in self._instances:
+            return None
+        module_name, class_name = self._classes[name].split(":")
+        with tracing.span(name, "tool_init", reload=True):
+            instance = getattr(importlib.import_module(module_name), class_name)()
+        with self._lock:
+            self._instances[name] = instance
+        return instance
@@ -0,0 +1,472 @@
+"""
+Batch sentiment engine shared by the tools that score text (tweets, news snippets, ...).
+
+Every backend turns a list of texts into an array of compound scores in [-1, 1]:
+
+- `vader`: NLTK VADER with one lexicon load per process. A batch is tokenized in one pass and its
+  tokens scored together with array operations (same scores as VADER's `polarity_scores`); each
+  unique text is scored once and kept in an LRU cache (repeated texts and retweets cost a dict lookup).
+- `transformer`: an optional CPU `torch` + `transformers` sentiment model
+  (compound = P(positive) - P(negative)), batched by length so padding stays small.
+
+`summarize()` reduces the scores to bucket counts and a compound-score distribution.
+Pick the backend with GRISP_SENTIMENT_BACKEND (default: vader).
+"""
+import os
+import string
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# VADER's standard thresholds for the positive / negative buckets
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Edges of the compound-score histogram: 10 bins of width 0.2 from -1 to 1
+HISTOGRAM_EDGES = np.linspace(-1.0, 1.0, 11)
+
+# One text per VADER rule the batch scorer reproduces (caps, boosters, negation, "never so",
+# "least", "but", idioms, punctuation emphasis, repeated words); see VaderBackend
+PARITY_TEXTS = (
+    "The service was GOOD but the food was bad!!",
+    "I am not happy, it is not good",
+    "This is extremely good and VERY happy",
+    "barely good, kind of bad, sort of happy, kinda good",
+    "never so happy, never this bad",
+    "at least good; least happy; very least bad",
+    "the shit was good, yeah right happy",
+    "good good not good good",
+    "Wow!!!! Is this happy??? good :)",
+    "\"bad\" (bad) news... hardly good",
+    "",
+)
+
+DEFAULT_BACKEND = os.getenv("GRISP_SENTIMENT_BACKEND", "vader").strip().lower()
+DEFAULT_TRANSFORMER_MODEL = os.getenv("GRISP_SENTIMENT_MODEL", "cardiffnlp/twitter-roberta-base-sentiment-latest")
+
+
+def ensure_vader_lexicon() -> None:
+    """
+    Checks offline that the VADER lexicon is installed. Nothing is downloaded at import time;
+    set NLTK_AUTO_DOWNLOAD=1 to allow a one-off download when it is missing.
+    """
+    import nltk
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError: # Use LookupError directly for missing data
+        if os.getenv("NLTK_AUTO_DOWNLOAD", "0").strip().lower() in ("1", "true", "on", "yes"):
+            nltk.download('vader_lexicon', quiet=True)
+            nltk.data.find('sentiment/vader_lexicon.zip')
+        else:
+            raise RuntimeError(
+                "VADER lexicon not found. Run 'python -m nltk.downloader vader_lexicon' once "
+                "(or set NLTK_AUTO_DOWNLOAD=1)."
+            )
+
+
+@dataclass
+class SentimentSummary:
+    """Bucket counts and compound-score distribution of a batch of texts."""
+    total: int
+    positive: int
+    neutral: int
+    negative: int
+    mean: float
+    median: float
+    stdev: float
+    p10: float
+    p90: float
+    histogram: Tuple[int, ...]
+
+
+def summarize(compound: np.ndarray) -> SentimentSummary:
+    compound = np.asarray(compound, dtype=float)
+    if compound.size == 0:
+        return SentimentSummary(0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, (0,) * (len(HISTOGRAM_EDGES) - 1))
+    p10, median, p90 = np.percentile(compound, [10, 50, 90])
+    positive = int((compound >= POSITIVE_THRESHOLD).sum())
+    negative = int((compound <= NEGATIVE_THRESHOLD).sum())
+    histogram, _ = np.histogram(np.clip(compound, -1.0, 1.0), bins=HISTOGRAM_EDGES)
+    return SentimentSummary(
+        total=int(compound.size),
+        positive=positive,
+        neutral=int(compound.size) - positive - negative,
+        negative=negative,
+        mean=round(float(compound.mean()), 4),
+        median=round(float(median), 4),
+        stdev=round(float(compound.std()), 4),
+        p10=round(float(p10), 4),
+        p90=round(float(p90), 4),
+        histogram=tuple(int(n) for n in histogram),
+    )
+
+
+class StreamingSentiment:
+    """
+    Accumulates compound scores batch by batch in constant memory: bucket counts, running sums
+    and a 0.01-resolution histogram, from which the percentiles are read back.
+    """
+    FINE_BINS = 200
+
+    def __init__(self):
+        self.positive = self.negative = self.total = 0
+        self._sum = self._sum_sq = 0.0
+        self._fine = np.zeros(self.FINE_BINS, dtype=np.int64)
+
+    def add(self, compound: np.ndarray):
+        compound = np.clip(np.asarray(compound, dtype=float), -1.0, 1.0)
+        self.total += int(compound.size)
+        self.positive += int((compound >= POSITIVE_THRESHOLD).sum())
+        self.negative += int((compound <= NEGATIVE_THRESHOLD).sum())
+        self._sum += float(compound.sum())
+        self._sum_sq += float((compound ** 2).sum())
+        bins = np.minimum(((compound + 1.0) / 2.0 * self.FINE_BINS).astype(int), self.FINE_BINS - 1)
+        self._fine += np.bincount(bins, minlength=self.FINE_BINS)
+
+    def _percentile(self, q: float) -> float:
+        """Midpoint of the fine bin holding the q-th percentile."""
+        rank = q / 100 * (self.total - 1)
+        n = int(np.searchsorted(np.cumsum(self._fine), rank, side="right"))
+        return -1.0 + (min(n, self.FINE_BINS - 1) + 0.5) * 2.0 / self.FINE_BINS
+
+    def summary(self) -> SentimentSummary:
+        if not self.total:
+            return summarize(np.empty(0))
+        mean = self._sum / self.total
+        per_coarse_bin = self.FINE_BINS // (len(HISTOGRAM_EDGES) - 1)
+        return SentimentSummary(
+            total=self.total,
+            positive=self.positive,
+            neutral=self.total - self.positive - self.negative,
+            negative=self.negative,
+            mean=round(mean, 4),
+            median=round(self._percentile(50), 4),
+            stdev=round(max(self._sum_sq / self.total - mean ** 2, 0.0) ** 0.5, 4),
+            p10=round(self._percentile(10), 4),
+            p90=round(self._percentile(90), 4),
+            histogram=tuple(int(n) for n in self._fine.reshape(-1, per_coarse_bin).sum(axis=1)),
+        )
+
+
+class SentimentBackend:
+    """Scores texts in batches. Subclasses implement `_score_unique`; caching and dedupe live here."""
+    name = "base"
+
+    def __init__(self, cache_size: int = 50_000):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compound(self, texts: Sequence[str]) -> np.ndarray:
+        """Compound score in [-1, 1] for every text, in order."""
+        texts = [t or "" for t in texts]
+        known = {}
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                if text in self._cache:
+                    self._cache.move_to_end(text)
+                    known[text] = self._cache[text]
+        missing = [t for t in dict.fromkeys(texts) if t not in known]
+
+        if missing:
+            scored = dict(zip(missing, self._score_unique(missing)))
+            known.update(scored)
+            with self._lock:
+                self._cache.update(scored)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return np.fromiter((known[t] for t in texts), dtype=float, count=len(texts))
+
+    def score(self, texts: Sequence[str]) -> SentimentSummary:
+        return summarize(self.compound(texts))
+
+    def _score_unique(self, texts: List[str]) -> List[float]:
+        raise NotImplementedError
+
+
+class VaderBackend(SentimentBackend):
+    """
+    NLTK VADER, scored a batch at a time with the same results as `polarity_scores`.
+
+    The texts are tokenized in one pass (VADER's own tokenization), the lexicon and booster
+    lookups are made once per distinct token of the batch, and VADER's rules (ALL CAPS, boosters
+    and dampeners up to three words back, negation, "least", "but") then run as array operations
+    over every token of the batch at once. Only the rare tokens near an idiom ("the bomb", "kind of")
+    go through VADER's own idiom check.
+    On start the two scorers are compared on PARITY_TEXTS; if they disagree (a changed NLTK),
+    the backend falls back to `polarity_scores` text by text.
+    benchmarks/vader_parity.py runs the same comparison on a large randomized set.
+    """
+    name = "vader"
+
+    def __init__(self, cache_size: int = 50_000):
+        super().__init__(cache_size)
+        ensure_vader_lexicon()
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        # Parsing the lexicon is the expensive part of VADER; it happens once per process here
+        self.analyzer = SentimentIntensityAnalyzer()
+        # The batch scorer mirrors VADER's rules and uses two of its private helpers; should an NLTK
+        # release change either, texts are scored one by one with polarity_scores instead
+        try:
+            self._prepare_batch_scoring()
+            mismatches = self.parity_mismatches(PARITY_TEXTS)
+        except Exception as e:
+            print(f"⚠️ VADER batch scoring unavailable with this NLTK version ({type(e).__name__}: {e}); "
+                  "scoring texts one by one.")
+            mismatches = None
+        if mismatches:
+            print(f"⚠️ VADER batch scoring disagrees with polarity_scores on {len(mismatches)} check text(s) "
+                  "with this NLTK version; scoring texts one by one.")
+        self.vectorized = mismatches == []
+
+    def _prepare_batch_scoring(self):
+        self.lexicon = self.analyzer.lexicon
+        constants = self.analyzer.constants
+        self.constants = constants
+        self._strip_punctuation = constants.REGEX_REMOVE_PUNCTUATION
+        self._punc = frozenset(constants.PUNC_LIST)
+        # Words that can take part in an idiom or a two-word booster ("yeah right", "sort of")
+        self._idiom_words = frozenset(
+            word for phrase in list(constants.SPECIAL_CASE_IDIOMS) + list(constants.BOOSTER_DICT)
+            if " " in phrase for word in phrase.split())
+        self._idioms_check = self.analyzer._idioms_check
+        self._punctuation_emphasis = self.analyzer._punctuation_emphasis
+
+    def parity_mismatches(self, texts: Sequence[str]) -> List[Tuple[str, float, float]]:
+        """(text, batch score, polarity_scores score) for every text the two scorers disagree on."""
+        expected = [self.analyzer.polarity_scores(text)["compound"] for text in texts]
+        return [(t, got, want) for t, got, want in zip(texts, self._score_batch(list(texts)), expected) if got != want]
+
+    def _score_unique(self, texts):
+        if self.vectorized:
+            return self._score_batch(texts)
+        polarity_scores = self.analyzer.polarity_scores
+        return [polarity_scores(text)["compound"] for text in texts]
+
+    def _tokenize(self, text: str) -> List[str]:
+        """VADER's words_and_emoticons: one-character tokens dropped, punctuation around a word removed."""
+        words = {w for w in self._strip_punctuation.sub("", text).split() if len(w) > 1}
+        tokens = []
+        for token in text.split():
+            if len(token) <= 1:
+                continue
+            # 'word!!' (checked first, as in VADER) or '"word' -> word
+            word = token.rstrip(string.punctuation)
+            if word in words and token[len(word):] in self._punc:
+                token = word
+            else:
+                word = token.lstrip(string.punctuation)
+                if word in words and token[:len(token) - len(word)] in self._punc:
+                    token = word
+            tokens.append(token)
+        return tokens
+
+    def _token_features(self, vocab: List[str]) -> Dict[str, np.ndarray]:
+        """Lookups for every distinct token of the batch, made once each."""
+        constants, lexicon = self.constants, self.lexicon
+        lower = [t.lower() for t in vocab]
+        flags = lambda values: np.fromiter(values, dtype=bool, count=len(vocab))
+        return {
+            "valence": np.fromiter((lexicon.get(t, np.nan) for t in lower), dtype=float, count=len(vocab)),
+            "in_lexicon": flags(t in lexicon for t in lower),
+            "booster": np.fromiter((constants.BOOSTER_DICT.get(t, 0.0) for t in lower), dtype=float, count=len(vocab)),
+            "is_booster": flags(t in constants.BOOSTER_DICT for t in lower),
+            "upper": flags(t.isupper() for t in vocab),
+            "negated": flags(t in constants.NEGATE or "n't" in t for t in lower),
+            # VADER compares these without lower-casing
+            "never": flags(t == "never" for t in vocab),
+            "so_this": flags(t in ("so", "this") for t in vocab),
+            "idiom": flags(t in self._idiom_words for t in vocab),
+            "least": flags(t == "least" for t in lower),
+            "at_very": flags(t in ("at", "very") for t in lower),
+            "kind": flags(t == "kind" for t in lower),
+            "of": flags(t == "of" for t in lower),
+            "but": flags(t == "but" for t in lower),
+        }
+
+    def _score_batch(self, texts: List[str]) -> List[float]:
+        c = self.constants
+        # One pass over the batch: tokens as ids into the batch vocabulary. VADER looks at the
+        # words around the *first* occurrence of a token, so `context` is that position.
+        documents = [self._tokenize(text) for text in texts]
+        vocab: Dict[str, int] = {}
+        ids, context = [], []
+        for tokens in documents:
+            first: Dict[str, int] = {}
+            for i, token in enumerate(tokens):
+                ids.append(vocab.setdefault(token, len(vocab)))
+                context.append(first.setdefault(token, i))
+        if not ids:
+            return [0.0] * len(texts)
+
+        f = self._token_features(list(vocab))
+        ids = np.asarray(ids, dtype=np.int64)
+        context = np.asarray(context, dtype=np.int64)
+        lengths = np.fromiter((len(tokens) for tokens in documents), dtype=np.int64, count=len(documents))
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        position = np.arange(len(ids)) - start
+        length = lengths[doc]
+
+        def at(feature, offset):
+            """`feature` of the token `offset` words from each token's context (clipped; mask the result)."""
+            return f[feature][ids[np.clip(start + context + offset, 0, len(ids) - 1)]]
+
+        upper = f["upper"][ids]
+        # Some but not all of a text's tokens are ALL CAPS
+        upper_count = np.bincount(doc, weights=upper, minlength=len(texts))
+        cap_diff = ((upper_count > 0) & (upper_count < lengths))[doc]
+
+        # Boosters and "kind of" score 0 themselves; every other lexicon word is scored
+        kind_of = f["kind"][ids] & (context < length - 1) & at("of", 1)
+        scored = f["in_lexicon"][ids] & ~(f["is_booster"][ids] | kind_of)
+        valence = np.where(scored, f["valence"][ids], 0.0)
+        caps = scored & upper & cap_diff
+        valence = np.where(caps, np.where(valence > 0, valence + c.C_INCR, valence - c.C_INCR), valence)
+
+        for back, dampen in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            applies = scored & (context >= back) & ~at("in_lexicon", -back)
+            scalar = np.where(valence < 0, -at("booster", -back), at("booster", -back))
+            booster_caps = at("is_booster", -back) & at("upper", -back) & cap_diff
+            scalar = np.where(booster_caps, np.where(valence > 0, scalar + c.C_INCR, scalar - c.C_INCR), scalar)
+            if dampen != 1.0:
+                scalar = np.where(scalar != 0, scalar * dampen, scalar)
+            valence = np.where(applies, valence + scalar, valence)
+
+            # Negation ("never so" / "never this" intensify instead)
+            if back == 1:
+                intensify = np.zeros_like(applies)
+            elif back == 2:
+                intensify = at("never", -2) & at("so_this", -1)
+                factor = 1.5
+            else:
+                intensify = (at("never", -3) & at("so_this", -2)) | at("so_this", -1)
+                factor = 1.25
+            negate = applies & ~intensify & at("negated", -back)
+            valence = np.where(negate, valence * c.N_SCALAR, valence)
+            if back > 1:
+                valence = np.where(applies & intensify, valence * factor, valence)
+
+            if back == 3:
+                # Idioms are rare: VADER's own check, for the tokens with an idiom word nearby
+                near = np.zeros_like(applies)
+                for offset in range(-3, 3):
+                    inside = (context + offset >= 0) & (context + offset < length)
+                    near |= inside & at("idiom", offset)
+                for n in np.flatnonzero(applies & near):
+                    valence[n] = self._idioms_check(
+                        float(valence[n]), documents[doc[n]], int(context[n]))
+
+        # "least" negates, except in "at least" / "very least"
+        after_least = scored & (context >= 1) & at("least", -1) & ~at("in_lexicon", -1)
+        negate = after_least & ((context == 1) | ~at("at_very", -2))
+        valence = np.where(negate, valence * c.N_SCALAR, valence)
+
+        # Around a text's first "but": half weight before it, 1.5x after it
+        is_but = f["but"][ids]
+        first_but = np.full(len(texts), np.iinfo(np.int64).max)
+        np.minimum.at(first_but, doc[is_but], position[is_but])
+        but = first_but[doc]
+        has_but = but != np.iinfo(np.int64).max
+        valence = np.where(has_but & (position < but), valence * 0.5, valence)
+        valence = np.where(has_but & (position > but), valence * 1.5, valence)
+
+        # Sum per text, "!" and "?" emphasis, and VADER's normalization
+        totals = np.bincount(doc, weights=valence, minlength=len(texts))
+        compound = []
+        for text, total in zip(texts, totals.tolist()):
+            emphasis = self._punctuation_emphasis(total, text)
+            if total > 0:
+                total += emphasis
+            elif total < 0:
+                total -= emphasis
+            compound.append(round(c.normalize(total), 4))
+        return compound
+
+
+class TransformerBackend(SentimentBackend):
+    """
+    CPU sentiment classifier. Texts are sorted by length and grouped so that each batch holds
+    about `max_batch_tokens` tokens, which keeps padding (and wasted compute) small.
+    Needs `torch` and `transformers`; the model is fetched from the Hugging Face hub on first use.
+    """
+    name = "transformer"
+
+    def __init__(self, model_name: str = DEFAULT_TRANSFORMER_MODEL, max_length: int = 128,
+                 max_batch_tokens: int = 8192, cache_size: int = 50_000):
+        super().__init__(cache_size)
+        try:
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "The transformer sentiment backend needs torch and transformers "
+                "(pip install torch transformers), or use GRISP_SENTIMENT_BACKEND=vader."
+            ) from e
+
+        self.torch = torch
+        self.max_length = max_length
+        self.max_batch_tokens = max_batch_tokens
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, token=os.getenv("HF_API_TOKEN") or None)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name, token=os.getenv("HF_API_TOKEN") or None)
+        self.model.eval()
+
+        labels = {label.lower(): int(i) for i, label in self.model.config.id2label.items()}
+        self.positive_id = labels.get("positive", max(labels.values()))
+        self.negative_id = labels.get("negative", 0)
+
+    def _batches(self, token_ids: List[List[int]]):
+        """Index batches over length-sorted texts, each about max_batch_tokens padded tokens."""
+        order = sorted(range(len(token_ids)), key=lambda n: len(token_ids[n]))
+        batch, longest = [], 0
+        for n in order:
+            longest_if_added = max(longest, len(token_ids[n]))
+            if batch and longest_if_added * (len(batch) + 1) > self.max_batch_tokens:
+                yield batch
+                batch, longest_if_added = [], len(token_ids[n])
+            batch.append(n)
+            longest = longest_if_added
+        if batch:
+            yield batch
+
+    def _score_unique(self, texts):
+        torch = self.torch
+        token_ids = self.tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+        compound = [0.0] * len(texts)
+        with torch.inference_mode():
+            for batch in self._batches(token_ids):
+                inputs = self.tokenizer.pad({"input_ids": [token_ids[n] for n in batch]}, return_tensors="pt")
+                probs = torch.softmax(self.model(**inputs).logits, dim=-1)
+                values = (probs[:, self.positive_id] - probs[:, self.negative_id]).tolist()
+                for n, value in zip(batch, values):
+                    compound[n] = value
+        return compound
+
+
+BACKENDS = {
+    VaderBackend.name: VaderBackend,
+    TransformerBackend.name: TransformerBackend,
+}
+
+_backends: Dict[str, SentimentBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None) -> SentimentBackend:
+    """The process-wide backend called `name` (default GRISP_SENTIMENT_BACKEND), created on first use."""
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def score_texts(texts: Sequence[str], backend: Optional[str] = None) -> SentimentSummary:
+    """Bucket counts and compound distribution of `texts` with the chosen backend."""
+    return get_backend(backend).score(texts)
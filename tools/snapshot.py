@@ -0,0 +1,153 @@
+"""
+Snapshot / replay of the tool calls of a run.
+
+Recording: while a Snapshot is installed with `use_snapshot(Snapshot.recorder(...))`, every tool
+call that actually executes (calls answered by the run's call memo are the same call) is kept with
+its result: the typed record (tools/records.py) as data, or the returned text. `save()` writes them
+to one gzip-compressed JSON-lines archive, e.g. snapshots/India_2026-10-16_14-05.jsonl.gz:
+    {"snapshot": 1, "label": ..., "created": ..., "calls": N}            header
+    {"tool": ..., "arguments": {...}, "results": [...], "seconds": ...}  one line per distinct call
+
+Replay: `use_snapshot(Snapshot.load(path))` answers every tool call from the archive instead of
+running the tool, so no tool touches the network. Calls are matched like the call memo matches
+them (same tool, same normalized arguments); a call repeated in the recording (e.g. retried after
+an error) replays the recorded results in order. A call the recording never made gets an error
+string, like any failed tool call, and is counted in `summary()`.
+
+With the tool data pinned, an edit to agents/*.yaml or tasks/*.yaml can be compared on exactly
+the inputs of the original run, in seconds of tool time.
+"""
+import contextvars
+import datetime
+import gzip
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from tools.call_memo import call_key
+from tools.records import Record
+
+SNAPSHOT_DIR = os.getenv("GRISP_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_VERSION = 1
+
+_current_snapshot = contextvars.ContextVar("grisp_snapshot", default=None)
+
+
+def _encode(result: Any) -> Any:
+    if isinstance(result, Record):
+        return {"record": result.to_dict()}
+    return {"text": result if isinstance(result, str) else str(result)}
+
+
+def _decode(stored: dict) -> Any:
+    if "record" in stored:
+        return Record.from_dict(stored["record"])
+    return stored["text"]
+
+
+class Snapshot:
+    """Tool call results of one run, recording or replaying. Thread-safe."""
+
+    def __init__(self, mode: str, path: Optional[str] = None, label: str = ""):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', not {mode!r}")
+        self.mode = mode
+        self.path = path
+        self.label = label
+        # call key -> {"tool", "arguments", "results": [...], "seconds"}
+        self._calls: Dict[str, dict] = {}
+        # replay: call key -> how many of its results were served
+        self._served: Dict[str, int] = {}
+        self._misses: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def recorder(cls, label: str = "run", path: Optional[str] = None) -> "Snapshot":
+        if path is None:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+            safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label) or "run"
+            path = os.path.join(SNAPSHOT_DIR, f"{safe}_{timestamp}.jsonl.gz")
+        return cls("record", path, label)
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        snapshot = cls("replay", path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("snapshot") != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a GRiSP snapshot (version {SNAPSHOT_VERSION})")
+            snapshot.label = header.get("label", "")
+            for line in f:
+                if line.strip():
+                    call = json.loads(line)
+                    snapshot._calls[call_key(call["tool"], call["arguments"])] = call
+        return snapshot
+
+    def call(self, tool: str, arguments: dict, run: Callable[[], Any]) -> Any:
+        """Result of this tool call: `run()`'s, recorded (record mode), or the recorded one (replay mode)."""
+        key = call_key(tool, arguments)
+        if self.mode == "replay":
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    self._misses.append(key)
+                    return f"Error: {tool} was not called with {json.dumps(arguments, default=str)} in the recorded run ({self.path})."
+                served = self._served.get(key, 0)
+                self._served[key] = served + 1
+                # Past the recorded results, repeat the last one
+                stored = call["results"][min(served, len(call["results"]) - 1)]
+            return _decode(stored)
+
+        started = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - started
+        with self._lock:
+            call = self._calls.setdefault(key, {"tool": tool, "arguments": arguments, "results": [], "seconds": 0.0})
+            call["results"].append(_encode(result))
+            call["seconds"] = round(call["seconds"] + seconds, 3)
+        return result
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Writes the recorded calls as a gzip-compressed JSONL archive; returns its path."""
+        path = path or self.path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            calls = sorted(self._calls.values(), key=lambda c: (c["tool"], call_key(c["tool"], c["arguments"])))
+        header = {"snapshot": SNAPSHOT_VERSION, "label": self.label,
+                  "created": datetime.datetime.now().isoformat(timespec="seconds"), "calls": len(calls)}
+        # mtime=0: the same calls always give the same bytes
+        with open(path + ".tmp", "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            for item in [header] + calls:
+                gz.write((json.dumps(item, ensure_ascii=False, default=str, separators=(",", ":")) + "\n").encode("utf-8"))
+        os.replace(path + ".tmp", path)
+        self.path = path
+        return path
+
+    def summary(self) -> dict:
+        with self._lock:
+            recorded_seconds = sum(call["seconds"] for call in self._calls.values())
+            if self.mode == "record":
+                return {"mode": "record", "path": self.path, "calls": len(self._calls),
+                        "tool_seconds": round(recorded_seconds, 2)}
+            return {"mode": "replay", "path": self.path, "calls": len(self._calls),
+                    "served": sum(self._served.values()), "misses": len(self._misses),
+                    "unused": sum(1 for key in self._calls if key not in self._served),
+                    "tool_seconds_saved": round(sum(self._calls[key]["seconds"] for key in self._served), 2)}
+
+
+def current_snapshot() -> Optional[Snapshot]:
+    return _current_snapshot.get()
+
+
+@contextmanager
+def use_snapshot(snapshot: Optional[Snapshot]):
+    """Records tool calls into / replays them from `snapshot` for the duration of the block."""
+    token = _current_snapshot.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _current_snapshot.reset(token)
@@ -0,0 +1,475 @@
+"""
+Run instrumentation: where the time, tokens and bytes of a GRiSP run went.
+
+A run installs a Tracer with `use_tracer(...)`. While it is active
+- every GrispTool call is a `tool` span (wall time, arguments, factor),
+- every http_client.get is an `http` span (bytes, status, cache hit) nested in the tool span,
+- tool construction (Excel/workbook loads, lexicons, ...) is a `tool_init` span,
+- each factor chain in parallel mode is a `factor` span,
+- crewai's event bus feeds `task` spans and `llm` spans (prompt/completion tokens, time to
+  first streamed token) tagged with the agent and task that made the call, plus whatever
+  `llm_labels(...)` is active where the call was made (e.g. the model tier, see crew_grisp.py).
+
+`write_jsonl()` dumps one span per line, `write_otlp_json()` writes the same spans as an
+OpenTelemetry OTLP/JSON file (readable by the collector's otlpjsonfile receiver, Jaeger, ...),
+and `summary_table()` renders the totals as markdown.
+
+LLM cost is estimated when GRISP_LLM_COST_PER_1M="<input USD>,<output USD>" (per million tokens) is set.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_current_tracer = contextvars.ContextVar("grisp_tracer", default=None)
+_current_span = contextvars.ContextVar("grisp_span", default=None)
+_llm_labels = contextvars.ContextVar("grisp_llm_labels", default=None)
+
+# OTLP span kinds
+_OTLP_KIND = {"http": 3, "llm": 3}  # CLIENT; everything else is INTERNAL (1)
+
+
+def _new_id(hex_chars: int) -> str:
+    return uuid.uuid4().hex[:hex_chars]
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    start_ns: int
+    span_id: str = field(default_factory=lambda: _new_id(16))
+    parent_id: Optional[str] = None
+    end_ns: Optional[int] = None
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self, trace_id: str) -> dict:
+        return {
+            "trace_id": trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start_ns / 1e9,
+            "end": self.end_ns / 1e9 if self.end_ns else None,
+            "seconds": round(self.seconds, 4),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoSpan:
+    """Stand-in yielded by span() when no tracer is active."""
+    def set(self, **attributes):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _llm_cost_rates():
+    raw = os.getenv("GRISP_LLM_COST_PER_1M", "").strip()
+    if not raw:
+        return None
+    try:
+        prompt_rate, completion_rate = (float(x) for x in raw.split(","))
+    except ValueError:
+        return None
+    return prompt_rate / 1e6, completion_rate / 1e6
+
+
+class Tracer:
+    """Thread-safe collector of the spans of one run."""
+
+    def __init__(self, name: str = "grisp-run", attributes: Optional[dict] = None):
+        self.name = name
+        self.trace_id = _new_id(32)
+        self.attributes = dict(attributes or {})
+        self.started_ns = time.time_ns()
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        # In-flight crewai LLM calls and tasks, keyed by call_id / task_id
+        self._open: Dict[str, Span] = {}
+        # crewai runs the handlers on a thread pool, so a call's completion (or first chunk) can be
+        # handled before its start: what arrived early waits here, by the same key, for the start
+        self._early: Dict[str, dict] = {}
+
+    # --- recording -----------------------------------------------------------------------
+
+    def start_span(self, name: str, kind: str, parent_id: Optional[str] = None, start_ns: Optional[int] = None, **attributes) -> Span:
+        if parent_id is None:
+            parent = _current_span.get()
+            parent_id = parent.span_id if parent is not None else None
+        span = Span(name, kind, start_ns or time.time_ns(), parent_id=parent_id, attributes=attributes)
+        with self._lock:
+            self._spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes):
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+
+    def spans(self, kind: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+        return [s for s in spans if kind is None or s.kind == kind]
+
+    # --- crewai events -------------------------------------------------------------------
+
+    def _open_span(self, key: str, name: str, kind: str, start_ns: int, **attributes):
+        span = self.start_span(name, kind, start_ns=start_ns, **attributes)
+        with self._lock:
+            early = self._early.pop(key, {})
+            if "end_ns" not in early:
+                self._open[key] = span
+        if "first_token_ns" in early:
+            span.attributes["ttft_seconds"] = round((early["first_token_ns"] - span.start_ns) / 1e9, 4)
+        if "end_ns" in early:
+            _finish(span, early["end_ns"], early["status"], early["attributes"])
+
+    def _close_span(self, key: str, end_ns: int, status: str = "ok", **attributes) -> Optional[Span]:
+        with self._lock:
+            span = self._open.pop(key, None)
+            if span is None:
+                self._early.setdefault(key, {}).update(end_ns=end_ns, status=status, attributes=attributes)
+                return None
+        _finish(span, end_ns, status, attributes)
+        return span
+
+    def _first_token(self, call_id: str, at_ns: int):
+        key = f"llm:{call_id}"
+        with self._lock:
+            span = self._open.get(key)
+            if span is None:
+                early = self._early.setdefault(key, {})
+                early["first_token_ns"] = min(at_ns, early.get("first_token_ns", at_ns))
+                return
+            # Chunks can be handled out of order too: keep the earliest
+            ttft = round((at_ns - span.start_ns) / 1e9, 4)
+            if ttft < span.attributes.get("ttft_seconds", ttft + 1):
+                span.attributes["ttft_seconds"] = ttft
+
+    # --- output --------------------------------------------------------------------------
+
+    def write_jsonl(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in sorted(self.spans(), key=lambda s: s.start_ns):
+                f.write(json.dumps(span.to_dict(self.trace_id), ensure_ascii=False, default=str) + "\n")
+
+    def write_otlp_json(self, path: str):
+        """The spans as one OTLP/JSON ExportTraceServiceRequest."""
+        def attributes(values):
+            out = []
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    typed = {"boolValue": value}
+                elif isinstance(value, int):
+                    typed = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    typed = {"doubleValue": value}
+                else:
+                    typed = {"stringValue": value if isinstance(value, str) else json.dumps(value, default=str)}
+                out.append({"key": key, "value": typed})
+            return out
+
+        spans = []
+        for span in self.spans():
+            otlp = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": _OTLP_KIND.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": attributes({"grisp.kind": span.kind, **span.attributes}),
+                "status": {"code": 2 if span.status == "error" else 1},
+            }
+            if span.parent_id:
+                otlp["parentSpanId"] = span.parent_id
+            spans.append(otlp)
+
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": "grisp", "grisp.run": self.name, **self.attributes})},
+            "scopeSpans": [{"scope": {"name": "grisp.tracing"}, "spans": spans}],
+        }]}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    def summary(self) -> dict:
+        """Totals per tool, per LLM agent/task, per factor and per tool load."""
+        spans = self.spans()
+        by_id = {s.span_id: s for s in spans}
+
+        def enclosing_tool(span):
+            parent = by_id.get(span.parent_id)
+            while parent is not None and parent.kind != "tool":
+                parent = by_id.get(parent.parent_id)
+            return parent
+
+        tools = {}
+        for s in spans:
+            if s.kind == "tool":
+                row = tools.setdefault(s.name, {"calls": 0, "errors": 0, "seconds": 0.0, "http_requests": 0, "http_bytes": 0, "cache_hits": 0})
+                row["calls"] += 1
+                row["errors"] += s.status == "error"
+                row["seconds"] += s.seconds
+        for s in spans:
+            if s.kind == "http":
+                tool = enclosing_tool(s)
+                row = tools.setdefault(tool.name if tool else "(no tool)", {"calls": 0, "errors": 0, "seconds": 0.0, "http_requests": 0, "http_bytes": 0, "cache_hits": 0})
+                row["http_requests"] += 1
+                row["http_bytes"] += int(s.attributes.get("bytes", 0))
+                row["cache_hits"] += bool(s.attributes.get("cached"))
+
+        rates = _llm_cost_rates()
+        llm = {}
+        for s in spans:
+            if s.kind != "llm":
+                continue
+            key = (s.attributes.get("agent") or "?", s.attributes.get("task") or "?")
+            row = llm.setdefault(key, {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "ttft": []})
+            row["calls"] += 1
+            row["seconds"] += s.seconds
+            row["prompt_tokens"] += int(s.attributes.get("prompt_tokens", 0))
+            row["completion_tokens"] += int(s.attributes.get("completion_tokens", 0))
+            if "ttft_seconds" in s.attributes:
+                row["ttft"].append(s.attributes["ttft_seconds"])
+        for row in llm.values():
+            ttft = row.pop("ttft")
+            row["mean_ttft"] = sum(ttft) / len(ttft) if ttft else None
+            row["cost_usd"] = (row["prompt_tokens"] * rates[0] + row["completion_tokens"] * rates[1]) if rates else None
+
+        return {
+            "wall_seconds": (max((s.end_ns or s.start_ns) for s in spans) - self.started_ns) / 1e9 if spans else 0.0,
+            "tools": tools,
+            "llm": llm,
+            "tiers": self._tier_summary(spans),
+            "factors": {s.name: s.seconds for s in spans if s.kind == "factor"},
+            "loads": {s.name: s.seconds for s in spans if s.kind == "tool_init"},
+        }
+
+    @staticmethod
+    def _tier_summary(spans) -> dict:
+        """LLM latency per model tier: {(tier, reasoning_effort): {"calls", "seconds", "p50", "p95", ...}}."""
+        tiers = {}
+        for s in spans:
+            if s.kind == "llm" and s.attributes.get("tier"):
+                key = (s.attributes["tier"], s.attributes.get("reasoning_effort") or "-")
+                tiers.setdefault(key, []).append(s)
+        result = {}
+        for key, tier_spans in tiers.items():
+            latencies = sorted(s.seconds for s in tier_spans)
+            result[key] = {
+                "calls": len(latencies),
+                "seconds": sum(latencies),
+                "p50": latencies[len(latencies) // 2],
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "completion_tokens": sum(int(s.attributes.get("completion_tokens", 0)) for s in tier_spans),
+            }
+        return result
+
+    def summary_table(self) -> str:
+        summary = self.summary()
+        llm_seconds = sum(r["seconds"] for r in summary["llm"].values())
+        tool_seconds = sum(r["seconds"] for r in summary["tools"].values())
+        lines = [
+            f"Run wall time: {summary['wall_seconds']:.1f} s "
+            f"(LLM calls {llm_seconds:.1f} s, tool calls {tool_seconds:.1f} s, "
+            f"tool loads {sum(summary['loads'].values()):.1f} s; summed across threads)",
+            "",
+            "| Tool | Calls | Errors | Wall s | HTTP req | HTTP KB | Cache hits |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        for name, r in sorted(summary["tools"].items(), key=lambda kv: -kv[1]["seconds"]):
+            lines.append(f"| {name} | {r['calls']} | {r['errors']} | {r['seconds']:.2f} | {r['http_requests']} | "
+                         f"{r['http_bytes'] / 1024:.1f} | {r['cache_hits']} |")
+
+        lines += ["", "| Agent | Task | LLM calls | Wall s | Prompt tok | Completion tok | Mean TTFT s | Cost USD |",
+                  "|---|---|---:|---:|---:|---:|---:|---:|"]
+        for (agent, task), r in sorted(summary["llm"].items(), key=lambda kv: -kv[1]["seconds"]):
+            ttft = f"{r['mean_ttft']:.2f}" if r["mean_ttft"] is not None else "-"
+            cost = f"{r['cost_usd']:.4f}" if r["cost_usd"] is not None else "-"
+            lines.append(f"| {agent} | {task} | {r['calls']} | {r['seconds']:.2f} | {r['prompt_tokens']} | "
+                         f"{r['completion_tokens']} | {ttft} | {cost} |")
+
+        if summary["tiers"]:
+            lines += ["", "| Model tier | Reasoning effort | LLM calls | Wall s | p50 s | p95 s | Completion tok |",
+                      "|---|---|---:|---:|---:|---:|---:|"]
+            for (tier, effort), r in sorted(summary["tiers"].items(), key=lambda kv: -kv[1]["seconds"]):
+                lines.append(f"| {tier} | {effort} | {r['calls']} | {r['seconds']:.2f} | {r['p50']:.2f} | "
+                             f"{r['p95']:.2f} | {r['completion_tokens']} |")
+
+        if summary["factors"] or summary["loads"]:
+            lines += ["", "| Factor chain / tool load | Wall s |", "|---|---:|"]
+            for name, seconds in sorted(summary["factors"].items(), key=lambda kv: -kv[1]):
+                lines.append(f"| {name} | {seconds:.2f} |")
+            for name, seconds in sorted(summary["loads"].items(), key=lambda kv: -kv[1]):
+                lines.append(f"| load {name} | {seconds:.2f} |")
+        return "\n".join(lines)
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+@contextmanager
+def use_tracer(tracer: Tracer):
+    """Makes `tracer` the current tracer for the duration of the block."""
+    install_crewai_listeners()
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+        flush_crewai_events()
+
+
+@contextmanager
+def llm_labels(**attributes):
+    """Extra attributes for the `llm` spans of the LLM calls made inside the block."""
+    token = _llm_labels.set({**(_llm_labels.get() or {}), **attributes})
+    try:
+        yield
+    finally:
+        _llm_labels.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes):
+    """A span on the current tracer, or a no-op when no run is being traced."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NO_SPAN
+        return
+    with tracer.span(name, kind, **attributes) as s:
+        yield s
+
+
+# --- crewai event bus ------------------------------------------------------------------
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def _finish(span: Span, end_ns: int, status: str, attributes: dict):
+    span.end_ns = end_ns
+    span.status = status
+    span.set(**attributes)
+
+
+def _event_ns(event) -> int:
+    return int(event.timestamp.timestamp() * 1e9)
+
+
+def _token_counts(usage) -> dict:
+    """Prompt/completion token counts from the usage dict of any provider."""
+    usage = usage or {}
+    def first(*keys):
+        for key in keys:
+            if usage.get(key) is not None:
+                return int(usage[key])
+        return 0
+    return {
+        "prompt_tokens": first("prompt_tokens", "input_tokens", "prompt_token_count"),
+        "completion_tokens": first("completion_tokens", "output_tokens", "candidates_token_count"),
+    }
+
+
+def install_crewai_listeners():
+    """Registers (once per process) crewai event handlers that feed the current tracer."""
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        try:
+            from crewai.events import crewai_event_bus
+            from crewai.events.types.llm_events import (
+                LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent, LLMStreamChunkEvent,
+            )
+            from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+        except ImportError:
+            return
+
+        # Sync handlers run with a copy of the emitting thread's context, so the tracer and the
+        # enclosing span of the run that made the call are visible here.
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def _llm_started(source, event):
+            tracer = current_tracer()
+            if tracer is not None:
+                tracer._open_span(f"llm:{event.call_id}", f"llm {event.model or ''}".strip(), "llm", _event_ns(event),
+                                  model=event.model, agent=event.agent_role, task=event.task_name,
+                                  **(_llm_labels.get() or {}))
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _llm_chunk(source, event):
+            tracer = current_tracer()
+            if tracer is not None:
+                # The chunk's own timestamp: the handler may run well after it arrived
+                tracer._first_token(event.call_id, _event_ns(event))
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def _llm_completed(source, event):
+            tracer = current_tracer()
+            if tracer is not None:
+                tracer._close_span(f"llm:{event.call_id}", _event_ns(event), **_token_counts(event.usage))
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def _llm_failed(source, event):
+            tracer = current_tracer()
+            if tracer is not None:
+                tracer._close_span(f"llm:{event.call_id}", _event_ns(event), status="error", error=event.error)
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def _task_started(source, event):
+            tracer = current_tracer()
+            if tracer is not None and event.task_id:
+                agent = getattr(getattr(event, "task", None), "agent", None)
+                tracer._open_span(f"task:{event.task_id}", event.task_name or "task", "task", _event_ns(event),
+                                  agent=getattr(agent, "role", None))
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def _task_completed(source, event):
+            tracer = current_tracer()
+            if tracer is not None and event.task_id:
+                tracer._close_span(f"task:{event.task_id}", _event_ns(event))
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def _task_failed(source, event):
+            tracer = current_tracer()
+            if tracer is not None and event.task_id:
+                tracer._close_span(f"task:{event.task_id}", _event_ns(event), status="error", error=event.error)
+
+        _listeners_installed = True
+
+
+def flush_crewai_events(timeout: float = 10.0):
+    """Waits for crewai's queued event handlers, so the trace is complete before it is written."""
+    if not _listeners_installed:
+        return
+    from crewai.events import crewai_event_bus
+    crewai_event_bus.flush(timeout=timeout)
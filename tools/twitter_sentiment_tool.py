@@ -1,44 +1,60 @@
 import os
 import requests
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from crewai.tools import BaseTool
+from tools import http_client
+from tools.base import GrispTool
+from tools.records import SentimentRecord
+from tools.dedupe import Deduper
+from tools.sentiment import DEFAULT_BACKEND, SentimentBackend, StreamingSentiment, get_backend
 from dotenv import load_dotenv
-from typing import Optional # Import Optional, as ClassVar is not needed for instance attributes
+from typing import Iterator, List, Optional # Import Optional, as ClassVar is not needed for instance attributes
 
 # Load environment variables at the top-most level as soon as possible
 load_dotenv()
 
-# --- NLTK VADER Lexicon Download Logic ---
-# Ensure VADER lexicon is downloaded
-try:
-    # First, try to download (it will skip if already downloaded)
-    nltk.download('vader_lexicon', quiet=True) 
-    # Then, verify it's found (this is what was failing before)
-    nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError: # Use LookupError directly for missing data
-    print("VADER Lexicon not found after download attempt. Please run 'python -m nltk.downloader vader_lexicon' manually if issues persist.")
-    # It's usually good practice to exit or raise a hard error if a critical dependency isn;t met
-    # For now, we'll let it continue, but the tool might fail if `analyzer` cannot be initialized
-# --- End NLTK VADER Lexicon Download Logic ---
-
-
-class TwitterSentimentTool(BaseTool):
+
+# Page sizes the recent-search endpoint accepts for max_results
+TWITTER_MIN_PAGE = 10
+TWITTER_MAX_PAGE = 100
+
+
+class TwitterApiError(Exception):
+    pass
+
+
+class TwitterSentimentTool(GrispTool):
     # These are Pydantic fields. They should be instance attributes for CrewAI tools.
     # 'name' and 'description' are standard for BaseTool.
     name: str = "TwitterSentimentTool"
     description: str = (
         "Fetches recent tweets based on a query and performs sentiment analysis. "
-        "Returns a detailed sentiment breakdown (Positive, Neutral, Negative counts and percentages)."
+        "Returns a detailed sentiment breakdown (Positive, Neutral, Negative counts and percentages) "
+        "and the distribution of compound sentiment scores."
     )
 
     # Declare instance attributes as Pydantic fields.
     # They are initialized to Optional[type] = None because they are set within __init__.
-    analyzer: Optional[SentimentIntensityAnalyzer] = None
+    # analyzer is the batch sentiment engine from tools/sentiment.py, shared process-wide.
+    analyzer: Optional[SentimentBackend] = None
     bearer_token: Optional[str] = None
     
-    # base_url can remain a class attribute if it's constant for all instances
-    base_url: str = "https://api.twitter.com/2/tweets/search/recent"
+    # v2 recent-search endpoint. Override it (or set TWITTER_SEARCH_URL) to point the tool at a local mock.
+    base_url: str = os.getenv("TWITTER_SEARCH_URL", "https://api.twitter.com/2/tweets/search/recent")
+
+    # Tweets requested per page (the recent-search endpoint allows 10-100) and per search in total.
+    # Pages are followed through meta.next_token until max_tweets is reached or results run out.
+    max_results: int = 100
+    max_tweets: int = int(os.getenv("GRISP_TWEET_BUDGET", "1000"))
+    # Only tweets in this language are requested and scored (VADER is English-only); None for all
+    language: Optional[str] = "en"
+    # SimHash bits a tweet may differ in from an earlier one and still count as a copy (see
+    # tools/dedupe.py). Tweets are short, so a copy with a hashtag added or one word changed
+    # lands further away than a syndicated article does (news uses 5); distinct tweets on the
+    # same subject are 14 or more bits apart.
+    max_distance: int = 8
+    # Tweets are scored in batches of this size as they stream in
+    score_batch_size: int = 500
+    # "vader" or "transformer"; defaults to GRISP_SENTIMENT_BACKEND
+    sentiment_backend: str = DEFAULT_BACKEND
 
     def __init__(self, **kwargs):
         # Always call the parent's __init__ method for BaseTool.
@@ -46,84 +62,129 @@ class TwitterSentimentTool(BaseTool):
         super().__init__(**kwargs) 
         
         # Initialize instance-specific attributes here
-        self.analyzer = SentimentIntensityAnalyzer()
+        self.analyzer = get_backend(self.sentiment_backend)
         self.bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
 
         # Add robust checks for critical dependencies
         if self.analyzer is None:
-            raise RuntimeError("NLTK SentimentIntensityAnalyzer could not be initialized. VADER lexicon might be missing.")
+            raise RuntimeError(f"Sentiment backend '{self.sentiment_backend}' could not be initialized.")
         if not self.bearer_token:
             # Raise an error to prevent tool from being used without token
             raise ValueError("TWITTER_BEARER_TOKEN environment variable not set. Twitter API calls will fail.")
 
-    def _fetch_tweets(self, query: str, max_results: int = 10) -> list:
+    def iter_pages(self, query: str, max_tweets: Optional[int] = None) -> Iterator[List[dict]]:
+        """Yields the raw tweet objects page by page, following next_token up to the tweet budget."""
         # Ensure token is present before making API call
         if not self.bearer_token:
-            return ["Error: Twitter Bearer Token is missing. Please set the 'TWITTER_BEARER_TOKEN' environment variable."]
+            raise TwitterApiError("Twitter Bearer Token is missing. Please set the 'TWITTER_BEARER_TOKEN' environment variable.")
 
         headers = {
             "Authorization": f"Bearer {self.bearer_token}"
         }
 
         params = {
-            "query": query,
-            "max_results": max_results,
-            "tweet.fields": "text,lang", # Request text and language
+            # Filter by language on the server so the budget isn't spent on tweets we would drop
+            # Parenthesized, so the filter applies to every branch of an OR query
+            "query": f"({query}) lang:{self.language}" if self.language else query,
+            "tweet.fields": "text,lang,referenced_tweets", # Request text, language and retweet references
         }
 
-        try:
-            response = requests.get(self.base_url, headers=headers, params=params)
+        budget = max_tweets or self.max_tweets
+        fetched = 0
+        while fetched < budget:
+            remaining = budget - fetched
+            # The API serves 10 to 100 tweets a page: stop once less than a page is left
+            # (a budget under 10 still gets one page, trimmed to the budget)
+            if remaining < TWITTER_MIN_PAGE and fetched:
+                return
+            params["max_results"] = max(TWITTER_MIN_PAGE, min(self.max_results, remaining, TWITTER_MAX_PAGE))
+            response = http_client.get(self.base_url, params=params, headers=headers, source="twitter")
             response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
             data = response.json()
 
-            # Check for API errors reported by Twitter
-            if 'errors' in data:
+            tweets = data.get("data") or []
+            # Twitter reports problems in 'errors'; alongside data they are partial (e.g. a withheld tweet)
+            if 'errors' in data and not tweets:
                 error_messages = "; ".join([e.get('detail', e.get('message', 'Unknown Error')) for e in data['errors']])
-                return [f"Twitter API error: {error_messages}"]
-            
-            # Check if 'data' key exists and is not empty
-            if not data.get("data"):
-                return [f"No recent tweets found for query: '{query}'."]
-
-            # Filter for English tweets and return text
-            # Ensure 'text' and 'lang' keys exist before accessing
-            return [tweet["text"] for tweet in data["data"] if tweet.get("lang") == "en" and tweet.get("text")]
-
-        except requests.exceptions.RequestException as e:
-            return [f"Network or API error while fetching tweets for query '{query}': {str(e)}"]
-        except Exception as e:
-            return [f"An unexpected error occurred while fetching tweets for query '{query}': {str(e)}"]
-
-    def _run(self, query: str) -> str:
+                raise TwitterApiError(error_messages)
+            if not tweets:
+                return
+
+            tweets = tweets[:remaining]
+            fetched += len(tweets)
+            yield tweets
+
+            next_token = (data.get("meta") or {}).get("next_token")
+            if not next_token:
+                return
+            params["next_token"] = next_token
+
+    def iter_tweets(self, query: str, deduper: Optional[Deduper] = None, max_tweets: Optional[int] = None) -> Iterator[str]:
+        """
+        Streams the text of every distinct tweet. Retweets collapse onto the tweet they retweet,
+        and texts that are the same after normalization, or near-duplicates of an earlier tweet
+        (within max_distance SimHash bits, see tools/dedupe.py), are yielded once.
+        """
+        deduper = deduper if deduper is not None else Deduper(self.max_distance)
+        for page in self.iter_pages(query, max_tweets):
+            texts = []
+            for tweet in page:
+                text = tweet.get("text")
+                if not text or (self.language and tweet.get("lang", self.language) != self.language):
+                    continue
+                retweeted = next(
+                    (ref.get("id") for ref in tweet.get("referenced_tweets") or [] if ref.get("type") == "retweeted"),
+                    None,
+                )
+                if deduper.add(f"id:{retweeted or tweet.get('id', text)}"):
+                    texts.append(text)
+            # The page's texts are hashed together (one SimHash batch per page)
+            for text, new in zip(texts, deduper.add_texts(texts)):
+                if new:
+                    yield text
+
+    def _run(self, query: str):
         # Check if analyzer is initialized before using it
         if self.analyzer is None:
             return "Error: Sentiment analyzer is not initialized. Cannot perform sentiment analysis."
             
-        tweets = self._fetch_tweets(query)
-        
-        # Check if the result from _fetch_tweets is an error message (list containing one error string)
-        if not tweets or (isinstance(tweets, list) and tweets and "Error:" in tweets[0]):
-            return tweets[0] # Return the error message
-
-        scores = {"POSITIVE": 0, "NEUTRAL": 0, "NEGATIVE": 0}
-        for tweet in tweets:
-            sentiment = self.analyzer.polarity_scores(tweet)
-            compound = sentiment["compound"]
-            if compound >= 0.05:
-                scores["POSITIVE"] += 1
-            elif compound <= -0.05:
-                scores["NEGATIVE"] += 1
-            else:
-                scores["NEUTRAL"] += 1
-
-        total = sum(scores.values())
+        # Tweets are scored batch by batch as pages arrive, so memory stays flat however many are fetched
+        deduper = Deduper(self.max_distance)
+        stream = StreamingSentiment()
+        batch = []
+        try:
+            for text in self.iter_tweets(query, deduper):
+                batch.append(text)
+                if len(batch) >= self.score_batch_size:
+                    stream.add(self.analyzer.compound(batch))
+                    batch = []
+        except (requests.exceptions.RequestException, TwitterApiError) as e:
+            if not stream.total and not batch:
+                return f"Network or API error while fetching tweets for query '{query}': {str(e)}"
+            # Keep what was fetched before the failure
+            print(f"⚠️ Twitter search for '{query}' stopped after {stream.total + len(batch)} tweets: {e}")
+        except Exception as e:
+            return f"An unexpected error occurred while fetching tweets for query '{query}': {str(e)}"
+        if batch:
+            stream.add(self.analyzer.compound(batch))
+
+        summary = stream.summary()
+        total = summary.total
         if total == 0:
-            return f"Could not perform sentiment analysis for '{query}' as no relevant tweets were found or processed."
-            
-        result = "\n".join([
-            f"Sentiment Analysis of {total} recent tweets about '{query}':",
-            f"👍 Positive: {scores['POSITIVE']} ({scores['POSITIVE']/total:.1%})",
-            f"😐 Neutral:  {scores['NEUTRAL']} ({scores['NEUTRAL']/total:.1%})",
-            f"👎 Negative: {scores['NEGATIVE']} ({scores['NEGATIVE']/total:.1%})"
-        ])
-        return result
\ No newline at end of file
+            return f"No recent tweets found for query: '{query}'."
+
+        return SentimentRecord(
+            query=query,
+            total=total,
+            positive=summary.positive,
+            neutral=summary.neutral,
+            negative=summary.negative,
+            mean=summary.mean,
+            median=summary.median,
+            stdev=summary.stdev,
+            p10=summary.p10,
+            p90=summary.p90,
+            histogram=summary.histogram,
+            backend=self.analyzer.name,
+            duplicates=deduper.duplicates,
+        )
@@ -1,18 +1,84 @@
+import os
+import numpy as np
 import requests
-from crewai.tools import BaseTool
-from typing import Optional # Use Optional for consistency if you choose, but not strictly needed for a direct string default
+from tools import http_client
+from tools.base import GrispTool
+from tools.countries import resolve_country
+from tools.indicator_store import get_indicator_store, series_key
+from tools.records import WorldBankBatch, WorldBankRecord
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple # Use Optional for consistency if you choose, but not strictly needed for a direct string default
 
-class WorldBankApiTool(BaseTool):
+# Default year window used by single and batch lookups
+DEFAULT_YEARS = range(2020, 2025)
+
+
+def world_bank_code(text: str) -> str:
+    """
+    The code to send the API for a country code, name or alias ('US', 'USA', 'United States').
+    Codes are kept as given; names become ISO3. Anything the resolver doesn't know, such as
+    regional aggregates ('WLD', 'EUU'), passes through upper-cased.
+    """
+    text = text.strip()
+    code = text.upper()
+    country = resolve_country(text)
+    if country is None or code in (country.iso2, country.iso3):
+        return code
+    return country.iso3
+
+
+def world_bank_codes(texts: Iterable[str]) -> List[str]:
+    """
+    world_bank_code() of each country, each country once ('IN;IND;India' is one country): the
+    matrix would fill only its first row, and the indicator store keeps one series per country.
+    """
+    codes: Dict[str, str] = {}
+    for code in (world_bank_code(text) for text in texts if text.strip()):
+        codes.setdefault(series_key(code), code)
+    return list(codes.values())
+
+
+@dataclass
+class IndicatorMatrix:
+    """
+    Dense country x indicator x year table returned by WorldBankApiTool.fetch_matrix.
+    `values[c, i, y]` is NaN where the World Bank has no observation.
+    """
+    countries: List[str]
+    indicators: List[str]
+    years: List[int]
+    values: np.ndarray
+    country_names: Dict[str, str] = field(default_factory=dict)
+    indicator_names: Dict[str, str] = field(default_factory=dict)
+
+    def latest(self, country: str, indicator: str) -> Tuple[Optional[int], Optional[float]]:
+        """Most recent non-missing (year, value) for one country/indicator pair."""
+        series = self.values[self.countries.index(country), self.indicators.index(indicator)]
+        present = np.flatnonzero(~np.isnan(series))
+        if present.size == 0:
+            return None, None
+        last = present[-1]
+        return self.years[last], float(series[last])
+
+class WorldBankApiTool(GrispTool):
     name: str = "WorldBankApiTool"
     description: str = (
         "Retrieves economic indicators like GDP, inflation, debt, etc. for a given country code using the World Bank API. "
         "Expected input format: 'country_code:indicator'. "
-        "Example: 'IN:NY.GDP.MKTP.CD' → India GDP in USD."
+        "Example: 'IN:NY.GDP.MKTP.CD' → India GDP in USD. Country names ('India') and ISO3 codes work too. "
+        "Several countries and/or indicators can be fetched in one call by separating them with ';', "
+        "e.g. 'IN;US;BR:NY.GDP.MKTP.CD;FP.CPI.TOTL.ZG'."
     )
 
     # Declare base_url as a Pydantic field.
     # Since it has a default string value, Pydantic handles it.
-    base_url: str = "https://api.worldbank.org/v2"
+    # WORLD_BANK_API_URL points it elsewhere (e.g. the local stub in benchmarks/stub_server.py).
+    base_url: str = os.getenv("WORLD_BANK_API_URL", "https://api.worldbank.org/v2")
+
+    # Batch requests page through results; the API caps per_page, so ask for large pages.
+    # Country lists are chunked to keep URLs well under server limits.
+    batch_page_size: int = 1000
+    max_countries_per_request: int = 60
 
     def __init__(self, **kwargs):
         # Always call the parent's __init__ when inheriting from BaseTool.
@@ -21,7 +87,7 @@ class WorldBankApiTool(BaseTool):
         super().__init__(**kwargs) 
         # No need to set self.base_url = "..." here, Pydantic does it.
 
-    def _run(self, input_string: str) -> str:
+    def _run(self, input_string: str):
         """
         Retrieves economic indicators for a given country and indicator code from the World Bank API.
         Expected input format: 'country_code:indicator'
@@ -32,16 +98,36 @@ class WorldBankApiTool(BaseTool):
                 return "Invalid input format. Use 'country_code:indicator'. Example: 'US:SP.POP.TOTL' for USA total population."
 
             country_code, indicator = input_string.split(":")
-            # Ensure country code is uppercase for consistency, though API is often case-insensitive
-            country_code = country_code.strip().upper() 
+            if ";" in country_code or ";" in indicator:
+                return self._run_batch(country_code, indicator)
+
+            # Country names and aliases become ISO codes; codes are upper-cased for consistency
+            country_code = world_bank_code(country_code)
             indicator = indicator.strip() # Remove any leading/trailing whitespace from indicator
 
+            # Series pre-fetched by the refresh scheduler (tools/freshness.py) are answered from the
+            # local store (tools/indicator_store.py) without a request
+            store = get_indicator_store(create=False)
+            stored = store.latest(country_code, indicator, DEFAULT_YEARS[0], DEFAULT_YEARS[-1]) if store else None
+            if stored is not None:
+                if stored.value is None:
+                    # Fetched, but the series has no value in these years: answer as the API path does
+                    return f"No data found for indicator '{indicator}' for country code '{country_code}' in recent years (2020-2024)."
+                return WorldBankRecord(
+                    country_code=country_code,
+                    country_name=stored.country_name,
+                    indicator=indicator,
+                    indicator_name=stored.indicator_name,
+                    year=stored.year,
+                    value=stored.value,
+                )
+
             # Request for the most recent data point (last 5 years)
             # per_page=1 to get just one record (the most recent by default usually)
             # source=2 for World Development Indicators (WDI), which is a common and rich dataset.
             url = f"{self.base_url}/country/{country_code}/indicator/{indicator}?format=json&date=2020:2024&per_page=1&source=2"
             
-            response = requests.get(url)
+            response = http_client.get(url, source="worldbank")
             response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
             data = response.json()
 
@@ -58,34 +144,13 @@ class WorldBankApiTool(BaseTool):
             country_name = record.get("country", {}).get("value", country_code.upper()) 
             indicator_name = record.get("indicator", {}).get("value", indicator) 
 
-            if value is None:
-                return (
-                    f"Data for indicator '{indicator_name}' for {country_name} "
-                    f"is not available for year {year} (value is null/missing)."
-                )
-
-            # Format the value for better readability (e.g., millions/billions for large numbers)
-            # Using a more robust formatting for large numbers if applicable
-            if isinstance(value, (int, float)):
-                if value >= 1_000_000_000_000:
-                    formatted_value = f"{value/1_000_000_000_000:,.2f} Trillion"
-                elif value >= 1_000_000_000:
-                    formatted_value = f"{value/1_000_000_000:,.2f} Billion"
-                elif value >= 1_000_000:
-                    formatted_value = f"{value/1_000_000:,.2f} Million"
-                elif value >= 1_000:
-                    formatted_value = f"{value/1_000:,.2f} Thousand"
-                else:
-                    formatted_value = f"{value:,.2f}" # Default to 2 decimal places for smaller numbers
-            else:
-                formatted_value = str(value) # Fallback for non-numeric values
-
-            return (
-                f"World Bank Data for {country_name} ({country_code.upper()}):\n"
-                f"- Indicator: {indicator_name}\n"
-                f"- Year: {year}\n"
-                f"- Value: {formatted_value}\n"
-                f"- Source: World Bank"
+            return WorldBankRecord(
+                country_code=country_code,
+                country_name=country_name,
+                indicator=indicator,
+                indicator_name=indicator_name,
+                year=int(year) if year else None,
+                value=None if value is None else float(value),
             )
         except requests.exceptions.RequestException as e:
             return f"Network or API error when fetching World Bank data for '{input_string}': {str(e)}. Please check country code/indicator."
@@ -96,4 +161,109 @@ class WorldBankApiTool(BaseTool):
                 f"It might be an invalid indicator or country code, or no data is available: {str(e)}"
             )
         except Exception as e:
-            return f"An unexpected error occurred while fetching World Bank data for '{input_string}': {str(e)}"
\ No newline at end of file
+            return f"An unexpected error occurred while fetching World Bank data for '{input_string}': {str(e)}"
+
+    def fetch_matrix(
+        self,
+        countries: Iterable[str],
+        indicators: Iterable[str],
+        years: Iterable[int] = DEFAULT_YEARS,
+    ) -> IndicatorMatrix:
+        """
+        Fetches every country x indicator x year combination with a handful of paged requests
+        (semicolon-joined country and indicator lists, source=2) instead of one request per pair.
+        Countries can be ISO2 or ISO3 codes or names; the matrix keeps them in the order given, once each.
+        """
+        countries = world_bank_codes(countries)
+        indicators = list(dict.fromkeys(i.strip() for i in indicators if i.strip()))
+        years = sorted({int(y) for y in years})
+
+        values = np.full((len(countries), len(indicators), len(years)), np.nan)
+        matrix = IndicatorMatrix(countries, indicators, years, values)
+        if not countries or not indicators or not years:
+            return matrix
+
+        country_pos = {code: n for n, code in enumerate(countries)}
+        indicator_pos = {code: n for n, code in enumerate(indicators)}
+        year_pos = {year: n for n, year in enumerate(years)}
+
+        for start in range(0, len(countries), self.max_countries_per_request):
+            chunk = countries[start:start + self.max_countries_per_request]
+            for record in self._fetch_pages(chunk, indicators, years[0], years[-1]):
+                country = record.get("country") or {}
+                # The API echoes ISO2 in country.id and ISO3 in countryiso3code; match whichever was asked for
+                c = country_pos.get(country.get("id"), country_pos.get(record.get("countryiso3code")))
+                indicator = record.get("indicator") or {}
+                i = indicator_pos.get(indicator.get("id"))
+                try:
+                    y = year_pos.get(int(record.get("date")))
+                except (TypeError, ValueError):
+                    y = None
+                if c is None or i is None or y is None:
+                    continue
+
+                matrix.country_names.setdefault(countries[c], country.get("value", countries[c]))
+                matrix.indicator_names.setdefault(indicators[i], indicator.get("value", indicators[i]))
+                if record.get("value") is not None:
+                    values[c, i, y] = float(record["value"])
+
+        return matrix
+
+    def _fetch_pages(self, countries: List[str], indicators: List[str], first_year: int, last_year: int):
+        """Yields every record of a multi-country/multi-indicator query, following the API's pagination."""
+        url = f"{self.base_url}/country/{';'.join(countries)}/indicator/{';'.join(indicators)}"
+        page, pages = 1, 1
+        while page <= pages:
+            params = {
+                "format": "json",
+                "date": f"{first_year}:{last_year}",
+                "per_page": self.batch_page_size,
+                "page": page,
+                "source": 2,
+            }
+            response = http_client.get(url, params=params, source="worldbank")
+            response.raise_for_status()
+            data = response.json()
+
+            # Errors come back as a single-element list holding a 'message' entry
+            if not data or "message" in data[0]:
+                messages = data[0].get("message", []) if data else []
+                details = "; ".join(m.get("value", "") for m in messages if isinstance(m, dict))
+                raise ValueError(f"World Bank API error: {details or 'empty response'}")
+
+            pages = int(data[0].get("pages") or 1)
+            yield from (data[1] if len(data) > 1 and data[1] else [])
+            page += 1
+
+    def _run_batch(self, country_codes: str, indicator_codes: str) -> WorldBankBatch:
+        """Latest available value of every requested country/indicator pair."""
+        countries = world_bank_codes(country_codes.split(";"))
+        indicators = list(dict.fromkeys(i.strip() for i in indicator_codes.split(";") if i.strip()))
+        store = get_indicator_store(create=False)
+        if store is not None and countries and indicators:
+            first, last = DEFAULT_YEARS[0], DEFAULT_YEARS[-1]
+            stored = [(c, i, store.latest(c, i, first, last)) for c in countries for i in indicators]
+            if all(value is not None for _, _, value in stored):
+                return WorldBankBatch(first, last, tuple(
+                    WorldBankRecord(c, v.country_name, i, v.indicator_name, v.year, v.value) for c, i, v in stored
+                ))
+
+        matrix = self.fetch_matrix(countries, indicators)
+        store = get_indicator_store()
+        if store is not None and matrix.countries and matrix.indicators:
+            # Write-through: the next run (or agent) asking for these finds them locally
+            store.put_matrix(matrix)
+
+        records = []
+        for country in matrix.countries:
+            for indicator in matrix.indicators:
+                year, value = matrix.latest(country, indicator)
+                records.append(WorldBankRecord(
+                    country_code=country,
+                    country_name=matrix.country_names.get(country, country),
+                    indicator=indicator,
+                    indicator_name=matrix.indicator_names.get(indicator, indicator),
+                    year=year,
+                    value=value,
+                ))
+        return WorldBankBatch(matrix.years[0], matrix.years[-1], tuple(records))